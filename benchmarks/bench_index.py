@@ -0,0 +1,86 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Compare crossref validation using NameIndex against collecting each reference.
+
+Usage:
+
+    python benchmarks/bench_index.py [--refs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mkdocstrings_handlers.python import PythonConfig
+from mkdocstrings_handlers.python_xref.handler import PythonRelXRefHandler
+from mkdocstrings_handlers.python_xref.index import NameIndex
+
+from synthetic import make_package, object_paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--refs", type=int, default=20_000, help="number of references to check")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    pkg = make_package()
+    paths = object_paths(pkg)
+    t1 = time.perf_counter()
+    print(f"generated {len(paths):,} objects in {t1 - t0:.2f}s")
+
+    rng = random.Random(args.seed)
+    refs = [rng.choice(paths) for _ in range(args.refs)]
+    # make a quarter of them missing
+    refs = [ref + ".missing" if i % 4 == 0 else ref for i, ref in enumerate(refs)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        handler = PythonRelXRefHandler(PythonConfig(), Path(tmpdir), theme="material")  # type: ignore[call-arg]
+        # pylint: disable=protected-access
+        handler._modules_collection.set_member(pkg.name, pkg)
+
+        t0 = time.perf_counter()
+        collected = [handler._collect_ref(ref) for ref in refs]
+        collect_time = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        index = NameIndex()
+        index.update(handler._modules_collection)
+        build_time = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        indexed = [index.lookup(ref) for ref in refs]
+        lookup_time = time.perf_counter() - t0
+
+    assert collected == indexed
+
+    n = len(refs)
+    print(f"collect: {collect_time:8.3f}s {collect_time / n * 1e6:8.2f}us/ref")
+    print(f"index:   {lookup_time:8.3f}s {lookup_time / n * 1e6:8.2f}us/ref"
+          f" (+ {build_time:.3f}s to build index)")
+    print(f"speedup: {collect_time / lookup_time:8.1f}x")
+    memory = sum(index.memory_usage().values())
+    strings = sys.getsizeof(set(paths)) + sum(sys.getsizeof(path) for path in paths)
+    print(f"memory:  {memory / 2**20:8.2f}MB {memory / len(index):8.1f}B/name"
+          f" (set of path strings: {strings / 2**20:.2f}MB)")
+
+
+if __name__ == "__main__":
+    main()
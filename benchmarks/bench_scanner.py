@@ -0,0 +1,156 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Compare the single pass crossref scanner against the previous three regex approach.
+
+The corpus consists of the docstrings of installed packages that use mkdocstrings
+style cross-references. Both tokenizers are checked to classify every crossref
+in the corpus identically before they are timed.
+
+Usage:
+
+    python benchmarks/bench_scanner.py [--repeat N] [--packages PKG ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import re
+import time
+from typing import Callable, Optional
+
+import griffe
+from griffe import Docstring, Object
+
+# pylint: disable=protected-access
+from mkdocstrings_handlers.python_xref.crossref import _RE_SCANNER, iter_docstrings, substitute_docstring_crossrefs
+
+DEFAULT_PACKAGES = ["_griffe", "mkdocstrings", "mkdocs_autorefs", "mkdocstrings_handlers", "mkdocs", "markdown"]
+
+#
+# Previous implementation: match any crossref, then check whether the match is
+# relative, then parse the relative reference.
+#
+
+_LEGACY_CROSSREF = re.compile(r"\[([^\[\]]+?)\]\[([^\[\]]*?)\]")
+_LEGACY_REL_CROSSREF = re.compile(r"\[([^\[\]]+?)\]\[(\??(?:[\.^\(][^\]]*?|[^\]]*?\.))\]")
+_LEGACY_REL = re.compile(
+    r"(?P<parent>(?:(?:(?P<up>(?:\^+|\.+(?=\.)))\.?)|(?:(?P<class>\([cC]\)\.?))"
+    r"|(?:(?P<module>\([mM]\)\.?))|(?:(?P<package>\([pP]\)\.?))|(?:(?P<current>\.))))?"
+    r"(?P<relname>(?:[a-zA-Z_][a-zA-Z0-9_\.]*)?)"
+)
+
+_PARENT_GROUPS = ("up", "class", "module", "package", "current")
+
+Token = tuple[str, bool, str, Optional[tuple[Optional[str], ...]], str]
+"""title, nocheck, kind ('ref', 'bad' or 'rel'), parent subgroups, ref or relname"""
+
+
+def legacy_token(match: re.Match) -> Token:
+    title, ref = match[1], match[2]
+    nocheck = ref.startswith("?")
+    if nocheck:
+        ref = ref[1:]
+    if not _LEGACY_REL_CROSSREF.fullmatch(match[0]):
+        return title, nocheck, "ref", None, ref
+    ref_match = _LEGACY_REL.fullmatch(ref)
+    if ref_match is None:
+        return title, nocheck, "bad", None, ref
+    parent = tuple(ref_match[g] for g in _PARENT_GROUPS) if ref_match["parent"] else None
+    return title, nocheck, "rel", parent, ref_match["relname"]
+
+
+def scanner_token(match: re.Match) -> Token:
+    title, nocheck = match["title"], match["nocheck"] is not None
+    if (ref := match["ref"]) is not None:
+        return title, nocheck, "ref", None, ref
+    if (bad := match["bad"]) is not None:
+        return title, nocheck, "bad", None, bad
+    parent = tuple(match[g] for g in _PARENT_GROUPS) if match["parent"] else None
+    return title, nocheck, "rel", parent, match["relname"] or ""
+
+
+def legacy_sub(value: str, callback: Callable[[re.Match], str]) -> str:
+    return _LEGACY_CROSSREF.sub(callback, value)
+
+
+def scanner_sub(value: str, callback: Callable[[re.Match], str]) -> str:
+    if "][" not in value:
+        return value
+    return _RE_SCANNER.sub(callback, value)
+
+
+def load_corpus(packages: list[str]) -> list[Docstring]:
+    docs: list[Docstring] = []
+    for name in packages:
+        try:
+            pkg = griffe.load(name, resolve_aliases=False)
+        except (ImportError, griffe.GriffeError) as ex:
+            print(f"skipping {name}: {ex}")
+            continue
+        assert isinstance(pkg, Object)
+        docs.extend(doc for _, doc in iter_docstrings(pkg))
+    return docs
+
+
+def time_sub(values: list[str], sub: Callable, token: Callable, repeat: int) -> float:
+    def callback(match: re.Match) -> str:
+        token(match)
+        return match[0]
+
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for value in values:
+            sub(value, callback)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="number of timing repetitions")
+    parser.add_argument("--packages", nargs="+", default=DEFAULT_PACKAGES, help="packages to load docstrings from")
+    args = parser.parse_args()
+
+    docs = load_corpus(args.packages)
+    values = [doc.value for doc in docs]
+    nbytes = sum(len(value) for value in values)
+
+    legacy = [legacy_token(m) for value in values for m in _LEGACY_CROSSREF.finditer(value)]
+    scanned = [scanner_token(m) for value in values for m in _RE_SCANNER.finditer(value)]
+    assert legacy == scanned, "tokenizers disagree"
+    nrel = sum(1 for token in scanned if token[2] != "ref")
+    nwith = sum(1 for value in values if "][" in value)
+
+    print(f"corpus: {len(values):,} docstrings, {nbytes / 1e6:.2f} MB,"
+          f" {nwith:,} with crossrefs, {len(scanned):,} crossrefs ({nrel:,} relative)")
+
+    legacy_time = time_sub(values, legacy_sub, legacy_token, args.repeat)
+    scanner_time = time_sub(values, scanner_sub, scanner_token, args.repeat)
+    print(f"legacy:  {legacy_time * 1e3:8.2f}ms {nbytes / legacy_time / 1e6:8.1f} MB/s")
+    print(f"scanner: {scanner_time * 1e3:8.2f}ms {nbytes / scanner_time / 1e6:8.1f} MB/s")
+    print(f"speedup: {legacy_time / scanner_time:8.2f}x")
+
+    # End to end substitution without reference checks
+    logging.disable(logging.WARNING)
+    t0 = time.perf_counter()
+    for doc in docs:
+        substitute_docstring_crossrefs(doc)
+    total = time.perf_counter() - t0
+    print(f"substitute_docstring_crossrefs: {total * 1e3:.2f}ms {total / len(docs) * 1e6:.2f}us/docstring")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Benchmark crossref processing on a synthetic package of configurable size.
+
+A package with crossrefs, aliases and re-exports is written to a temporary
+directory and loaded with griffe. The following are then timed against it:
+
+* **substitute**: `substitute_relative_crossrefs` on the whole package without checks
+* **render_substitute**: `PythonRelXRefHandler.render` of the whole package without checks
+    or templates, i.e. the handler's overhead over **substitute**
+* **check_ref_cold**: `_check_ref` for every reference with empty verdict cache and index
+* **check_ref_warm**: `_check_ref` for every reference with cached verdicts
+* **offset_to_location**: `doc_value_offset_to_location` for every crossref
+* **render**: collect and `PythonRelXRefHandler.render` for the first `--render-modules` modules
+
+Results can be saved as a JSON baseline and later runs compared against it,
+failing if any benchmark got slower by more than the given tolerance.
+
+Usage:
+
+    python benchmarks/bench_suite.py [--modules N] [--classes N] [--methods N] [--refs N]
+        [--relative F] [--render-modules N] [--repeat N] [--only NAME ...]
+        [--save FILE] [--compare FILE [--tolerance F]]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from importlib.metadata import version
+from pathlib import Path
+from typing import Any, Callable
+from unittest import mock
+
+import griffe
+from griffe import Docstring, Module
+from markdown import Markdown
+from mkdocs_autorefs import AutorefsExtension
+from mkdocstrings_handlers.python import PythonConfig, PythonHandler
+
+# pylint: disable=protected-access
+from mkdocstrings_handlers.python_xref import crossref, handler as handler_module
+from mkdocstrings_handlers.python_xref.crossref import (
+    _RE_SCANNER,
+    doc_value_offset_to_location,
+    iter_docstrings,
+    substitute_relative_crossrefs,
+)
+from mkdocstrings_handlers.python_xref.handler import PythonRelXRefHandler, _RefVerdictCache
+from mkdocstrings_handlers.python_xref.index import NameIndex
+
+from synthetic import write_package
+
+BENCHMARKS = ("substitute", "render_substitute", "check_ref_cold", "check_ref_warm", "offset_to_location", "render")
+
+FORMAT = 1
+"""Version of the results file format"""
+
+
+def time_runs(func: Callable[[], Any], setup: Callable[[], Any], repeat: int) -> list[float]:
+    """Returns times of `repeat` calls of `func`, each preceded by untimed `setup`."""
+    times = []
+    for _ in range(repeat):
+        setup()
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+class Suite:
+    """Synthetic package and the state needed to run the benchmarks against it."""
+
+    def __init__(self, root: Path, params: dict[str, Any], render_modules: int = 5) -> None:
+        self.root = root
+        self.render_modules = render_modules
+        write_package(root, **params)
+        self.name = params.get("name", "synth")
+        pkg = griffe.load(self.name, search_paths=[root], resolve_aliases=True)
+        assert isinstance(pkg, Module)
+        self.pkg = pkg
+        self.docs: list[Docstring] = [doc for _, doc in iter_docstrings(pkg)]
+        self.values = [doc.value for doc in self.docs]
+        self.offsets = [
+            (doc, [m.start() for m in _RE_SCANNER.finditer(doc.value)]) for doc in self.docs
+        ]
+        self.handler = self.make_handler()
+        self.handler._modules_collection.set_member(pkg.name, pkg)
+        self.refs: list[str] = []
+        substitute_relative_crossrefs(pkg, check_many=self._record_refs)
+        self.restore()
+
+    def make_handler(self, **options: Any) -> PythonRelXRefHandler:
+        handler_module._build_states.clear()
+        config = PythonConfig(paths=[str(self.root)], options=options)  # type: ignore[call-arg]
+        handler = PythonRelXRefHandler(
+            config, self.root, theme="material", mdx=["toc", AutorefsExtension()], mdx_config={})
+        handler._update_env(Markdown(), config={})
+        return handler
+
+    def _record_refs(self, refs: set[str]) -> set[str]:
+        self.refs = sorted(refs)
+        return refs
+
+    def restore(self) -> None:
+        for doc, value in zip(self.docs, self.values):
+            doc.value = value
+
+    def items(self, name: str) -> int:
+        """Number of items processed by benchmark, for per item times."""
+        if name in ("substitute", "render_substitute"):
+            return len(self.docs)
+        if name.startswith("check_ref"):
+            return len(self.refs)
+        if name == "offset_to_location":
+            return sum(len(offsets) for _, offsets in self.offsets)
+        return len(self._render_identifiers())
+
+    def run(self, name: str, repeat: int) -> list[float]:
+        return getattr(self, f"bench_{name}")(repeat)
+
+    def bench_substitute(self, repeat: int) -> list[float]:
+        return time_runs(lambda: substitute_relative_crossrefs(self.pkg), self.restore, repeat)
+
+    def bench_render_substitute(self, repeat: int) -> list[float]:
+        handlers: list[PythonRelXRefHandler] = []
+
+        def setup() -> None:
+            self.restore()
+            handlers[:] = [self.make_handler(check_crossrefs=False)]
+
+        def run() -> None:
+            handler = handlers[0]
+            options = handler.get_options({"relative_crossrefs": True, "show_submodules": True})
+            handler.render(self.pkg, options)
+
+        with mock.patch.object(PythonHandler, "render", lambda _self, data, _options: ""):
+            times = time_runs(run, setup, repeat)
+        self.restore()
+        return times
+
+    def bench_check_ref_cold(self, repeat: int) -> list[float]:
+        def setup() -> None:
+            self.handler._ref_verdicts = _RefVerdictCache()
+            self.handler._name_index = NameIndex()
+
+        return time_runs(self._check_all, setup, repeat)
+
+    def bench_check_ref_warm(self, repeat: int) -> list[float]:
+        self._check_all()
+        return time_runs(self._check_all, lambda: None, repeat)
+
+    def _check_all(self) -> None:
+        check_ref = self.handler._check_ref
+        for ref in self.refs:
+            check_ref(ref)
+
+    def bench_offset_to_location(self, repeat: int) -> list[float]:
+        def run() -> None:
+            for doc, offsets in self.offsets:
+                for offset in offsets:
+                    doc_value_offset_to_location(doc, offset)
+
+        return time_runs(run, crossref._source_maps.clear, repeat)
+
+    def _render_identifiers(self) -> list[str]:
+        return [module.path for module in self.pkg.modules.values()][:self.render_modules]
+
+    def bench_render(self, repeat: int) -> list[float]:
+        identifiers = self._render_identifiers()
+        handlers: list[PythonRelXRefHandler] = []
+
+        def setup() -> None:
+            handlers[:] = [self.make_handler()]
+
+        def run() -> None:
+            handler = handlers[0]
+            options = handler.get_options({"relative_crossrefs": True})
+            for identifier in identifiers:
+                handler.render(handler.collect(identifier, options), options)
+
+        return time_runs(run, setup, repeat)
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Returns names of benchmarks that are slower than baseline by more than tolerance."""
+    if baseline.get("params") != results["params"]:
+        print("warning: baseline was run with different parameters")
+    regressions = []
+    for name, result in results["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if base is None:
+            continue
+        ratio = result["best"] / base["best"]
+        status = "ok"
+        if ratio > 1 + tolerance:
+            status = "REGRESSION"
+            regressions.append(name)
+        print(f"{name:20} {base['best'] * 1e3:10.2f}ms -> {result['best'] * 1e3:10.2f}ms {ratio:6.2f}x {status}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", type=int, default=50, help="number of modules")
+    parser.add_argument("--classes", type=int, default=20, help="number of classes per module")
+    parser.add_argument("--methods", type=int, default=5, help="number of methods per class")
+    parser.add_argument("--refs", type=int, default=2, help="number of crossrefs per docstring")
+    parser.add_argument("--relative", type=float, default=0.5, help="fraction of relative crossrefs")
+    parser.add_argument("--missing", type=float, default=0.02, help="fraction of crossrefs to missing objects")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--render-modules", type=int, default=5, help="number of modules to render")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timing repetitions")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=BENCHMARKS, help="benchmarks to run")
+    parser.add_argument("--save", type=Path, help="write results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="compare results against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="fractional slowdown against --compare baseline counted as a regression")
+    args = parser.parse_args()
+
+    params = {
+        "modules": args.modules,
+        "classes": args.classes,
+        "methods": args.methods,
+        "refs": args.refs,
+        "relative": args.relative,
+        "missing": args.missing,
+        "seed": args.seed,
+    }
+    render_modules = args.render_modules
+    # Invalid references are expected, don't report them.
+    logging.disable(logging.WARNING)
+
+    results: dict[str, Any] = {
+        "format": FORMAT,
+        "python": platform.python_version(),
+        "griffe": version("griffe"),
+        "params": {**params, "render_modules": render_modules},
+        "benchmarks": {},
+    }
+    with tempfile.TemporaryDirectory() as tmpdir:
+        t0 = time.perf_counter()
+        suite = Suite(Path(tmpdir), params, render_modules)
+        print(f"generated and loaded {len(suite.docs):,} docstrings with {len(suite.refs):,} distinct references"
+              f" in {time.perf_counter() - t0:.2f}s")
+        for name in args.only:
+            times = suite.run(name, args.repeat)
+            items = suite.items(name)
+            best = min(times)
+            results["benchmarks"][name] = {
+                "best": best,
+                "median": statistics.median(times),
+                "repeat": len(times),
+                "items": items,
+            }
+            print(f"{name:20} {best * 1e3:10.2f}ms {best / items * 1e6:10.2f}us/item ({items:,} items)")
+        benchmarks = results["benchmarks"]
+        if "substitute" in benchmarks and "render_substitute" in benchmarks:
+            overhead = benchmarks["render_substitute"]["best"] / benchmarks["substitute"]["best"]
+            print(f"render_substitute takes {overhead:.2f}x the time of substitute")
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(results, indent=2), encoding="utf8")
+        print(f"saved results to {args.save}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf8"))
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} benchmarks regressed by more than {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
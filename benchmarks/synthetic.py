@@ -0,0 +1,156 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Synthetic griffe packages for benchmarks."""
+
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+from griffe import Class, Function, Module
+
+
+def make_package(
+    name: str = "synth",
+    *,
+    modules: int = 100,
+    classes: int = 100,
+    methods: int = 9,
+) -> Module:
+    """Construct an in-memory griffe package.
+
+    The package contains `modules * classes * (methods + 1)` objects
+    in addition to the modules themselves.
+
+    Arguments:
+        name: name of top-level package
+        modules: number of modules in the package
+        classes: number of classes per module
+        methods: number of methods per class
+    """
+    pkg = Module(name=name, filepath=Path(name, "__init__.py"))
+    for m in range(modules):
+        mod = Module(name=f"mod{m}", parent=pkg, filepath=Path(name, f"mod{m}.py"))
+        pkg.set_member(mod.name, mod)
+        for c in range(classes):
+            cls = Class(name=f"Class{c}", parent=mod)
+            mod.set_member(cls.name, cls)
+            for f in range(methods):
+                meth = Function(name=f"method{f}", parent=cls)
+                cls.set_member(meth.name, meth)
+    return pkg
+
+
+def object_paths(pkg: Module) -> list[str]:
+    """Return canonical paths of all objects in package in preorder."""
+    paths: list[str] = []
+    stack = [pkg]
+    while stack:
+        obj = stack.pop()
+        paths.append(obj.canonical_path)
+        stack.extend(reversed(list(obj.members.values())))  # type: ignore[arg-type]
+    return paths
+
+
+def write_package(
+    root: Path,
+    name: str = "synth",
+    *,
+    modules: int = 50,
+    classes: int = 20,
+    methods: int = 5,
+    refs: int = 2,
+    relative: float = 0.5,
+    missing: float = 0.02,
+    seed: int = 42,
+) -> Path:
+    """Write a synthetic package with crossrefs in its docstrings to disk.
+
+    Each docstring contains `refs` crossrefs, of which about `relative` are
+    relative references suitable for the context of the docstring, and about
+    `missing` refer to objects that do not exist. The package `__init__`
+    re-exports the first class of every module, and each module other than
+    the first imports a class from the previous one under another name, so
+    that references can go through aliases.
+
+    Arguments:
+        root: directory in which to create the package
+        name: name of top-level package
+        modules: number of modules in the package
+        classes: number of classes per module
+        methods: number of methods per class
+        refs: number of crossrefs per docstring
+        relative: fraction of crossrefs that are relative
+        missing: fraction of crossrefs to objects that do not exist
+        seed: seed for random choice of references
+
+    Returns:
+        Directory of the package.
+    """
+    rng = random.Random(seed)
+
+    def absolute() -> str:
+        m, c = rng.randrange(modules), rng.randrange(classes)
+        choice = rng.randrange(4)
+        if choice == 0:
+            return f"[{name}.mod{m}.Class{c}][]"
+        if choice == 1:
+            return f"[method][{name}.mod{m}.Class{c}.method{rng.randrange(methods)}]"
+        if choice == 2 and m > 0:
+            return f"[alias][{name}.mod{m}.Imported]"
+        return f"[export][{name}.Class0_{m}]"
+
+    def docstring(summary: str, rel_refs: list[str], indent: str) -> str:
+        parts = []
+        for _ in range(refs):
+            if rng.random() < missing:
+                parts.append(f"[missing][{name}.mod{rng.randrange(modules)}.Missing]")
+            elif rng.random() < relative:
+                parts.append(rng.choice(rel_refs))
+            else:
+                parts.append(absolute())
+        lines = [summary, "", *(f"See {part}." for part in parts)]
+        body = "\n".join(f"{indent}{line}" if line else "" for line in lines).lstrip()
+        return f'{indent}"""{body}\n{indent}"""\n'
+
+    def method_refs(c: int) -> list[str]:
+        other = rng.randrange(methods)
+        return [f"[method{other}][(c).]", f"[Class{c}][(m).]", f"[x][^^.Class{rng.randrange(classes)}]"]
+
+    def class_refs(m: int) -> list[str]:
+        return [
+            f"[method{rng.randrange(methods)}][.]",
+            f"[Class{rng.randrange(classes)}][(m).]",
+            f"[x][(p).mod{rng.randrange(modules)}.Class{rng.randrange(classes)}]",
+        ]
+
+    pkg_dir = root / name
+    pkg_dir.mkdir(parents=True, exist_ok=True)
+    init = [docstring(f"Synthetic package {name}.", [f"[mod{rng.randrange(modules)}][.]"], ""), ""]
+    init.extend(f"from .mod{m} import Class0 as Class0_{m}" for m in range(modules))
+    (pkg_dir / "__init__.py").write_text("\n".join(init) + "\n", encoding="utf8")
+
+    for m in range(modules):
+        lines = [docstring(f"Module {m}.", [f"[Class{rng.randrange(classes)}][.]"], ""), ""]
+        if m > 0:
+            lines.append(f"from {name}.mod{m - 1} import Class{rng.randrange(classes)} as Imported\n")
+        for c in range(classes):
+            lines.append(f"class Class{c}:")
+            lines.append(docstring(f"Class {c}.", class_refs(m), "    "))
+            for f in range(methods):
+                lines.append(f"    def method{f}(self) -> None:")
+                lines.append(docstring(f"Method {f}.", method_refs(c), "        "))
+        (pkg_dir / f"mod{m}.py").write_text("\n".join(lines), encoding="utf8")
+
+    return pkg_dir
@@ -0,0 +1,209 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Persistent cache of relative crossref substitution results."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple, Optional
+from weakref import WeakKeyDictionary
+
+from griffe import Docstring, Kind, Object
+from mkdocstrings import get_logger
+
+from .atomic import atomic_write
+
+__all__ = [
+    "CachedSubstitution",
+    "SubstitutionCache",
+]
+
+logger = get_logger(__name__)
+
+_FORMAT = 3
+"""Version of the cache file format."""
+
+_VERSION = f'{Path(__file__).with_name("VERSION").read_text().strip()}/{_FORMAT}'
+"""Version of this package and format, used to invalidate caches written by other versions."""
+
+
+_scope_digests: WeakKeyDictionary[Object, bytes] = WeakKeyDictionary()
+"""Digest of the names and kinds of each object and the objects enclosing it."""
+
+
+def _scope_digest(obj: Object) -> bytes:
+    """Returns digest of the names and kinds of obj and its parents.
+
+    Digests are remembered for each object and computed from that of the
+    parent, so that keying all docstrings in a tree takes linear time.
+    """
+    digest = _scope_digests.get(obj)
+    if digest is None:
+        missing = []
+        parent: Optional[Object] = obj
+        while parent is not None and (digest := _scope_digests.get(parent)) is None:
+            missing.append(parent)
+            parent = parent.parent
+        for scope in reversed(missing):
+            # Whether a module is a package matters for the (p) specifier.
+            is_package = scope.is_module and any(member.kind is Kind.MODULE for member in scope.members.values())
+            digest = hashlib.sha256(b"%s%s:%s:%d\0" % (
+                digest or b"", scope.name.encode(), scope.kind.value.encode(), is_package)).digest()
+            _scope_digests[scope] = digest
+    return digest or b""
+
+
+class CachedSubstitution(NamedTuple):
+    """Result of substituting relative crossrefs in a single docstring."""
+
+    value: str
+    """The docstring value after substitution"""
+    errors: list[tuple[int, str, str, tuple[str, ...]]]
+    """Offsets into original docstring value, kinds, references and message arguments of errors"""
+    refs: list[tuple[int, str]]
+    """Offsets into original docstring value and values of references to check"""
+
+
+class SubstitutionCache:
+    """Cache of docstring substitution results that persists across builds.
+
+    Entries are keyed by a hash of everything the substitution depends on: the
+    docstring text and the names and kinds of the objects enclosing it. Because
+    the key does not depend on where the docstring is in its source file,
+    source locations for errors must be computed when they are reported.
+
+    Cached entries include the references that need to be checked, but not
+    whether they are valid, since that depends on other code.
+
+    The cache is held in memory and only read from and written to disk by
+    `load` and `save`, unless it has no directory, in which case it is only
+    kept in memory. The least recently used entries beyond `max_entries` are
+    discarded. Caches written by a different version of this package are ignored.
+    """
+
+    filename = "substitutions.json"
+
+    def __init__(self, directory: Optional[Path], *, max_entries: int = 100_000) -> None:
+        """
+        Arguments:
+            directory: directory in which to store the cache file, or None
+                if the cache should only be kept in memory.
+            max_entries: maximum number of entries to keep.
+        """
+        self.directory = Path(directory) if directory is not None else None
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, CachedSubstitution] = OrderedDict()
+        self._loaded = False
+        self._modified = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def path(self) -> Optional[Path]:
+        """Path of the cache file, if any."""
+        return self.directory / self.filename if self.directory is not None else None
+
+    @staticmethod
+    def key(doc: Docstring) -> str:
+        """Compute cache key for docstring."""
+        digest = hashlib.sha256(_scope_digest(doc.parent) if doc.parent is not None else b"")
+        digest.update(b"\0")
+        digest.update(doc.value.encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def entry(
+        value: str,
+        errors: list[tuple[int, str, str, tuple[str, ...]]],
+        refs: list[tuple[int, str]],
+    ) -> CachedSubstitution:
+        """Construct a cache entry."""
+        return CachedSubstitution(value, errors, refs)
+
+    def get(self, key: str) -> Optional[CachedSubstitution]:
+        """Get cached result or None."""
+        self.load()
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: CachedSubstitution) -> None:
+        """Add result to cache."""
+        self.load()
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._modified = True
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def load(self) -> None:
+        """Load entries from cache file, if not already loaded."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path is None:
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as ex:
+            logger.warning(f"Ignoring unreadable crossref cache {self.path}: {ex}")
+            return
+        if not isinstance(data, dict) or data.get("version") != _VERSION:
+            logger.info(f"Ignoring crossref cache {self.path} from different version")
+            return
+        skipped = 0
+        for item in data.get("entries") or ():
+            try:
+                key, value, errors, refs = item
+                if not isinstance(key, str) or not isinstance(value, str):
+                    raise TypeError(item)
+                entry = CachedSubstitution(
+                    value,
+                    [(offset, kind, ref, tuple(args)) for offset, kind, ref, args in errors],
+                    [(offset, ref) for offset, ref in refs],
+                )
+                self._entries.setdefault(key, entry)
+            except (TypeError, ValueError):
+                skipped += 1
+        if skipped:
+            logger.warning(f"Ignoring {skipped} malformed entries in crossref cache {self.path}")
+
+    def save(self) -> None:
+        """Write least recently used entries up to `max_entries` to cache file."""
+        if not self._modified or self.directory is None:
+            return
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        data = {
+            "version": _VERSION,
+            "entries": [
+                [key, entry.value, entry.errors, entry.refs]
+                for key, entry in self._entries.items()
+            ],
+        }
+        with atomic_write(self.directory / self.filename) as f:
+            json.dump(data, f, separators=(",", ":"))
+        self._modified = False
@@ -0,0 +1,383 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Command line checker for relative crossrefs that does not build the site.
+
+Usage:
+
+    python -m mkdocstrings_handlers.python_xref [-f mkdocs.yml] [-j JOBS] [PACKAGE ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Sequence, Union
+
+from griffe import Alias, Docstring, GriffeError, GriffeLoader, Module, Object, Parser, load_extensions
+from mkdocs.exceptions import ConfigurationError
+from mkdocs.utils.yaml import yaml_load
+
+from .crossref import substitute_relative_crossrefs
+from .diagnostics import Diagnostic, DiagnosticsCollector
+from .exclude import exclude_matcher
+from .index import NameIndex
+
+__all__ = [
+    "LoaderSettings",
+    "Shard",
+    "check_shard",
+    "find_packages",
+    "main",
+    "make_shards",
+]
+
+_RE_AUTODOC = re.compile(r"^\s*:::\s+([\w.]+)", re.MULTILINE)
+"""Matches mkdocstrings autodoc instructions in markdown files."""
+
+
+@dataclass(frozen=True)
+class LoaderSettings:
+    """Settings of the handler that determine how griffe loads packages.
+
+    These are the global options of the same names, so that packages are loaded
+    as they are when building the documentation. Extensions are given as in the
+    handler's options, with paths of extension files made absolute.
+    """
+
+    extensions: tuple[Union[str, dict[str, Any]], ...] = ()
+    allow_inspection: bool = True
+    force_inspection: bool = False
+    docstring_style: Optional[str] = "google"
+    docstring_options: tuple[tuple[str, Any], ...] = ()
+
+    def make_loader(self, search_paths: Sequence[str]) -> GriffeLoader:
+        """Returns griffe loader with these settings."""
+        return GriffeLoader(
+            extensions=load_extensions(*self.extensions),
+            search_paths=list(search_paths),
+            docstring_parser=Parser(self.docstring_style) if self.docstring_style else None,
+            docstring_options=dict(self.docstring_options),
+            allow_inspection=self.allow_inspection,
+            force_inspection=self.force_inspection,
+        )
+
+
+@dataclass(frozen=True)
+class Shard:
+    """Part of a package to be checked by one worker process.
+
+    The package is split into `count` shards by its submodules, and this
+    shard checks every `count`th one starting with submodule number `index`.
+    The package's own docstrings and its other members are checked by shard 0.
+    """
+
+    package: str
+    index: int = 0
+    count: int = 1
+    search_paths: tuple[str, ...] = ()
+    exclude: tuple[str, ...] = ()
+    check: bool = True
+    index_file: str = ""
+    """Index file written by the handler's `crossref_index` option, if any"""
+    loader: LoaderSettings = field(default_factory=LoaderSettings)
+    """Settings for loading packages, as configured for the handler"""
+
+
+@dataclass
+class _Config:
+    """Settings read from the python_xref handler in mkdocs.yml."""
+
+    paths: list[str] = field(default_factory=list)
+    exclude: list[str] = field(default_factory=list)
+    check: bool = True
+    index_file: str = ""
+    loader: LoaderSettings = field(default_factory=LoaderSettings)
+    packages: list[str] = field(default_factory=list)
+
+
+class _Checker:
+    """Checks references against packages loaded by a griffe loader.
+
+    Packages are loaded on demand the first time a reference into them is
+    checked. As in the handler, references are looked up in a [NameIndex][..index.]
+    and only resolved through the loaded objects when the index cannot tell.
+    If an index file written by the handler is given, references into packages
+    in it are looked up there instead of loading the packages.
+    """
+
+    def __init__(self, loader: GriffeLoader, exclude: Iterable[str], index_file: str = "") -> None:
+        self._loader = loader
+        self._exclude = exclude_matcher(exclude)
+        self._index = NameIndex()
+        self._shared_index = NameIndex.open(Path(index_file)) if index_file else NameIndex()
+        self._unloadable: set[str] = set()
+
+    def __call__(self, refs: set[str]) -> set[str]:
+        return {ref for ref in refs if self._exclude(ref) or self.check(ref)}
+
+    def close(self) -> None:
+        """Release the index file, if any."""
+        self._shared_index.close()
+
+    def check(self, ref: str) -> bool:
+        collection = self._loader.modules_collection
+        package = ref.partition(".")[0]
+        if package not in collection.members and package not in self._unloadable:
+            verdict = self._shared_index.lookup(ref)
+            if verdict is not None:
+                return verdict
+            try:
+                self._loader.load(package)
+            except (ImportError, GriffeError, OSError, SyntaxError):
+                self._unloadable.add(package)
+        self._index.update(collection)
+        verdict = self._index.lookup(ref)
+        if verdict is None:
+            verdict = _resolve(collection.members, ref)
+        return verdict
+
+
+def _resolve(members: Any, ref: str) -> bool:
+    """Returns true if ref can be found by following members, including inherited ones."""
+    obj: Object | Alias | None = None
+    try:
+        for name in ref.split("."):
+            obj = (obj.all_members if obj is not None else members)[name]
+    except (KeyError, GriffeError, ValueError):
+        return False
+    return True
+
+
+def check_shard(shard: Shard) -> list[Diagnostic]:
+    """Load a package, then substitute and check relative crossrefs in its docstrings.
+
+    Returns:
+        Diagnostics for problems found in the shard's part of the package.
+    """
+    loader = shard.loader.make_loader([*shard.search_paths, *sys.path])
+    diagnostics = DiagnosticsCollector()
+    try:
+        package = loader.load(shard.package)
+    except (ImportError, GriffeError):
+        return [Diagnostic("", -1, -1, "unknown-ref", shard.package)]
+    assert isinstance(package, Module)
+
+    roots: list[Object | Alias] = [package]
+    select_members = None
+    if shard.count > 1:
+        modules = sorted(name for name, member in package.members.items() if member.is_module and not member.is_alias)
+        roots = [package.members[name] for name in modules[shard.index::shard.count]]
+        if shard.index == 0:
+            # The package's own docstrings and non-module members
+            roots.insert(0, package)
+            submodules = set(modules)
+
+            def select_members(obj: Object, is_root: bool) -> list[Object | Alias]:
+                return [m for name, m in obj.members.items() if not is_root or name not in submodules]
+
+    check_many = _Checker(loader, shard.exclude, shard.index_file) if shard.check else None
+    processed: set[Docstring] = set()
+    for root in roots:
+        substitute_relative_crossrefs(
+            root,
+            check_many=check_many,
+            processed=processed,
+            select_members=select_members if root is package else None,
+            diagnostics=diagnostics,
+        )
+    if check_many is not None:
+        check_many.close()
+    return list(diagnostics)
+
+
+def find_packages(docs_dir: Path) -> list[str]:
+    """Returns top-level packages documented by `:::` instructions in markdown files."""
+    packages: set[str] = set()
+    for path in docs_dir.rglob("*.md"):
+        for match in _RE_AUTODOC.finditer(path.read_text(encoding="utf8")):
+            packages.add(match[1].partition(".")[0])
+    return sorted(packages)
+
+
+def _normalize_extension(extension: Union[str, dict[str, Any]], config_dir: Path) -> Union[str, dict[str, Any]]:
+    """Make path of extension file relative to config directory absolute, as the handler does."""
+    if isinstance(extension, dict):
+        path, options = next(iter(extension.items()))
+        return {str(_normalize_extension(str(path), config_dir)): options}
+    if extension.endswith(".py") or ".py:" in extension or "/" in extension or "\\" in extension:
+        return os.path.abspath(config_dir / extension)
+    return extension
+
+
+def _plugin_configs(plugins: Any) -> Iterator[tuple[str, Any]]:
+    """Yields name and settings of each plugin in the list or mapping form of mkdocs `plugins`."""
+    if isinstance(plugins, dict):
+        yield from plugins.items()
+        return
+    if not isinstance(plugins, list):
+        raise ConfigurationError(f"Expected list or mapping of plugins, got {plugins!r}")
+    for plugin in plugins:
+        if isinstance(plugin, str):
+            yield plugin, None
+        elif isinstance(plugin, dict) and len(plugin) == 1:
+            yield from plugin.items()
+        else:
+            raise ConfigurationError(f"Invalid plugins entry {plugin!r}")
+
+
+def _read_config(config_file: Path) -> _Config:
+    """Read python_xref handler settings and documented packages from mkdocs config file.
+
+    Config files named by `INHERIT` are merged in as mkdocs does.
+
+    Raises:
+        ConfigurationError: if the file cannot be parsed or its settings have
+            an unexpected structure.
+    """
+    with config_file.open("rb") as f:
+        data = yaml_load(f)
+    config_dir = config_file.parent
+    config = _Config()
+    for name, plugin in _plugin_configs(data.get("plugins") or []):
+        if name == "mkdocstrings":
+            try:
+                handler = ((plugin or {}).get("handlers") or {}).get("python_xref") or {}
+                options = handler.get("options") or {}
+            except AttributeError as ex:
+                raise ConfigurationError(f"Invalid mkdocstrings plugin settings: {ex}") from ex
+            config.paths = [str(config_dir / path) for path in handler.get("paths", ["."])]
+            config.exclude = list(options.get("check_crossrefs_exclude", []))
+            config.check = options.get("check_crossrefs", True)
+            if options.get("crossref_index"):
+                config.index_file = str(config_dir / options["crossref_index"])
+            config.loader = LoaderSettings(
+                extensions=tuple(_normalize_extension(ext, config_dir) for ext in options.get("extensions") or ()),
+                allow_inspection=options.get("allow_inspection", True),
+                force_inspection=options.get("force_inspection", False),
+                docstring_style=options.get("docstring_style", "google"),
+                docstring_options=tuple(sorted((options.get("docstring_options") or {}).items())),
+            )
+    docs_dir = config_dir / data.get("docs_dir", "docs")
+    if docs_dir.is_dir():
+        config.packages = find_packages(docs_dir)
+    return config
+
+
+def make_shards(
+    packages: Sequence[str],
+    jobs: int,
+    *,
+    search_paths: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    check: bool = True,
+    index_file: str = "",
+    loader: Optional[LoaderSettings] = None,
+) -> list[Shard]:
+    """Divide packages into shards for `jobs` workers.
+
+    Each package is its own shard, unless there are fewer packages than workers,
+    in which case packages are split by submodules. Since every shard of a package
+    has to load the whole package, this only pays off when checking dominates loading.
+    """
+    count = max(1, jobs // max(1, len(packages)))
+    return [
+        Shard(package, index, count, tuple(search_paths), tuple(exclude), check, index_file, loader or LoaderSettings())
+        for package in packages
+        for index in range(count)
+    ]
+
+
+def _format(diagnostic: Diagnostic) -> str:
+    location = diagnostic.path or "<unknown>"
+    if diagnostic.line >= 0:
+        location += f":{diagnostic.line}"
+        if diagnostic.col >= 0:
+            location += f":{diagnostic.col}"
+    return f"{location}: {diagnostic.kind}: {diagnostic.message}"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run crossref checker with command line arguments.
+
+    Returns:
+        Exit status: 0 if no problems were found, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m mkdocstrings_handlers.python_xref",
+        description="Check relative cross-references in docstrings without building the documentation.",
+    )
+    parser.add_argument(
+        "packages", nargs="*",
+        help="packages to check; by default those documented in the mkdocs docs directory")
+    parser.add_argument(
+        "-f", "--config-file", type=Path,
+        help="mkdocs config file from which to read the python_xref handler's paths and exclusions"
+             " (default: mkdocs.yml, if it exists)")
+    parser.add_argument(
+        "-p", "--path", action="append", default=[], help="directory in which to search for packages")
+    parser.add_argument(
+        "-x", "--exclude", action="append", default=[], help="regular expression for references not to check")
+    parser.add_argument(
+        "--no-check", dest="check", action="store_false", help="only check syntax of relative references")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument(
+        "--index", help="index file written by the handler's crossref_index option, used to check"
+                        " references into packages in it without loading them")
+    parser.add_argument(
+        "--report", type=Path, help="also write diagnostics to this JSON or SARIF (*.sarif) file")
+    args = parser.parse_args(argv)
+
+    config = _Config()
+    config_file = args.config_file
+    if config_file is None and Path("mkdocs.yml").is_file():
+        config_file = Path("mkdocs.yml")
+    if config_file is not None:
+        try:
+            config = _read_config(config_file)
+        except (ConfigurationError, OSError) as ex:
+            parser.error(f"cannot read {config_file}: {ex}")
+    packages = args.packages or config.packages
+    if not packages:
+        parser.error("no packages specified or found in mkdocs docs")
+
+    shards = make_shards(
+        packages,
+        args.jobs,
+        search_paths=[*args.path, *config.paths],
+        exclude=[*config.exclude, *args.exclude],
+        check=args.check and config.check,
+        index_file=args.index or config.index_file,
+        loader=config.loader,
+    )
+    collector = DiagnosticsCollector()
+    if args.jobs > 1 and len(shards) > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(shards))) as pool:
+            results = list(pool.map(check_shard, shards))
+    else:
+        results = [check_shard(shard) for shard in shards]
+    for diagnostics in results:
+        for diagnostic in diagnostics:
+            collector.add(diagnostic)
+
+    for diagnostic in collector:
+        print(_format(diagnostic))
+    if args.report is not None:
+        collector.write(args.report)
+    return 1 if len(collector) else 0
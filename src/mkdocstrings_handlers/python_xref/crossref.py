@@ -17,14 +17,30 @@ from __future__ import annotations
 
 import ast
 import re
-import sys
-from typing import Any, Callable, List, Optional, cast
+from bisect import bisect_right
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Any, Callable, Collection, Iterable, Iterator, List, MutableSet, NamedTuple, Optional, Union, cast
+from weakref import WeakKeyDictionary
 
-from griffe import Alias, Docstring, GriffeError, Object
+from griffe import Alias, Docstring, GriffeError, Kind, Object
 from mkdocstrings import get_logger
 
+from .diagnostics import Diagnostic, DiagnosticsCollector
+from .stats import CrossrefStats
+
+if TYPE_CHECKING:
+    from .cache import SubstitutionCache
+
 __all__ = [
-    "substitute_relative_crossrefs"
+    "RELATIVE_KINDS",
+    "CrossrefRecord",
+    "crossref_count",
+    "defer_relative_crossrefs",
+    "iter_crossrefs",
+    "iter_docstrings",
+    "presubstitute_relative_crossrefs",
+    "substitute_docstring_crossrefs",
+    "substitute_relative_crossrefs",
 ]
 
 logger = get_logger(__name__)
@@ -55,296 +71,1016 @@ def _re_named(name: str, exp: str, optional: bool = False) -> str:
     optchar = "?" if optional else ""
     return f"(?P<{name}>{exp}){optchar}"
 
-_RE_CROSSREF = re.compile(r"\[([^\[\]]+?)\]\[([^\[\]]*?)\]")
-"""Regular expression that matches general cross-references."""
+_RE_PARENT = _re_or(
+    _re_named("up", r"(?:\^+|\.+(?=\.))") + r"\.?",
+    _re_named("class", r"\([cC]\)\.?"),
+    _re_named("module", r"\([mM]\)\.?"),
+    _re_named("package", r"\([pP]\)\.?"),
+    _re_named("current", r"\."),
+)
+"""Regular expression that matches the parent prefix of a relative path reference.
 
-_RE_REL_CROSSREF = re.compile(r"\[([^\[\]]+?)\]\[(\??(?:[\.^\(][^\]]*?|[^\]]*?\.))\]")
-"""Regular expression that matches relative cross-reference expressions in doc-string.
+Exactly one of its subgroups will be present:
 
-This will match a cross reference where the path expression either ends in '.'
-or begins with '.', '^' or '('.
+- 'up': an expression of the form '\\^'+ '\\.'? or '\\.\\.+'
+- 'class': an expression of the form '(c)' '.'?
+- 'module': an expression of the form '(m)' '.'?
+- 'package': an expression of the form '(p)' '.'?
+- 'current': an expression of the form '.'
 """
 
-_RE_REL = re.compile(
-    _re_named(
-        "parent",
-        _re_or(
-            _re_named("up", r"(?:\^+|\.+(?=\.))") + r"\.?",
-            _re_named("class", r"\([cC]\)\.?"),
-            _re_named("module", r"\([mM]\)\.?"),
-            _re_named("package", r"\([pP]\)\.?"),
-            _re_named("current", r"\."),
+_RE_SCANNER = re.compile(
+    r"\[" + _re_named("title", r"[^\[\]]+?") + r"\]\["
+    + _re_named("nocheck", r"\?", optional=True)
+    + _re_or(
+        # A relative reference either begins with '.', '^' or '(' or ends in '.'
+        r"(?=[.^(]|[^\[\]]*\.\])"
+        + _re_or(
+            _re_named("parent", _RE_PARENT, optional=True)
+            + _re_named("relname", r"[a-zA-Z_][a-zA-Z0-9_.]*", optional=True)
+            + r"\]",
+            _re_named("bad", r"[^\[\]]*") + r"\]",
         ),
-        optional=True,
+        _re_named("ref", r"[^\[\]]*") + r"\]",
     )
-    + _re_named("relname", r"(?:[a-zA-Z_][a-zA-Z0-9_\.]*)?")
 )
-"""Regular expression that matches a relative path reference.
-
-This has two main parts a 'parent' group that matches the parent prefix expression,
-if present, and a 'relname' group that matches the relative path text and any
-final '.' character.
+"""Regular expression that matches and classifies cross-references in a single pass.
 
-If the 'parent' group is matched, then exactly one of its subgroups will be present:
+This matches expressions of the form `[<title>][<ref>]`, with the title in the
+'title' group and a leading '?' of the reference, which disables checking, in
+the 'nocheck' group. The rest of the reference is matched by exactly one of:
 
-- 'up': an expression of the form '\\^'+ '\\.'? or '\\.\\.+'
-- 'class': an expression of the form '(c)' '.'?
-- 'module': an expression of the form '(m)' '.'?
-- 'package': an expression of the form '(p)' '.'?
-- 'current': an expression of the form '.'
+- 'ref': a regular, non-relative, reference
+- 'bad': a relative reference with invalid syntax
+- 'parent' and/or 'relname': a relative reference, where 'parent' matches the
+  parent prefix expression, if present (see `_RE_PARENT` for its subgroups), and
+  'relname' matches the relative path text and any final '.' character.
 """
 
 _RE_ID = re.compile("[a-zA-Z_][a-zA-Z0-9_.]*")
 """Regular expression that matches a qualified python identifier."""
 
 
+_EXTRA_KEY = "python_xref"
+"""Key of data for this package in the `extra` attribute of griffe objects."""
+
+DeferredError = tuple[int, str, str, tuple[str, ...]]
+"""Offset into docstring, kind, reference and message arguments of a deferred error."""
+
+MemberSelector = Callable[[Object, bool], Iterable[Union[Alias, Object]]]
+"""Function that selects which members of an object to visit.
+
+It is given an object and whether it is the root of the tree and
+returns the members that should be visited.
+"""
+
+
 def _always_ok(_ref: str) -> bool:
     return True
 
 
+def _is_builtin(ref: str) -> bool:
+    """Whether reference is a builtin name, which gets handled specially somehow, so is not checked."""
+    return ref in __builtins__  # type: ignore[operator]
+
+
+@lru_cache(maxsize=None)
+def _parse_parent(parent: str) -> tuple[str, str]:
+    """Returns kind of parent specifier and the text of its 'up' group, if any.
+
+    Relative references in a project use only a handful of distinct parent
+    specifiers, so these are parsed once rather than inspecting the groups of
+    every match.
+    """
+    match = cast(re.Match, re.fullmatch(_RE_PARENT, parent))
+    return cast(str, match.lastgroup), match["up"] or ""
+
+
+class _Context:
+    """Enclosing objects of an object, used to resolve parent specifiers in its docstring.
+
+    Each context is computed from that of the object's parent, so that
+    resolving a specifier does not have to walk up the tree.
+    """
+
+    __slots__ = ("ancestors", "cls", "module", "obj", "package")
+
+    obj: Object
+    ancestors: tuple[Object, ...]
+    """The object followed by its parents, up to the root"""
+    cls: Optional[Object]
+    """Innermost class containing the object, or the object if it is a class"""
+    module: Optional[Object]
+    """Innermost module containing the object, or the object if it is a module"""
+    package: Optional[Object]
+    """Object referred to by the '(p)' specifier"""
+
+    def __init__(self, obj: Object, parent: Optional[_Context]) -> None:
+        self.obj = obj
+        if parent is None:
+            self.ancestors = (obj,)
+            self.cls = self.module = None
+        else:
+            self.ancestors = (obj, *parent.ancestors)
+            self.cls = parent.cls
+            self.module = parent.module
+        if obj.is_class:
+            self.cls = obj
+        # griffe does not distinguish between modules and packages, so we identify a package
+        # as a module that contains other modules. A module that has no parent is considered to
+        # be a package even if it does not contain modules.
+        if obj.is_module:
+            self.module = obj
+            if any(member.kind is Kind.MODULE for member in obj.members.values()):
+                self.package = obj
+                return
+        self.package = self.module and (self.module.parent or self.module)
+
+
 class _RelativeCrossrefProcessor:
     """
     A callable object that can substitute relative cross-reference expressions.
 
-    This is intended to be used as a substitution function by `re.sub`
-    to process relative cross-references in a doc-string.
+    This is intended to be used as a substitution function by `re.sub` with
+    the `_RE_SCANNER` expression to process relative cross-references in a doc-string.
+    The same instance may be used for more than one docstring by calling `reset`.
+
+    If constructed with `defer_checks`, references are not checked and warnings are
+    not reported during substitution. Instead the references to check are accumulated
+    in `unchecked` and warnings are held until `report_deferred` is called.
+
+    Warnings are added to `diagnostics`, if given, and otherwise logged immediately.
     """
 
+    __slots__ = (
+        "_ancestors",
+        "_check_ref",
+        "_contexts",
+        "_cur_offset",
+        "_cur_ref",
+        "_cur_ref_parts",
+        "_deferred_errors",
+        "_diagnostics",
+        "_doc",
+        "_ok",
+        "_stats",
+        "matched",
+        "rewritten",
+        "unchecked",
+    )
+
     _doc: Docstring
-    _cur_match: re.Match | None
-    _cur_input: str
+    _ancestors: dict[tuple[Object, str], str]
+    _contexts: dict[Object, _Context]
     _cur_offset: int
+    _cur_ref: str
     _cur_ref_parts: List[str]
     _ok: bool
     _check_ref: Callable[[str], bool]
-
-    def __init__(self, doc: Docstring, checkref: Optional[Callable[[str], bool]] = None):
+    _deferred_errors: Optional[List[DeferredError]]
+    _diagnostics: Optional[DiagnosticsCollector]
+    _stats: Optional[CrossrefStats]
+    matched: int
+    """Number of crossrefs processed in the current docstring"""
+    rewritten: int
+    """Number of relative crossrefs rewritten in the current docstring"""
+    unchecked: List[tuple[int, str]]
+    """Offsets and values of references whose check has been deferred"""
+
+    def __init__(
+        self,
+        doc: Docstring,
+        checkref: Optional[Callable[[str], bool]] = None,
+        *,
+        defer_checks: bool = False,
+        diagnostics: Optional[DiagnosticsCollector] = None,
+        stats: Optional[CrossrefStats] = None,
+    ):
         self._doc = doc
-        self._cur_match = None
-        self._cur_input = ""
+        self._ancestors = {}
+        self._contexts = {}
         self._cur_offset = 0
+        self._cur_ref = ""
         self._cur_ref_parts = []
         self._check_ref = checkref or _always_ok
         self._ok = True
+        self._deferred_errors = [] if defer_checks else None
+        self._diagnostics = diagnostics
+        self._stats = stats
+        self.matched = 0
+        self.rewritten = 0
+        self.unchecked = []
+
+    @property
+    def doc(self) -> Docstring:
+        """The docstring being processed."""
+        return self._doc
+
+    @property
+    def stats(self) -> Optional[CrossrefStats]:
+        """Statistics to which processed docstrings are added, if any."""
+        return self._stats
+
+    def reset(self, doc: Docstring) -> None:
+        """Prepare to process another docstring, discarding any deferred state."""
+        self._doc = doc
+        self.matched = 0
+        self.rewritten = 0
+        if self._deferred_errors is not None:
+            self._deferred_errors = []
+        self.unchecked = []
 
     def __call__(self, match: re.Match) -> str:
         """
         Process a cross-reference expression.
 
-        This should be called with a match from the _RE_CROSSREF expression
+        This should be called with a match from the _RE_SCANNER expression
         which matches expression of the form [<title>][<ref>].
-        Group 1 matches the <title> and 2 the <ref>.
         """
-        self._start_match(match)
+        new_ref = self.resolve(match)
+
+        if match["nocheck"] is None and not _is_builtin(new_ref):
+            self._check(new_ref)
 
-        title = match[1]
-        ref = match[2]
+        if new_ref:
+            result = f"[{match['title']}][{new_ref}]"
+        else:
+            result = match[0]
 
-        checkref = self._check_ref
-        if ref.startswith("?"):
-            # Turn off cross-ref check
-            ref = ref[1:]
-            checkref = _always_ok
+        return result
 
-        new_ref = ""
+    def resolve(self, match: re.Match) -> str:
+        """Returns the full reference for a cross-reference expression without checking it.
 
-        # TODO support special syntax to turn off checking
+        Returns an empty string if a relative reference cannot be resolved,
+        in which case an error is reported or deferred.
+        """
+        self._cur_offset = match.start()
+        self._ok = True
+        self.matched += 1
+        self._cur_ref_parts.clear()
 
-        if not _RE_REL_CROSSREF.fullmatch(match.group(0)):
+        title = match["title"]
+        # A leading '?' turns off cross-ref check
+        check = match["nocheck"] is None
+        # text of reference following any '?'
+        self._cur_ref = match.string[match.end("title") + 3 - check:match.end() - 1]
+
+        ref = match["ref"]
+        if ref is not None:
             # Just a regular cross reference
-            new_ref = ref if ref else title
+            new_ref = ref or title
         else:
-            ref_match = _RE_REL.fullmatch(ref)
-            if ref_match is None:
-                self._error(f"Bad syntax in relative cross reference: '{ref}'")
+            new_ref = ""
+            bad = match["bad"]
+            if bad is not None:
+                self._error("bad-syntax")
             else:
-                self._process_parent_specifier(ref_match)
-                self._process_relname(ref_match)
-                self._process_append_from_title(ref_match, title)
+                self._process_parent_specifier(match)
+                self._process_relname(match)
+                self._process_append_from_title(match, title)
 
             if self._ok:
                 new_ref = '.'.join(self._cur_ref_parts)
+                self.rewritten += 1
                 logger.debug(
-                    "cross-reference substitution\nin %s:\n[%s][%s] -> [...][%s]",
-                    cast(Object, self._doc.parent).canonical_path, title, ref, new_ref
+                    "cross-reference substitution\nin %s:\n%s -> [...][%s]",
+                    cast(Object, self._doc.parent).canonical_path, match[0], new_ref
                 )
 
-        # builtin names get handled specially somehow, so don't check here
-        if new_ref not in __builtins__ and not checkref(new_ref):  # type: ignore[operator]
-            self._error(f"Cannot load reference '{new_ref}'")
+        return new_ref
 
-        if new_ref:
-            result = f"[{title}][{new_ref}]"
-        else:
-            result = match.group(0)
+    def report_deferred(self, valid: Collection[str]) -> None:
+        """Report warnings that were deferred during substitution.
 
-        return result
+        This should be called before the docstring value is modified, since
+        source locations are computed relative to the original value.
 
-    def _start_match(self, match: re.Match) -> None:
-        self._cur_match = match
-        self._cur_offset = match.start(0)
-        self._cur_input = match[0]
-        self._ok = True
-        self._cur_ref_parts.clear()
+        Arguments:
+            valid: collection of valid references. Deferred references not
+                in this collection will be reported as errors.
+        """
+        errors = self._deferred_errors or []
+        errors.extend(
+            (offset, "unknown-ref", ref, ())
+            for offset, ref in self.unchecked if ref not in valid
+        )
+        errors.sort(key=lambda error: error[0])
+        if errors:
+            locations = _source_map(self._doc).locations(error[0] for error in errors)
+            for (_, kind, ref, args), location in zip(errors, locations):
+                self._report(location, kind, ref, args)
+        self._deferred_errors = []
+        self.unchecked = []
+
+    @property
+    def deferred_errors(self) -> List[DeferredError]:
+        """Offsets, kinds, references and message arguments of errors that have been deferred"""
+        return list(self._deferred_errors or [])
+
+    def restore_deferred(self, errors: Iterable[DeferredError], unchecked: Iterable[tuple[int, str]]) -> None:
+        """Restore deferred errors and references, e.g. from a cached substitution."""
+        self._deferred_errors = list(errors)
+        self.unchecked = list(unchecked)
+
+    def _check(self, ref: str) -> None:
+        if self._deferred_errors is not None:
+            self.unchecked.append((self._cur_offset, ref))
+        elif not self._check_ref(ref):
+            self._error("unknown-ref", ref=ref)
 
     def _process_relname(self, ref_match: re.Match) -> None:
-        relname = ref_match.group("relname").strip(".")
+        relname = (ref_match.group("relname") or "").strip(".")
         if relname:
             self._cur_ref_parts.append(relname)
 
     def _process_append_from_title(self, ref_match: re.Match, title_text: str) -> None:
-        if ref_match.group(0).endswith("."):
+        if ref_match.group(0).endswith(".]"):
             id_from_title = title_text.strip("`*")
             if not _RE_ID.fullmatch(id_from_title):
-                self._error(f"Relative cross reference text is not a qualified identifier: '{id_from_title}'")
+                self._error("bad-title", id_from_title)
                 return
             self._cur_ref_parts.append(id_from_title)
 
     def _process_parent_specifier(self, ref_match: re.Match) -> None:
-        if not ref_match.group("parent"):
+        parent = ref_match.group("parent")
+        if not parent:
             return
 
         obj = self._doc.parent
         if obj is None:  # pragma: no cover
-            self._error("INTERNAL ERROR: docstring lacks a parent!")
+            self._error("no-parent")
             return
 
-        rel_obj = (
-            self._process_current_specifier(obj, ref_match)
-            or self._process_class_specifier(obj, ref_match)
-            or self._process_module_specifier(obj, ref_match)
-            or self._process_package_specifier(obj, ref_match)
-            or self._process_up_specifier(obj, ref_match)
-        )
+        # Many crossrefs in the same docstrings and its siblings use the same
+        # parent specifiers, so remember the paths they resolve to.
+        key = (obj, parent)
+        path = self._ancestors.get(key)
+        if path is not None:
+            self._cur_ref_parts.append(path)
+            return
+
+        kind, up = _parse_parent(parent)
+        context = self._context(obj)
+        rel_obj: Optional[Object] = None
+        if kind == "current":
+            rel_obj = self._process_current_specifier(context)
+        elif kind == "class":
+            rel_obj = self._process_class_specifier(context)
+        elif kind == "module":
+            rel_obj = self._process_module_specifier(context)
+        elif kind == "package":
+            rel_obj = self._process_package_specifier(context)
+        else:
+            rel_obj = self._process_up_specifier(context, up)
 
         if rel_obj is not None and self._ok:
-            self._cur_ref_parts.append(rel_obj.canonical_path)
-
-    def _process_current_specifier(self, obj: Object, ref_match: re.Match) -> Optional[Object]:
-        rel_obj: Object | None = None
-        if ref_match.group("current"):
-            if obj.is_function:
-                self._error(
-                    f"Cannot use '.' in function {obj.canonical_path}",
-                    just_warn=False
-                )
-            else:
-                rel_obj = obj
-        return rel_obj
-
-    def _process_class_specifier(self, obj: Object, ref_match: re.Match) -> Optional[Object]:
-        rel_obj: Object | None = None
-        if ref_match.group("class"):
-            rel_obj = obj
-            while not rel_obj.is_class:
-                rel_obj = rel_obj.parent
-                if rel_obj is None:
-                    self._error(f"{obj.canonical_path} not in a class")
-                    break
-        return rel_obj
-
-    def _process_module_specifier(self, obj: Object, ref_match: re.Match) -> Optional[Object]:
-        rel_obj: Object | None = None
-        if ref_match.group("module"):
-            rel_obj = obj
-            while not rel_obj.is_module:
-                rel_obj = rel_obj.parent
-                if rel_obj is None:  # pragma: no cover
-                    self._error(f"{obj.canonical_path} not in a module!")
-                    break
-        return rel_obj
-
-    def _process_package_specifier(self, obj: Object, ref_match: re.Match) -> Optional[Object]:
-        # griffe does not distinguish between modules and packages, so we identify a package
-        # as a module that contains other modules. A module that has no parent is considered to
-        # be a package even if it does not contain modules.
-        rel_obj: Object | None = None
-        if ref_match.group("package"):
-            rel_obj = obj
-            if rel_obj.is_module and rel_obj.modules:
-                # module contains modules, so it is a package
-                return rel_obj
-
-            while not rel_obj.is_module:
-                rel_obj = rel_obj.parent
-                if rel_obj is None:  # pragma: no cover
-                    self._error(f"{obj.canonical_path} not in a module!")
-                    break
-
-            if rel_obj is not None and rel_obj.parent is not None:  # pragma: no branch
-                # If module has no parent, we will treat it as a package
-                rel_obj = rel_obj.parent
-
-        return rel_obj
-
-    def _process_up_specifier(self, obj: Object, ref_match: re.Match) -> Optional[Object]:
-        rel_obj: Object | None = None
-        if ref_match.group("up"):
-            level = len(ref_match.group("up"))
-            rel_obj = obj
-            for _ in range(level):
-                if rel_obj.parent is not None:
-                    rel_obj = rel_obj.parent
-                else:
-                    self._error(f"'{ref_match.group('up')}' has too many levels for {obj.canonical_path}")
-                    break
-        return rel_obj
-
-    def _error(self, msg: str, just_warn: bool = False) -> None:
-        """Logs a warning for a specific crossref in a docstring.
+            path = rel_obj.canonical_path
+            self._ancestors[key] = path
+            self._cur_ref_parts.append(path)
+
+    def _context(self, obj: Object) -> _Context:
+        """Returns context of obj, computing it and those of any parents not seen yet."""
+        contexts = self._contexts
+        context = contexts.get(obj)
+        if context is None:
+            # Docstrings are mostly processed in preorder, so the parent's
+            # context is usually known already.
+            missing = []
+            parent: Optional[Object] = obj
+            while parent is not None and (context := contexts.get(parent)) is None:
+                missing.append(parent)
+                parent = parent.parent
+            for ancestor in reversed(missing):
+                context = contexts[ancestor] = _Context(ancestor, context)
+        return cast(_Context, context)
+
+    def _process_current_specifier(self, context: _Context) -> Optional[Object]:
+        if context.obj.is_function:
+            self._error("current-in-function", context.obj.canonical_path, just_warn=False)
+            return None
+        return context.obj
+
+    def _process_class_specifier(self, context: _Context) -> Optional[Object]:
+        if context.cls is None:
+            self._error("not-in-class", context.obj.canonical_path)
+        return context.cls
+
+    def _process_module_specifier(self, context: _Context) -> Optional[Object]:
+        if context.module is None:  # pragma: no cover
+            self._error("not-in-module", context.obj.canonical_path)
+        return context.module
+
+    def _process_package_specifier(self, context: _Context) -> Optional[Object]:
+        if context.package is None:  # pragma: no cover
+            self._error("not-in-module", context.obj.canonical_path)
+        return context.package
+
+    def _process_up_specifier(self, context: _Context, up: str) -> Optional[Object]:
+        ancestors = context.ancestors
+        if len(up) >= len(ancestors):
+            self._error("too-many-levels", up, context.obj.canonical_path)
+            return None
+        return ancestors[len(up)]
+
+    def _error(self, kind: str, *args: str, ref: Optional[str] = None, just_warn: bool = False) -> None:
+        """Reports a warning for a specific crossref in a docstring.
 
         This will include the filepath and line number if available.
 
         Arguments:
-            msg: the warning message to report
+            kind: the kind of warning, one of the keys of [MESSAGES][..diagnostics.]
+            *args: arguments used to format the message
+            ref: the reference in question, if not the reference as written
         """
-        doc = self._doc
-        parent = doc.parent
-        prefix = ""
-        if parent is not None:  # pragma: no branch
-            # We include the file:// prefix because it helps IDEs such as PyCharm
-            # recognize that this is a navigable location it can highlight.
-            prefix = f"file://{parent.filepath}:"
-            line, col = doc_value_offset_to_location(doc, self._cur_offset)
-            if line >= 0:
-                prefix += f"{line}:"
-                if col >= 0:
-                    prefix += f"{col}:"
-
-            prefix += " \n"
-
-        logger.warning(prefix + msg)
+        if ref is None:
+            ref = self._cur_ref
+        if self._deferred_errors is not None:
+            self._deferred_errors.append((self._cur_offset, kind, ref, args))
+        else:
+            self._report(doc_value_offset_to_location(self._doc, self._cur_offset), kind, ref, args)
 
         self._ok = just_warn
 
+    def _report(self, location: tuple[int, int], kind: str, ref: str, args: tuple[str, ...]) -> None:
+        parent = self._doc.parent
+        path = ""
+        if parent is not None:  # pragma: no branch
+            path = str(parent.filepath)
+        diagnostic = Diagnostic(path, *location, kind, ref, args=args)
+        if self._diagnostics is not None:
+            self._diagnostics.add(diagnostic)
+        else:
+            logger.warning(diagnostic.format())
+
 
 def substitute_relative_crossrefs(
     obj: Alias|Object,
     checkref: Optional[Callable[[str], bool]] = None,
-) -> None:
+    *,
+    check_many: Optional[Callable[[set[str]], set[str]]] = None,
+    processed: Optional[MutableSet[Docstring]] = None,
+    select_members: Optional[MemberSelector] = None,
+    cache: Optional[SubstitutionCache] = None,
+    diagnostics: Optional[DiagnosticsCollector] = None,
+    stats: Optional[CrossrefStats] = None,
+) -> int:
     """Recursively expand relative cross-references in all docstrings in tree.
 
+    Each object in the tree is only visited once, even if it can be reached
+    through more than one alias.
+
     Arguments:
         obj: a Griffe [Object][griffe.] whose docstrings should be modified
         checkref: optional function to check whether computed cross-reference is valid.
             Should return True if valid, False if not valid.
+        check_many: optional function to check many computed cross-references at once.
+            It is given the set of all references to check in the tree and should
+            return the subset that is valid. When specified, it is used instead
+            of `checkref`, and docstrings are only modified and warnings only
+            reported after it has been called.
+        processed: optional set of docstrings that have already been processed.
+            Docstrings in the set will be skipped, and docstrings that are processed
+            will be added to it. This can be used to avoid processing the same
+            docstrings again when the same tree is rendered more than once.
+        select_members: optional function that selects which members of each
+            object to visit, e.g. to skip members that will not be rendered.
+            By default, all members are visited.
+        cache: optional cache of substitution results. Docstrings whose results
+            are in the cache are not scanned again, but their references are
+            still checked. This implies batched checking as with `check_many`.
+        diagnostics: optional collector to which warnings are added instead
+            of being logged.
+        stats: optional statistics to which visited docstrings, crossrefs and
+            cache hits and misses are added.
+
+    Returns:
+        The number of duplicate visits to already visited objects that were avoided.
     """
-    if isinstance(obj, Alias):
-        try:
-            obj = obj.target
-        except GriffeError:
-            # If alias could not be resolved, it probably refers
-            # to an external package, not be documented.
-            return
+    walk = _DocstringWalk(obj, select_members)
+
+    if check_many is None and cache is None:
+        processor = _RelativeCrossrefProcessor(
+            Docstring(""), checkref=checkref, diagnostics=diagnostics, stats=stats)
+        deferred: Optional[_RelativeCrossrefProcessor] = None
+        for doc in _unprocessed(walk, processed, stats):
+            if (presubstituted := _presubstituted(doc)) is None:
+                doc.value = _substitute(processor, doc)
+                continue
+            # Already substituted at load time, only check references and report errors
+            if deferred is None:
+                deferred = _RelativeCrossrefProcessor(Docstring(""), defer_checks=True, diagnostics=diagnostics)
+            deferred.reset(presubstituted.original_docstring(doc))
+            deferred.restore_deferred(presubstituted.errors, presubstituted.refs)
+            refs = {ref for _, ref in presubstituted.refs}
+            deferred.report_deferred({ref for ref in refs if checkref is None or checkref(ref)})
+    else:
+        if check_many is None:
+            check_many = partial(_check_each, checkref or _always_ok)
+        processor = _RelativeCrossrefProcessor(
+            Docstring(""), defer_checks=True, diagnostics=diagnostics, stats=stats)
+        pending: list[tuple[Docstring, str, list[DeferredError], list[tuple[int, str]]]] = []
+        for doc in _unprocessed(walk, processed, stats):
+            if (presubstituted := _presubstituted(doc)) is not None:
+                # Report against original value, since the docstring was already modified.
+                pending.append((presubstituted.original_docstring(doc), *presubstituted[1:]))
+                continue
+            if "][" not in doc.value:
+                continue
+            if cache is None:
+                value = _substitute(processor, doc)
+                pending.append((doc, value, processor.deferred_errors, processor.unchecked))
+                continue
+            key = cache.key(doc)
+            if not (cached := cache.get(key)):
+                value = _substitute(processor, doc)
+                cached = cache.entry(value, processor.deferred_errors, processor.unchecked)
+                cache.put(key, cached)
+                if stats is not None:
+                    stats.cache_misses += 1
+            elif stats is not None:
+                stats.cache_hits += 1
+            pending.append((doc, *cached))
+
+        refs = {ref for *_, unchecked in pending for _, ref in unchecked}
+        valid = check_many(refs) if refs else set()
+
+        for doc, value, errors, unchecked in pending:
+            processor.reset(doc)
+            processor.restore_deferred(errors, unchecked)
+            processor.report_deferred(valid)
+            doc.value = value
+
+    if walk.duplicates:
+        logger.debug(
+            "avoided %d duplicate visits in %s", walk.duplicates, obj.path
+        )
+    return walk.duplicates
+
+
+class _Presubstituted(NamedTuple):
+    """Result of substituting relative crossrefs in a docstring at load time."""
+
+    original: str
+    """Value of docstring before substitution"""
+    value: str
+    """Value of docstring after substitution"""
+    errors: List[DeferredError]
+    """Deferred errors, with offsets into original value"""
+    refs: List[tuple[int, str]]
+    """Offsets into original value and references still to be checked"""
+
+    def original_docstring(self, doc: Docstring) -> Docstring:
+        """Copy of docstring with original value, for locating deferred errors."""
+        return Docstring(self.original, lineno=doc.lineno, endlineno=doc.endlineno, parent=doc.parent)
 
-    doc = obj.docstring
 
-    if doc is not None:
-        doc.value = _RE_CROSSREF.sub(_RelativeCrossrefProcessor(doc, checkref=checkref), doc.value)
+def presubstitute_relative_crossrefs(obj: Alias|Object, *, stats: Optional[CrossrefStats] = None) -> int:
+    """Substitute relative crossrefs in all docstrings in tree, deferring checks.
+
+    This is meant to be run once when a package is loaded, e.g. by the
+    [RelativeCrossrefsExtension][mkdocstrings_handlers.python_xref.extension.].
+    Docstrings are modified immediately, and the references still to check and
+    any errors are kept in the `extra` data of the docstrings' objects under
+    the "python_xref" key. When a modified docstring is later passed to
+    [substitute_relative_crossrefs][(m).], its references are checked and its
+    errors reported without scanning it again.
+
+    Each module in the tree also records the number of docstrings with crossrefs
+    in it and its submodules, which can be retrieved by [crossref_count][(m).].
+
+    Arguments:
+        obj: root of the tree, usually a top-level package
+        stats: optional statistics to which scanned docstrings and crossrefs are added.
+
+    Returns:
+        The number of docstrings that contained crossrefs.
+    """
+    processor = _RelativeCrossrefProcessor(Docstring(""), defer_checks=True, stats=stats)
+    counts: dict[str, int] = {}
+    for parent, doc in _DocstringWalk(obj):
+        value = doc.value
+        if "][" not in value or _presubstituted(doc) is not None:
+            continue
+        new_value = _substitute(processor, doc)
+        parent.extra[_EXTRA_KEY]["presubstituted"] = _Presubstituted(
+            value, new_value, processor.deferred_errors, processor.unchecked)
+        doc.value = new_value
+        module = parent
+        while not module.is_module and module.parent is not None:
+            module = module.parent
+        counts[module.path] = counts.get(module.path, 0) + 1
+
+    # Total counts for each module including submodules, in post order.
+    # Docstrings of re-exported objects are rendered with the module, but
+    # aliases cannot be resolved yet, so the count is unknown for such modules.
+    stack: list[tuple[Object, bool]] = [(obj.final_target if isinstance(obj, Alias) else obj, False)]
+    while stack:
+        module, children_done = stack.pop()
+        submodules = [m for m in module.modules.values() if not m.is_alias]
+        if children_done:
+            total: Optional[int] = counts.get(module.path, 0)
+            for submodule in submodules:
+                count = crossref_count(submodule)
+                total = None if total is None or count is None else total + count
+            if total is not None and any(_is_reexport(m) for m in module.members.values()):
+                total = None
+            module.extra[_EXTRA_KEY]["crossrefs"] = total
+        else:
+            stack.append((module, True))
+            stack.extend((cast(Object, m), False) for m in submodules)
+    return sum(counts.values())
+
+
+def _is_reexport(member: Alias|Object) -> bool:
+    """True if member is an alias that may be rendered as part of its module."""
+    if not member.is_alias:
+        return False
+    try:
+        return member.is_public and not member.is_module
+    except GriffeError:
+        return True
+
+
+def crossref_count(obj: Alias|Object) -> Optional[int]:
+    """Returns number of docstrings with crossrefs in module and its submodules.
+
+    This is only known for modules processed by [presubstitute_relative_crossrefs][(m).]
+    that do not re-export objects from other modules. Otherwise, it returns None.
+    """
+    try:
+        extra = obj.extra
+    except GriffeError:  # unresolvable alias
+        return None
+    return extra.get(_EXTRA_KEY, {}).get("crossrefs")
+
+
+def _presubstituted(doc: Docstring) -> Optional[_Presubstituted]:
+    """Returns result of substitution at load time if it applies to current value of doc."""
+    parent = doc.parent
+    if parent is None:
+        return None
+    presubstituted = parent.extra.get(_EXTRA_KEY, {}).get("presubstituted")
+    if presubstituted is None or presubstituted.value is not doc.value:
+        return None
+    return presubstituted
+
+
+def _original_value(doc: Docstring) -> str:
+    """Returns value of docstring before deferred or load time substitution, without triggering it."""
+    if isinstance(doc, _LazyDocstring):
+        return doc.original
+    presubstituted = _presubstituted(doc)
+    return presubstituted.original if presubstituted is not None else doc.value
+
+
+def _substitute(processor: _RelativeCrossrefProcessor, doc: Docstring) -> str:
+    """Returns value of docstring with crossrefs substituted by processor."""
+    value = doc.value
+    if "][" not in value:
+        return value
+    processor.reset(doc)
+    value = _RE_SCANNER.sub(processor, value)
+    if processor.stats is not None:
+        processor.stats.add_docstring(doc, processor.matched, processor.rewritten)
+    return value
+
+
+def _check_each(checkref: Callable[[str], bool], refs: set[str]) -> set[str]:
+    return {ref for ref in refs if checkref(ref)}
+
+
+def substitute_docstring_crossrefs(
+    doc: Docstring,
+    checkref: Optional[Callable[[str], bool]] = None,
+    *,
+    diagnostics: Optional[DiagnosticsCollector] = None,
+    stats: Optional[CrossrefStats] = None,
+) -> None:
+    """Expand relative cross-references in a single docstring.
+
+    This can be combined with [iter_docstrings][(m).] to process
+    a tree incrementally.
+
+    Arguments:
+        doc: docstring whose value should be modified. Relative references
+            are resolved with respect to its parent object.
+        checkref: optional function to check whether computed cross-reference is valid.
+            Should return True if valid, False if not valid.
+        diagnostics: optional collector to which warnings are added instead
+            of being logged.
+        stats: optional statistics to which the docstring and its crossrefs are
+            added. The time taken is added to its `substitute` timer.
+    """
+    processor = _RelativeCrossrefProcessor(doc, checkref=checkref, diagnostics=diagnostics, stats=stats)
+    if stats is None:
+        doc.value = _substitute(processor, doc)
+    else:
+        with stats.timer("substitute"):
+            doc.value = _substitute(processor, doc)
+
+
+def defer_relative_crossrefs(
+    obj: Alias|Object,
+    checkref: Optional[Callable[[str], bool]] = None,
+    *,
+    processed: Optional[MutableSet[Docstring]] = None,
+    select_members: Optional[MemberSelector] = None,
+    diagnostics: Optional[DiagnosticsCollector] = None,
+    stats: Optional[CrossrefStats] = None,
+) -> int:
+    """Arrange for relative cross-references in tree to be expanded on demand.
+
+    Unlike [substitute_relative_crossrefs][(m).], this does not process
+    any docstrings up front. Instead, each docstring in the tree is processed
+    the first time its value is read, e.g. when it is rendered, so that
+    docstrings that are never displayed are never processed.
+
+    Arguments:
+        obj: a Griffe [Object][griffe.] whose docstrings should be modified
+        checkref: optional function to check whether computed cross-reference is valid.
+            Should return True if valid, False if not valid.
+        processed: optional set of docstrings that have already been processed,
+            as in [substitute_relative_crossrefs][(m).].
+        select_members: optional function that selects which members of each
+            object to visit, as in [substitute_relative_crossrefs][(m).].
+        diagnostics: optional collector to which warnings are added instead
+            of being logged.
+        stats: optional statistics, as in [substitute_docstring_crossrefs][(m).].
+            Docstrings are counted as visited here, and as scanned when their
+            value is first read.
+
+    Returns:
+        The number of duplicate visits to already visited objects that were avoided.
+    """
+    walk = _DocstringWalk(obj, select_members)
+    substitute = partial(substitute_docstring_crossrefs, checkref=checkref, diagnostics=diagnostics, stats=stats)
+    for doc in _unprocessed(walk, processed, stats):
+        parent = doc.parent
+        if type(doc) is not Docstring:  # pylint: disable=unidiomatic-typecheck
+            continue
+        if parent is None or parent.docstring is not doc:
+            continue
+        parent.docstring = lazy = _LazyDocstring(doc, substitute)
+        if processed is not None:
+            processed.discard(doc)
+            processed.add(lazy)
+    return walk.duplicates
+
+
+class _LazyDocstring(Docstring):
+    """Docstring whose cross-references are substituted when its value is first read.
+
+    [defer_relative_crossrefs][(m).] replaces the docstrings of objects by copies
+    of this class. Until `value` is first read, the original value is kept
+    together with the function that substitutes it. If that function raises,
+    the original value is kept and substitution is tried again on the next read.
+    """
+
+    def __init__(self, doc: Docstring, substitute: Callable[[Docstring], None]) -> None:
+        # pylint: disable=super-init-not-called
+        self.__dict__.update(doc.__dict__)
+        self._xref_substitute: Optional[Callable[[Docstring], None]] = substitute
+        self.original: str = doc.value
+        """Value before substitution"""
+
+    @property  # type: ignore[override]
+    def value(self) -> str:
+        substitute = self._xref_substitute
+        if substitute is not None:
+            self._xref_substitute = None
+            try:
+                substitute(self)
+            except BaseException:
+                self._xref_substitute = substitute
+                raise
+        return self.__dict__["value"]
+
+    @value.setter
+    def value(self, value: str) -> None:
+        self.__dict__["value"] = value
+
+    @property
+    def pending(self) -> bool:
+        """Whether cross-references have not been substituted yet"""
+        return self._xref_substitute is not None
+
+
+class CrossrefRecord:
+    """A cross-reference found by [iter_crossrefs][(m).]."""
+
+    __slots__ = ("error", "kind", "offset", "path", "ref", "resolved", "title", "valid")
+
+    path: str
+    """Path of the object whose docstring contains the cross-reference"""
+    offset: int
+    """Offset of the cross-reference in the docstring value before any substitution"""
+    title: str
+    """Title of the cross-reference"""
+    ref: str
+    """Reference as written, including any leading '?'"""
+    resolved: str
+    """Full reference, or empty string if a relative reference cannot be resolved"""
+    kind: str
+    """One of [RELATIVE_KINDS][(m).] for relative references, 'absolute' for
+    regular references or 'invalid' for relative references with bad syntax"""
+    valid: Optional[bool]
+    """Whether the reference exists, or None if it was not checked"""
+    error: str
+    """Kind of error that prevented resolving the reference, or empty string"""
+
+    def __init__(
+        self,
+        path: str,
+        offset: int,
+        title: str,
+        ref: str,
+        *,
+        resolved: str,
+        kind: str,
+        valid: Optional[bool] = None,
+        error: str = "",
+    ) -> None:
+        self.path = path
+        self.offset = offset
+        self.title = title
+        self.ref = ref
+        self.resolved = resolved
+        self.kind = kind
+        self.valid = valid
+        self.error = error
+
+    def __repr__(self) -> str:
+        return (
+            f"CrossrefRecord({self.path!r}, {self.offset}, {self.title!r}, {self.ref!r},"
+            f" resolved={self.resolved!r}, kind={self.kind!r}, valid={self.valid!r}, error={self.error!r})"
+        )
+
+
+RELATIVE_KINDS = ("current", "class", "module", "package", "up")
+"""Kinds of relative reference by parent specifier, see `_RE_PARENT`.
+
+Relative references without a parent specifier, such as `[foo][bar.]`,
+have kind 'name'.
+"""
+
+
+def iter_crossrefs(
+    obj: Alias|Object,
+    checkref: Optional[Callable[[str], bool]] = None,
+    *,
+    select_members: Optional[MemberSelector] = None,
+) -> Iterator[CrossrefRecord]:
+    """Lazily iterate over all cross-references in docstrings in tree.
+
+    Unlike [substitute_relative_crossrefs][(m).], this does not modify any
+    docstrings or report any warnings, so it can be used to analyze the
+    cross-references in a tree without rendering it. Problems are instead
+    described by the `valid` and `error` attributes of each record.
+
+    Docstrings whose substitution was deferred by [defer_relative_crossrefs][(m).]
+    or done at load time by [presubstitute_relative_crossrefs][(m).] are read
+    as they were before substitution, without triggering it.
+
+    Arguments:
+        obj: root of the tree, visited as in [iter_docstrings][(m).]
+        checkref: optional function to check whether resolved references are valid.
+            References whose check is disabled by a leading '?' are not checked.
+        select_members: optional function that selects which members of each
+            object to visit, as in [iter_docstrings][(m).].
+
+    Yields:
+        A record for each cross-reference, in order of docstrings and then offsets.
+    """
+    processor = _RelativeCrossrefProcessor(Docstring(""), defer_checks=True)
+    for parent, doc in _DocstringWalk(obj, select_members):
+        value = _original_value(doc)
+        if "][" not in value:
+            continue
+        processor.reset(doc)
+        errors = cast(List[DeferredError], processor._deferred_errors)  # pylint: disable=protected-access
+        path = parent.path
+        for match in _RE_SCANNER.finditer(value):
+            reported = len(errors)
+            resolved = processor.resolve(match)
+            error = ""
+            if not resolved and match["ref"] is None:
+                error = errors[-1][1] if len(errors) > reported else "no-parent"
+            if match["ref"] is not None:
+                kind = "absolute"
+            elif match["bad"] is not None:
+                kind = "invalid"
+            else:
+                kind = next((k for k in RELATIVE_KINDS if match[k]), "name")
+            valid: Optional[bool] = None
+            if error:
+                valid = False
+            elif checkref is not None and match["nocheck"] is None and not _is_builtin(resolved):
+                valid = checkref(resolved)
+            yield CrossrefRecord(
+                path,
+                match.start(),
+                match["title"],
+                match.string[match.end("title") + 2:match.end() - 1],
+                resolved=resolved,
+                kind=kind,
+                valid=valid,
+                error=error,
+            )
+
+
+def iter_docstrings(
+    obj: Alias|Object,
+    select_members: Optional[MemberSelector] = None,
+) -> Iterator[tuple[Object, Docstring]]:
+    """Lazily iterate over all docstrings in tree.
+
+    Objects are visited in preorder. Aliases are replaced by their targets, and
+    each target object is only visited once, even if it is reachable from more
+    than one alias. Unresolvable aliases are skipped.
+
+    The tree is walked with an explicit stack, so arbitrarily deep trees
+    will not exceed the recursion limit.
+
+    Arguments:
+        obj: root of the tree
+        select_members: optional function that selects which members of each
+            object to visit. By default, all members are visited.
+
+    Yields:
+        Tuples of object and its docstring, for every object in tree that has a docstring.
+    """
+    return iter(_DocstringWalk(obj, select_members))
+
+
+def _unprocessed(
+    docs: Iterable[tuple[Object, Docstring]],
+    processed: Optional[MutableSet[Docstring]],
+    stats: Optional[CrossrefStats] = None,
+) -> Iterator[Docstring]:
+    """Yields docstrings that are not in `processed` and adds them to it"""
+    for _, doc in docs:
+        if processed is not None:
+            if doc in processed:
+                continue
+            processed.add(doc)
+        if stats is not None:
+            stats.docstrings += 1
+        yield doc
+
+
+class _DocstringWalk:
+    """Iterable over the objects with docstrings in a tree in preorder.
+
+    Aliases are replaced by their targets, and each target is only visited once,
+    keyed by its canonical path. This keeps the walk linear in the number of
+    unique objects and guards against cycles of aliases.
+    """
+
+    visited: set[str]
+    """Canonical paths of objects that have been visited"""
+    duplicates: int
+    """Number of visits to already visited objects that were skipped"""
+
+    def __init__(self, obj: Alias|Object, select_members: Optional[MemberSelector] = None):
+        self._root = obj
+        self._select_members = select_members
+        self.visited = set()
+        self.duplicates = 0
+
+    def __iter__(self) -> Iterator[tuple[Object, Docstring]]:
+        visited = self.visited
+        select_members = self._select_members
+        stack: list[tuple[Alias|Object, bool]] = [(self._root, True)]
+        while stack:
+            obj, is_root = stack.pop()
+            if isinstance(obj, Alias):
+                try:
+                    obj = obj.final_target
+                except GriffeError:
+                    # If alias could not be resolved, it probably refers
+                    # to an external package, not be documented.
+                    continue
+
+            path = obj.canonical_path
+            if path in visited:
+                self.duplicates += 1
+                continue
+            visited.add(path)
+
+            if obj.docstring is not None:
+                yield obj, obj.docstring
+
+            if select_members is None:
+                members = list(obj.members.values())
+            else:
+                members = list(select_members(obj, is_root))
+            # push in reverse so that members are visited in order
+            stack.extend(
+                (member, False) for member in reversed(members)
+                if isinstance(member, (Alias,Object))
+            )
 
-    for member in obj.members.values():
-        if isinstance(member, (Alias,Object)):  # pragma: no branch
-            substitute_relative_crossrefs(member, checkref=checkref)
 
 def doc_value_offset_to_location(doc: Docstring, offset: int) -> tuple[int,int]:
     """
@@ -353,46 +1089,133 @@ def doc_value_offset_to_location(doc: Docstring, offset: int) -> tuple[int,int]:
     Returns:
         line and column or else (-1,-1) if it cannot be computed
     """
-    linenum = -1
-    colnum = -2
+    return _source_map(doc).location(offset)
+
+
+class _DocstringSourceMap:
+    """Maps offsets into the value of a docstring to locations in its source file.
+
+    Everything that does not depend on the offset, including the raw value of the
+    docstring literal, is computed once on construction, so that locating many
+    offsets in the same docstring is cheap.
+    """
 
-    if doc.lineno is not None:
-        linenum = doc.lineno # start of the docstring source
-        # line offset with respect to start of cleaned up docstring
-        lineoffset = clean_lineoffset = doc.value.count("\n", 0, offset)
+    __slots__ = (
+        "_clean_lines",
+        "_indent_deltas",
+        "_leading_lines",
+        "_line_starts",
+        "_lineno",
+        "_parent",
+        "_raw_lines",
+        "_same_line_prefix",
+        "_value",
+    )
 
-        # look at original doc source, if available
+    def __init__(self, doc: Docstring) -> None:
+        value = doc.value
+        self._value = value
+        self._parent = doc.parent
+        self._lineno = doc.lineno
+        self._line_starts = [0]
+        self._line_starts.extend(i + 1 for i, c in enumerate(value) if c == "\n")
+        # Set when raw docstring is available
+        self._raw_lines: Optional[List[str]] = None
+        self._clean_lines: List[str] = []
+        self._leading_lines = 0
+        self._same_line_prefix: Optional[int] = None
+        self._indent_deltas: dict[int, Optional[int]] = {}
+
+        if doc.lineno is None:
+            return
         try:
             source = doc.source
             # compute docstring without cleaning up spaces and indentation
             rawvalue = str(safe_eval(source))
+        except Exception:
+            # Don't expect to get here, but just in case, it is better to
+            # not fix up the line/column than to die.
+            return
+        # number of lines removed from front of docstring
+        self._leading_lines = leading_space(rawvalue).count("\n")
+        if m := re.match(r"(\s*['\"]{1,3}\s*)\S", source):
+            # length of text before first line of docstring, if on same line as opening quote
+            self._same_line_prefix = len(m.group(1))
+        self._raw_lines = rawvalue.splitlines()
+        self._clean_lines = value.splitlines()
+
+    def is_valid_for(self, doc: Docstring) -> bool:
+        """True if map was computed for the current state of the docstring."""
+        return self._value is doc.value and self._parent is doc.parent and self._lineno == doc.lineno
+
+    def location(self, offset: int) -> tuple[int, int]:
+        """Returns line and column in source file of offset into docstring value.
+
+        Returns:
+            line and column or else (-1,-1) if it cannot be computed
+        """
+        return self._location(offset, bisect_right(self._line_starts, offset) - 1)
 
-            # adjust line offset by number of lines removed from front of docstring
-            lineoffset += leading_space(rawvalue).count("\n")
+    def locations(self, offsets: Iterable[int]) -> List[tuple[int, int]]:
+        """Returns line and column in source file for each offset into docstring value.
 
-            if lineoffset == 0 and (m := re.match(r"(\s*['\"]{1,3}\s*)\S", source)):
-                # is on the same line as opening quote
-                colnum = offset + len(m.group(1))
+        Offsets are resolved in a single pass in sorted order.
+        """
+        offsets = list(offsets)
+        results: List[tuple[int, int]] = [(-1, -1)] * len(offsets)
+        line_starts = self._line_starts
+        nlines = len(line_starts)
+        line = 0
+        for i in sorted(range(len(offsets)), key=offsets.__getitem__):
+            offset = offsets[i]
+            while line + 1 < nlines and line_starts[line + 1] <= offset:
+                line += 1
+            results[i] = self._location(offset, line)
+        return results
+
+    def _location(self, offset: int, clean_lineoffset: int) -> tuple[int, int]:
+        if self._lineno is None:
+            return -1, -1
+        if self._raw_lines is None:
+            return self._lineno + clean_lineoffset, -1
+
+        lineoffset = clean_lineoffset + self._leading_lines
+        if lineoffset == 0 and self._same_line_prefix is not None:
+            colnum = offset + self._same_line_prefix
+        else:
+            delta = self._indent_delta(clean_lineoffset)
+            if delta is None:
+                colnum = -2
             else:
-                # indentation of first non-empty line in raw and cleaned up strings
-                raw_line = rawvalue.splitlines()[lineoffset]
-                clean_line = doc.value.splitlines()[clean_lineoffset]
-                raw_indent = len(leading_space(raw_line))
-                clean_indent = len(leading_space(clean_line))
-                try:
-                    linestart = doc.value.rindex("\n", 0, offset) + 1
-                except ValueError: # pragma: no cover
-                    linestart = 0 # paranoid check, should not really happen
-                colnum = offset - linestart + raw_indent - clean_indent
+                colnum = offset - self._line_starts[clean_lineoffset] + delta
+        return self._lineno + lineoffset, colnum + 1
 
-        except Exception:
-            # Don't expect to get here, but just in case, it is better to
-            # not fix up the line/column than to die.
+    def _indent_delta(self, clean_lineoffset: int) -> Optional[int]:
+        """Difference between indentation of line in raw and cleaned up docstring."""
+        try:
+            return self._indent_deltas[clean_lineoffset]
+        except KeyError:
+            pass
+        delta: Optional[int] = None
+        try:
+            raw_line = cast(List[str], self._raw_lines)[clean_lineoffset + self._leading_lines]
+            clean_line = self._clean_lines[clean_lineoffset]
+            delta = len(leading_space(raw_line)) - len(leading_space(clean_line))
+        except IndexError:
             pass
+        self._indent_deltas[clean_lineoffset] = delta
+        return delta
+
+
+_source_maps: WeakKeyDictionary[Docstring, _DocstringSourceMap] = WeakKeyDictionary()
 
-        linenum += lineoffset
 
-    return linenum, colnum + 1
+def _source_map(doc: Docstring) -> _DocstringSourceMap:
+    """Returns source map for docstring, computing it on first use."""
+    source_map = _source_maps.get(doc)
+    if source_map is None or not source_map.is_valid_for(doc):
+        source_map = _source_maps[doc] = _DocstringSourceMap(doc)
+    return source_map
 
 
 def leading_space(s: str) -> str:
@@ -401,12 +1224,8 @@ def leading_space(s: str) -> str:
         return m[0]
     return "" # pragma: no cover
 
-if sys.version_info < (3, 10) or True:
-    # TODO: remove when 3.9 support is dropped
-    # In 3.9, literal_eval cannot handle comments in input
-    def safe_eval(s: str) -> Any:
-        """Safely evaluate a string expression."""
-        return eval(s) #eval(s, dict(__builtins__={}), {})
-else:
-    save_eval = ast.literal_eval
 
+def safe_eval(s: str) -> Any:
+    """Safely evaluate a string literal expression, which may span lines and contain comments."""
+    # Parenthesize so that continuation lines and trailing comments are allowed.
+    return ast.literal_eval(ast.parse(f"(\n{s}\n)", mode="eval"))
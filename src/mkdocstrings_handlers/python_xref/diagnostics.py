@@ -0,0 +1,227 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Collection and reporting of crossref diagnostics."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from mkdocstrings import get_logger
+
+__all__ = [
+    "MESSAGES",
+    "Diagnostic",
+    "DiagnosticsCollector",
+]
+
+logger = get_logger(__name__)
+
+MESSAGES: dict[str, str] = {
+    "unknown-ref": "Cannot load reference '{ref}'",
+    "bad-syntax": "Bad syntax in relative cross reference: '{ref}'",
+    "bad-title": "Relative cross reference text is not a qualified identifier: '{0}'",
+    "current-in-function": "Cannot use '.' in function {0}",
+    "not-in-class": "{0} not in a class",
+    "not-in-module": "{0} not in a module!",
+    "too-many-levels": "'{0}' has too many levels for {1}",
+    "no-parent": "INTERNAL ERROR: docstring lacks a parent!",
+}
+"""Message format for each kind of diagnostic.
+
+Messages are formatted with the reference as the `ref` keyword and the
+diagnostic's `args` as positional arguments.
+"""
+
+
+class Diagnostic:
+    """A problem with a cross-reference in a docstring."""
+
+    __slots__ = ("args", "col", "kind", "line", "path", "ref")
+
+    path: str
+    """Source file path, or empty if not known"""
+    line: int
+    """Line number in source file, or -1 if not known"""
+    col: int
+    """Column number in source file starting at 1, or -1 if not known"""
+    kind: str
+    """Kind of problem, one of the keys in `MESSAGES`"""
+    ref: str
+    """The reference in question"""
+    args: tuple[str, ...]
+    """Additional details used to format the message"""
+
+    def __init__(
+        self,
+        path: str,
+        line: int,
+        col: int,
+        kind: str,
+        ref: str,
+        *,
+        args: tuple[str, ...] = (),
+    ) -> None:
+        self.path = path
+        self.line = line
+        self.col = col
+        self.kind = kind
+        self.ref = ref
+        self.args = args
+
+    def key(self) -> tuple[str, int, int, str, str, tuple[str, ...]]:
+        """Tuple of all fields used for sorting and comparison."""
+        return self.path, self.line, self.col, self.kind, self.ref, self.args
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Diagnostic) and self.key() == other.key()
+
+    def __hash__(self) -> int:
+        return hash(self.key())
+
+    def __repr__(self) -> str:
+        return f"Diagnostic{self.key()!r}"
+
+    @property
+    def message(self) -> str:
+        """Message describing the problem, without location."""
+        return MESSAGES[self.kind].format(*self.args, ref=self.ref)
+
+    def format(self) -> str:
+        """Message including location prefix, as logged."""
+        prefix = ""
+        if self.path:
+            # We include the file:// prefix because it helps IDEs such as PyCharm
+            # recognize that this is a navigable location it can highlight.
+            prefix = f"file://{self.path}:"
+            if self.line >= 0:
+                prefix += f"{self.line}:"
+                if self.col >= 0:
+                    prefix += f"{self.col}:"
+            prefix += " \n"
+        return prefix + self.message
+
+    def to_dict(self) -> dict[str, Any]:
+        """Representation as dictionary for JSON output."""
+        return {
+            "path": self.path,
+            "line": self.line,
+            "col": self.col,
+            "kind": self.kind,
+            "ref": self.ref,
+            "message": self.message,
+        }
+
+
+class DiagnosticsCollector:
+    """Accumulates diagnostics so they can be reported once at the end of a build.
+
+    Identical diagnostics, e.g. from a docstring rendered more than once,
+    are only kept once.
+    """
+
+    def __init__(self) -> None:
+        self._diagnostics: set[Diagnostic] = set()
+
+    def __len__(self) -> int:
+        return len(self._diagnostics)
+
+    def __iter__(self) -> Iterator[Diagnostic]:
+        """Iterates over diagnostics in sorted order."""
+        return iter(sorted(self._diagnostics, key=Diagnostic.key))
+
+    def add(self, diagnostic: Diagnostic) -> None:
+        """Record diagnostic."""
+        self._diagnostics.add(diagnostic)
+
+    def clear(self) -> None:
+        """Forget all recorded diagnostics."""
+        self._diagnostics.clear()
+
+    def emit(self, report_file: Optional[Path] = None) -> int:
+        """Log recorded diagnostics as warnings in sorted order and then clear them.
+
+        Arguments:
+            report_file: if specified, the diagnostics are also written to this file.
+                This will be in [SARIF] format if the file name ends in `.sarif`
+                and in JSON otherwise.
+
+        Returns:
+            The number of diagnostics that were emitted.
+
+        [SARIF]: https://docs.oasis-open.org/sarif/sarif/v2.1.0/sarif-v2.1.0.html
+        """
+        diagnostics = list(self)
+        for diagnostic in diagnostics:
+            logger.warning(diagnostic.format())
+        if report_file is not None:
+            self.write(report_file)
+        self.clear()
+        return len(diagnostics)
+
+    def write(self, report_file: Path) -> None:
+        """Write recorded diagnostics to file in sorted order.
+
+        The file is in [SARIF] format if its name ends in `.sarif` and in JSON otherwise.
+
+        [SARIF]: https://docs.oasis-open.org/sarif/sarif/v2.1.0/sarif-v2.1.0.html
+        """
+        diagnostics = list(self)
+        if report_file.suffix == ".sarif":
+            data = _sarif(diagnostics)
+        else:
+            data = {"diagnostics": [d.to_dict() for d in diagnostics]}
+        report_file.parent.mkdir(parents=True, exist_ok=True)
+        report_file.write_text(json.dumps(data, indent=2), encoding="utf8")
+
+
+def _sarif(diagnostics: list[Diagnostic]) -> dict[str, Any]:
+    """Returns SARIF 2.1.0 log for diagnostics."""
+    results = []
+    for diagnostic in diagnostics:
+        result: dict[str, Any] = {
+            "ruleId": diagnostic.kind,
+            "level": "warning",
+            "message": {"text": diagnostic.message},
+        }
+        if diagnostic.path:
+            region: dict[str, int] = {}
+            if diagnostic.line > 0:
+                region["startLine"] = diagnostic.line
+                if diagnostic.col > 0:
+                    region["startColumn"] = diagnostic.col
+            path = Path(diagnostic.path)
+            uri = path.as_uri() if path.is_absolute() else path.as_posix()
+            location: dict[str, Any] = {"artifactLocation": {"uri": uri}}
+            if region:
+                location["region"] = region
+            result["locations"] = [{"physicalLocation": location}]
+        results.append(result)
+    return {
+        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        "version": "2.1.0",
+        "runs": [
+            {
+                "tool": {
+                    "driver": {
+                        "name": "mkdocstrings-python-xref",
+                        "informationUri": "https://github.com/analog-garage/mkdocstrings-python-xref",
+                        "rules": [{"id": kind} for kind in sorted({d.kind for d in diagnostics})],
+                    }
+                },
+                "results": results,
+            }
+        ],
+    }
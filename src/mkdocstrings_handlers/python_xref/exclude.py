@@ -0,0 +1,151 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Matching of references against **check_crossrefs_exclude** patterns."""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Iterable, Optional, Union, cast
+
+__all__ = [
+    "ExcludeMatcher",
+    "exclude_matcher",
+]
+
+ExcludePattern = Union[str, re.Pattern]
+
+_RE_TRAILING_WILDCARD = re.compile(r"(?:\.\*|\(\.\*\)|\(\?:\.\*\))\$?\Z")
+"""Trailing expression that matches anything, as in `^torch\\.(.*)`."""
+
+_RE_LITERAL = re.compile(r"(?:[^\\.^$*+?{}\[\]|()]|\\[^A-Za-z0-9])*")
+"""Expression containing no unescaped regular expression metacharacters."""
+
+_RE_UNESCAPE = re.compile(r"\\(.)")
+
+_RE_UNCOMBINABLE = re.compile(r"\\[1-9]|\(\?P=|\(\?[aiLmsux]+\)")
+"""Backreferences and global flags, which would not work in a combined expression."""
+
+_TERMINAL = ""
+"""Key of trie nodes at which a prefix ends. Never a single character of a reference."""
+
+
+def _literal_prefix(pattern: ExcludePattern) -> Optional[str]:
+    """Returns literal text that pattern matches all references starting with, if any.
+
+    Such patterns consist of literal text, optionally starting with `^` and
+    ending with an expression that matches anything, such as `.*`.
+    """
+    if isinstance(pattern, re.Pattern):
+        if pattern.flags & ~re.UNICODE:
+            return None
+        pattern = pattern.pattern
+    text = cast(str, pattern)
+    if text.startswith("^"):
+        text = text[1:]
+    text = _RE_TRAILING_WILDCARD.sub("", text)
+    if not text or not _RE_LITERAL.fullmatch(text):
+        return None
+    return _RE_UNESCAPE.sub(r"\1", text)
+
+
+class ExcludeMatcher:
+    """Compiled matcher for a sequence of exclusion patterns.
+
+    A reference is excluded if any pattern matches at its start, as with `re.match`.
+    Patterns that just match a literal prefix are put into a character trie, and
+    the remaining patterns are combined into a single alternation, so each
+    reference is matched in at most two passes regardless of the number of
+    patterns. Results are memoized per reference.
+    """
+
+    def __init__(self, patterns: Iterable[ExcludePattern]) -> None:
+        self._patterns = tuple(patterns)
+        self._trie: dict[str, dict] = {}
+        self._regexes: list[re.Pattern] = []
+        self._memo: dict[str, bool] = {}
+
+        combinable: list[str] = []
+        for pattern in self._patterns:
+            prefix = _literal_prefix(pattern)
+            if prefix is not None:
+                self._add_prefix(prefix)
+            elif isinstance(pattern, re.Pattern) and (pattern.flags & ~re.UNICODE):
+                self._regexes.append(pattern)
+            else:
+                text: str = pattern.pattern if isinstance(pattern, re.Pattern) else pattern
+                if _RE_UNCOMBINABLE.search(text):
+                    self._regexes.append(re.compile(text))
+                else:
+                    combinable.append(text)
+
+        if combinable:
+            try:
+                self._regexes.insert(0, re.compile("|".join(f"(?:{text})" for text in combinable)))
+            except re.error:
+                # e.g. duplicate group names or misplaced global flags
+                self._regexes[:0] = [re.compile(text) for text in combinable]
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def __call__(self, ref: str) -> bool:
+        """Returns true if reference matches any exclusion pattern."""
+        excluded = self._memo.get(ref)
+        if excluded is None:
+            excluded = self._match_prefix(ref) or any(regex.match(ref) for regex in self._regexes)
+            self._memo[ref] = excluded
+        return excluded
+
+    @property
+    def patterns(self) -> tuple[ExcludePattern, ...]:
+        """The patterns from which the matcher was compiled."""
+        return self._patterns
+
+    def _add_prefix(self, prefix: str) -> None:
+        node = self._trie
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[_TERMINAL] = {}
+
+    def _match_prefix(self, ref: str) -> bool:
+        node = self._trie
+        if not node:
+            return False
+        for char in ref:
+            if _TERMINAL in node:
+                return True
+            next_node = node.get(char)
+            if next_node is None:
+                return False
+            node = next_node
+        return _TERMINAL in node
+
+
+def exclude_matcher(patterns: Iterable[ExcludePattern]) -> ExcludeMatcher:
+    """Returns matcher for exclusion patterns.
+
+    The same matcher, along with its memoized results, is returned for every
+    distinct sequence of patterns.
+    """
+    return _cached_matcher(
+        tuple((p.pattern, p.flags) if isinstance(p, re.Pattern) else p for p in patterns)
+    )
+
+
+@lru_cache(maxsize=256)
+def _cached_matcher(key: tuple[Union[str, tuple[str, int]], ...]) -> ExcludeMatcher:
+    return ExcludeMatcher(
+        re.compile(p[0], p[1]) if isinstance(p, tuple) else p for p in key
+    )
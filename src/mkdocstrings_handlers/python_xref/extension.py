@@ -0,0 +1,71 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Griffe extension that substitutes relative crossrefs when packages are loaded."""
+
+from __future__ import annotations
+
+from typing import Any, Collection, Optional
+
+from griffe import Extension, GriffeLoader, Module
+
+from .crossref import presubstitute_relative_crossrefs
+from .stats import CrossrefStats
+
+__all__ = [
+    "RelativeCrossrefsExtension",
+]
+
+
+class RelativeCrossrefsExtension(Extension):
+    """Substitutes relative crossrefs in each package once, right after it is loaded.
+
+    Docstrings are rewritten by [presubstitute_relative_crossrefs][..crossref.],
+    which keeps the references still to be checked and any errors with the
+    docstrings' objects, so that they can be checked and reported when the
+    objects are rendered. Each module also records how many of its docstrings
+    contain crossrefs, so that rendering can skip modules without any.
+
+    The handler adds this extension itself when the `load_time_crossrefs`
+    option is enabled, limited to the packages it documents, so that packages
+    only loaded to resolve aliases or check references are left alone.
+    """
+
+    def __init__(
+        self,
+        stats: Optional[CrossrefStats] = None,
+        only: Optional[Collection[str]] = None,
+    ) -> None:
+        """
+        Arguments:
+            stats: optional statistics to which scanned docstrings, crossrefs
+                and substitution time are added.
+            only: names of the top-level packages to process, or None for all.
+                This is consulted when each package is loaded, so it may be
+                filled in as packages are requested.
+        """
+        super().__init__()
+        self.stats = stats
+        self.only = only
+        self.packages = 0
+        """Number of packages processed"""
+
+    def on_package_loaded(self, *, pkg: Module, loader: GriffeLoader, **kwargs: Any) -> None:
+        if self.only is not None and pkg.name not in self.only:
+            return
+        self.packages += 1
+        if self.stats is None:
+            presubstitute_relative_crossrefs(pkg)
+        else:
+            with self.stats.timer("substitute"):
+                presubstitute_relative_crossrefs(pkg, stats=self.stats)
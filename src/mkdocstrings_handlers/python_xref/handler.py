@@ -19,24 +19,49 @@ from __future__ import annotations
 
 import re
 import sys
+import sysconfig
+import time
 from dataclasses import dataclass, field, fields
-from functools import partial
+from functools import lru_cache, partial
+from itertools import groupby
+from pkgutil import iter_modules
 from pathlib import Path
-from typing import Any, ClassVar, Mapping, MutableMapping, Optional
+from types import ModuleType
+from typing import Any, ClassVar, Collection, Hashable, Iterable, Mapping, MutableMapping, Optional, Sequence
 from warnings import warn
+from weakref import WeakSet
 
+from griffe import Alias, Docstring, GriffeError, Object
 from mkdocs.config.defaults import MkDocsConfig
+from mkdocs.exceptions import PluginError
 from mkdocstrings import CollectorItem, get_logger
-from mkdocstrings_handlers.python import PythonHandler, PythonOptions, PythonConfig
+from mkdocstrings_handlers.python import PythonHandler, PythonOptions, PythonConfig, do_filter_objects
 
-from .crossref import substitute_relative_crossrefs
+from .cache import SubstitutionCache
+from .crossref import MemberSelector, crossref_count, defer_relative_crossrefs, substitute_relative_crossrefs
+from .diagnostics import DiagnosticsCollector
+from .exclude import ExcludeMatcher, exclude_matcher
+from .extension import RelativeCrossrefsExtension
+from .incremental import SourceStamps
+from .index import NameIndex
+from .inventory import InventoryIndex
+from .stats import CrossrefStats
 
 __all__ = [
+    'CHECK_SCOPES',
     'PythonRelXRefHandler'
 ]
 
 logger = get_logger(__name__)
 
+CHECK_SCOPES = ("loaded", "paths", "all")
+"""Values of the `check_crossrefs_scope` option, from narrowest to widest.
+
+* **loaded**: only check references into packages that are already loaded
+* **paths**: also load packages found in the handler's configured `paths`
+* **all**: load any package that can be found in order to check a reference
+"""
+
 # TODO python 3.9 - remove when 3.9 support is dropped
 _dataclass_options = {"frozen": True}
 if sys.version_info >= (3, 10):
@@ -46,6 +71,120 @@ if sys.version_info >= (3, 10):
 class PythonRelXRefOptions(PythonOptions):
     check_crossrefs: bool = True
     check_crossrefs_exclude: list[str | re.Pattern] = field(default_factory=list)
+    lazy_crossrefs: bool = False
+
+class _RefVerdictCache:
+    """Memoized results of crossref existence checks.
+
+    Both positive and negative verdicts are kept. Because a reference cannot
+    exist if any of its parents does not, a negative verdict for `a.b` also
+    answers `a.b.c`, `a.b.d`, etc. without another lookup.
+
+    Positive verdicts may record the modules they depend on, so that they can
+    be invalidated when those modules change.
+    """
+
+    def __init__(self) -> None:
+        self._verdicts: dict[str, bool] = {}
+        self._modules: dict[str, frozenset[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._verdicts)
+
+    def get(self, ref: str) -> Optional[bool]:
+        """Returns cached verdict for `ref` or None if not known."""
+        verdict = self._verdicts.get(ref)
+        if verdict is None:
+            prefix = ref
+            while (dot := prefix.rfind(".")) > 0:
+                prefix = prefix[:dot]
+                if self._verdicts.get(prefix) is False:
+                    verdict = False
+                    break
+        if verdict is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return verdict
+
+    def set(self, ref: str, verdict: bool, modules: Iterable[str] = ()) -> None:
+        """Records verdict for `ref`, which depends on given modules."""
+        self._verdicts[ref] = verdict
+        if verdict:
+            self._modules[ref] = frozenset(modules)
+
+    def invalidate(self, modules: Collection[str]) -> int:
+        """Forget verdicts that may have changed when given modules changed.
+
+        Positive verdicts are dropped if they depend on one of the modules, or did
+        not record their dependencies and are in the same top-level package as one.
+        Negative verdicts are dropped if they are in the same top-level package as
+        one of the modules, since the name may have been added to it.
+
+        Returns:
+            The number of verdicts that were dropped.
+        """
+        packages = {module.partition(".")[0] for module in modules}
+        dropped = [
+            ref
+            for ref, verdict in self._verdicts.items()
+            if (verdict and not self._modules[ref].isdisjoint(modules))
+            or ((not verdict or not self._modules[ref]) and ref.partition(".")[0] in packages)
+        ]
+        for ref in dropped:
+            del self._verdicts[ref]
+            self._modules.pop(ref, None)
+        return len(dropped)
+
+class _BuildState:
+    """Crossref state kept across builds in the same process, e.g. by `mkdocs serve`.
+
+    When the documentation is rebuilt, a new handler is created and all packages
+    are loaded again, but verdicts and substitution results computed for modules
+    whose sources did not change are still valid.
+    """
+
+    def __init__(self) -> None:
+        self.verdicts = _RefVerdictCache()
+        self.stamps = SourceStamps()
+        self.substitutions = SubstitutionCache(None)
+        self.inventories = InventoryIndex(None)
+        self.builds = 0
+        """Number of builds started with this state"""
+
+    def refresh(self) -> set[str]:
+        """Start a build, dropping verdicts for modules whose sources changed since the last one.
+
+        Returns:
+            Paths of changed modules.
+        """
+        self.builds += 1
+        changed = self.stamps.changed()
+        if changed:
+            dropped = self.verdicts.invalidate(changed)
+            logger.debug(f"{len(changed)} modules changed, dropped {dropped} crossref verdicts")
+        return changed
+
+    def use_substitutions(self, cache: Optional[SubstitutionCache]) -> Optional[SubstitutionCache]:
+        """Returns the substitution cache for this build, or None if its results would not be used again.
+
+        Results are kept on disk if `cache` is given by the **crossref_cache** option,
+        and otherwise only in memory from the first rebuild on, e.g. by `mkdocs serve`.
+        """
+        if cache is not None and cache.directory != self.substitutions.directory:
+            self.substitutions = cache
+        if cache is None and self.builds < 2:
+            return None
+        return self.substitutions
+
+_build_states: dict[tuple[str, ...], _BuildState] = {}
+"""Build state for each base directory and search path.
+
+Only the state of the most recent build is kept after its handler's teardown,
+so that handlers created with other configurations do not keep theirs alive.
+"""
 
 class PythonRelXRefHandler(PythonHandler):
     """Extended version of mkdocstrings Python handler
@@ -68,54 +207,526 @@ class PythonRelXRefHandler(PythonHandler):
         self.check_crossrefs = config.options.pop('check_crossrefs', True)
         exclude = config.options.pop('check_crossrefs_exclude', [])
         self.check_crossrefs_exclude = [re.compile(p) for p in exclude]
+        self.lazy_crossrefs = config.options.pop('lazy_crossrefs', False)
+        self.load_time_crossrefs = config.options.pop('load_time_crossrefs', False)
+        self._documented_packages: set[str] = set()
+        self.check_crossrefs_scope = config.options.pop('check_crossrefs_scope', 'all')
+        if self.check_crossrefs_scope not in CHECK_SCOPES:
+            raise PluginError(
+                f"Invalid options: check_crossrefs_scope: {self.check_crossrefs_scope!r} not one of {CHECK_SCOPES}")
+        self.check_crossrefs_max_loads: Optional[int] = config.options.pop('check_crossrefs_max_loads', None)
+        self._in_paths: dict[str, bool] = {}
+        self._max_loads_reached = False
+        self._unchecked_packages: set[str] = set()
+        self.check_crossrefs_inventories: bool | str = config.options.pop('check_crossrefs_inventories', True)
+        crossref_index = config.options.pop('crossref_index', None)
+        self._index_file = base_dir / crossref_index if crossref_index else None
+        self._shared_index: Optional[NameIndex] = None
+        self._inventories_indexed = False
+        crossref_cache = config.options.pop('crossref_cache', False)
+        crossref_report = config.options.pop('crossref_report', None)
+        self._report_file = base_dir / crossref_report if crossref_report else None
+        self._diagnostics = DiagnosticsCollector()
+        crossref_stats = config.options.pop('crossref_stats', None)
+        self._stats_file = base_dir / crossref_stats if crossref_stats else None
+        self.stats = CrossrefStats()
+        """Counters and timers for crossref processing in this build"""
+        self.autorefs: Any = None
+        """The autorefs plugin, used to determine the page being rendered"""
+        self._name_index = NameIndex()
+        self._options_cache: dict[Hashable, PythonRelXRefOptions] = {}
+        self.options_cache_hits = 0
+        """Number of calls to `get_options` answered from cache"""
+        self._processed_docstrings: dict[tuple, WeakSet[Docstring]] = {}
         super().__init__(config, base_dir, **kwargs)
 
+        # Reuse verdicts and substitutions from previous builds in this process
+        # for modules that have not changed.
+        self._build_started = time.time_ns()
+        self._build_key = (str(base_dir), *self._paths)
+        self._build_state = _build_states.setdefault(self._build_key, _BuildState())
+        self._build_state.refresh()
+        self._ref_verdicts = self._build_state.verdicts
+        self._substitution_cache = self._build_state.use_substitutions(_substitution_cache(crossref_cache, base_dir))
+        inventories = _inventory_index_directory(self.check_crossrefs_inventories, base_dir)
+        if inventories != self._build_state.inventories.directory:
+            self._build_state.inventories = InventoryIndex(inventories)
+        self._inventory_index = self._build_state.inventories
+
     def get_options(self, local_options: Mapping[str, Any]) -> PythonRelXRefOptions:
+        """Get combined default, global and local options.
+
+        Since the global options do not change, the result is cached for each
+        distinct set of local options, and the same object is returned for
+        identical local options.
+        """
+        key = _options_key(local_options)
+        if key is not None:
+            cached = self._options_cache.get(key)
+            if cached is not None:
+                self.options_cache_hits += 1
+                return cached
+
         local_options = dict(local_options)
         check_crossrefs = local_options.pop(
             'check_crossrefs', self.check_crossrefs)
         check_crossrefs_exclude = local_options.pop(
             'check_crossrefs_exclude', self.check_crossrefs_exclude)
+        lazy_crossrefs = local_options.pop(
+            'lazy_crossrefs', self.lazy_crossrefs)
+        try:
+            # compile exclusion patterns once for each distinct set
+            exclude_matcher(check_crossrefs_exclude)
+        except re.error as error:
+            raise PluginError(f"Invalid options: check_crossrefs_exclude: {error}") from error
         _opts = super().get_options(local_options)
         opts = PythonRelXRefOptions(
             check_crossrefs=check_crossrefs,
             check_crossrefs_exclude=check_crossrefs_exclude,
+            lazy_crossrefs=lazy_crossrefs,
             **{field.name: getattr(_opts, field.name) for field in fields(_opts)}
         )
+        if key is not None:
+            self._options_cache[key] = opts
         return opts
 
+    def normalize_extension_paths(self, extensions: Sequence) -> Sequence:
+        """Adds extension substituting crossrefs at load time if `load_time_crossrefs` is set."""
+        normalized = super().normalize_extension_paths(extensions)
+        if self.load_time_crossrefs:
+            normalized = [*normalized, RelativeCrossrefsExtension(self.stats, only=self._documented_packages)]
+        return normalized
+
+    def collect(self, identifier: str, options: PythonOptions) -> CollectorItem:
+        self._documented_packages.add(identifier.partition(".")[0])
+        return self._collect(identifier, options)
+
+    def _collect(self, identifier: str, options: PythonOptions) -> CollectorItem:
+        """Collect object without counting its package as documented."""
+        self.stats.collects += 1
+        with self.stats.timer("collect"):
+            return super().collect(identifier, options)
+
     def render(self, data: CollectorItem, options: PythonOptions) -> str:
-        if options.relative_crossrefs:
+        stats = self.stats
+        page = getattr(self.autorefs, "current_page", None)
+        stats.page = page.file.src_uri if page is not None else ""
+        if stats.page:
+            stats.pages[stats.page]["renders"] += 1
+        if options.relative_crossrefs and crossref_count(data) != 0:
+            check_key: tuple = (False,)
+            exclude = exclude_matcher(())
             if isinstance(options, PythonRelXRefOptions) and options.check_crossrefs:
-                checkref = partial(
-                    self._check_ref, exclude=options.check_crossrefs_exclude)
+                exclude = exclude_matcher(options.check_crossrefs_exclude)
+                check_key = (True, *(getattr(ex, "pattern", ex) for ex in exclude.patterns))
+            # Docstrings shared by more than one rendered object only need to
+            # be processed once for each distinct check configuration.
+            processed = self._processed_docstrings.setdefault(check_key, WeakSet())
+            select_members = _rendered_member_selector(options)
+            lazy = isinstance(options, PythonRelXRefOptions) and options.lazy_crossrefs
+            if self.load_time_crossrefs:
+                # Docstrings were already substituted when loaded, so lazy
+                # processing would gain nothing, and modules without crossrefs
+                # need not be visited at all.
+                select_members = _skip_modules_without_crossrefs(select_members)
+                lazy = False
+            if lazy:
+                # Only docstrings actually read by the templates get processed,
+                # so checks cannot be batched.
+                checkref = partial(self._check_ref, exclude=exclude) if check_key[0] else None
+                defer_relative_crossrefs(
+                    data,
+                    checkref=checkref,
+                    processed=processed,
+                    select_members=select_members,
+                    diagnostics=self._diagnostics,
+                    stats=stats,
+                )
             else:
-                checkref = None
-            substitute_relative_crossrefs(data, checkref=checkref)
+                check_many = partial(self._check_refs, exclude=exclude) if check_key[0] else None
+                with stats.timer("substitute"):
+                    substitute_relative_crossrefs(
+                        data,
+                        check_many=check_many,
+                        processed=processed,
+                        select_members=select_members,
+                        cache=self._substitution_cache,
+                        diagnostics=self._diagnostics,
+                        stats=stats,
+                    )
 
         try:
-            return super().render(data, options)
+            with stats.timer("render"):
+                return super().render(data, options)
         except Exception:  # pragma: no cover
             print(f"{data.path=}")
             raise
 
+    def teardown(self) -> None:
+        """Report crossref warnings and statistics, record module stamps for the next build
+        and save the crossref cache.
+
+        The state kept for later builds of other configurations is dropped.
+        """
+        logger.info(f"crossrefs: {self.stats.summary()}")
+        if self._stats_file is not None:
+            try:
+                self.stats.dump(self._stats_file)
+            except OSError as ex:  # pragma: no cover
+                logger.warning(f"Cannot write crossref statistics {self._stats_file}: {ex}")
+        try:
+            self._diagnostics.emit(self._report_file)
+        except OSError as ex:  # pragma: no cover
+            logger.warning(f"Cannot write crossref report {self._report_file}: {ex}")
+        self._build_state.stamps.record(self._modules_collection, since_ns=self._build_started)
+        if self._index_file is not None:
+            try:
+                self._save_shared_index()
+            except OSError as ex:  # pragma: no cover
+                logger.warning(f"Cannot write crossref index {self._index_file}: {ex}")
+        if self._shared_index is not None:
+            self._shared_index.close()
+        cache = self._substitution_cache
+        if cache is not None:
+            logger.debug(f"crossref cache: {cache.hits} hits, {cache.misses} misses")
+            try:
+                cache.save()
+            except OSError as ex:  # pragma: no cover
+                logger.warning(f"Cannot save crossref cache {cache.directory}: {ex}")
+        try:
+            self._inventory_index.save()
+        except OSError as ex:  # pragma: no cover
+            logger.warning(f"Cannot save inventory index {self._inventory_index.path}: {ex}")
+        for key in [key for key in _build_states if key != self._build_key]:
+            del _build_states[key]
+        super().teardown()
+
     def get_templates_dir(self, handler: Optional[str] = None) -> Path:
         """See [render][.barf]"""
         if handler == self.name:
             handler = 'python'
         return super().get_templates_dir(handler)
 
-    def _check_ref(self, ref : str, exclude: list[str | re.Pattern] = []) -> bool:
-        """Check for existence of reference"""
-        for ex in exclude:
-            if re.match(ex, ref):
-                return True
+    def _check_ref(self, ref : str, exclude: ExcludeMatcher | Iterable[str | re.Pattern] = ()) -> bool:
+        """Check for existence of reference
+
+        Verdicts are cached for the lifetime of the handler, so each distinct
+        reference is only looked up once across all pages and renders. References
+        are looked up in an index of the loaded packages, then in the standard
+        library modules already imported by this process, and only collected
+        when neither can answer.
+        """
+        if not isinstance(exclude, ExcludeMatcher):
+            exclude = exclude_matcher(exclude)
+        if exclude(ref):
+            return True
+        self.stats.checks += 1
+        verdict = self._ref_verdicts.get(ref)
+        if verdict is not None:
+            self.stats.check_cache_hits += 1
+        else:
+            self.stats.check_cache_misses += 1
+            self._name_index.update(self._modules_collection)
+            verdict = self._name_index.lookup(ref)
+            package = ref.partition(".")[0]
+            if verdict is None and package not in self._modules_collection.members:
+                verdict = self._lookup_shared_index(ref)
+                if verdict is None:
+                    verdict = _lookup_stdlib(ref)
+                if verdict is None:
+                    verdict = self._lookup_inventories(ref)
+                if verdict is None and not self._may_load(package):
+                    # Not verified, so don't remember the verdict.
+                    self.stats.unchecked += 1
+                    if package not in self._unchecked_packages:
+                        self._unchecked_packages.add(package)
+                        logger.debug(f"references into {package} are not checked, since it may not be loaded")
+                    return True
+            if verdict is None:
+                verdict = self._collect_ref(ref)
+            self._ref_verdicts.set(ref, verdict, self._ref_modules(ref) if verdict else ())
+        return verdict
+
+    def _lookup_shared_index(self, ref: str) -> Optional[bool]:
+        """Look up reference in index file shared with other builds, if any.
+
+        The file given by the `crossref_index` option is opened the first time
+        this is called in a build.
+        """
+        if self._index_file is None:
+            return None
+        if self._shared_index is None:
+            self._shared_index = NameIndex.open(self._index_file)
+            logger.debug(f"opened crossref index {self._index_file} with {len(self._shared_index)} names")
+        return self._shared_index.lookup(ref)
+
+    def _save_shared_index(self) -> None:
+        """Add packages loaded in this build to index file shared with other builds."""
+        assert self._index_file is not None
+        if self._shared_index is None:
+            self._shared_index = NameIndex.open(self._index_file)
+        self._name_index.update(self._modules_collection)
+        shared_keys = self._shared_index.keys()
+        if all(shared_keys.get(root) == key for root, key in self._name_index.keys().items() if key):
+            return
+        count = self._name_index.save(self._index_file, others=self._shared_index)
+        logger.debug(f"wrote {count} packages to crossref index {self._index_file}")
+
+    def _lookup_inventories(self, ref: str) -> Optional[bool]:
+        """Look up reference in index of configured inventories.
+
+        The index is brought up to date with the handler's **inventories** the
+        first time this is called in a build, by which time mkdocstrings will
+        usually have finished downloading them.
+
+        Returns:
+            Whether the reference is in an inventory, or None if no inventory
+            covers its top-level package.
+        """
+        if not self.check_crossrefs_inventories:
+            return None
+        index = self._inventory_index
+        if not self._inventories_indexed:
+            self._inventories_indexed = True
+            count = index.update(self.get_inventory_urls(), self.base_dir)
+            logger.debug(f"indexed {len(index)} names from {count} inventories for crossref checks")
+        return index.lookup(ref)
+
+    def _may_load(self, package: str) -> bool:
+        """Whether checks may load top-level package that is not loaded yet.
+
+        This depends on the `check_crossrefs_scope` and `check_crossrefs_max_loads`
+        options. Standard library packages are treated like any other package.
+        """
+        scope = self.check_crossrefs_scope
+        if scope == "loaded":
+            return False
+        if scope == "paths":
+            in_paths = self._in_paths.get(package)
+            if in_paths is None:
+                in_paths = self._in_paths[package] = any(
+                    module.name == package for module in iter_modules([str(path) for path in self._paths]))
+            if not in_paths:
+                return False
+        max_loads = self.check_crossrefs_max_loads
+        if max_loads is not None and self.stats.package_loads >= max_loads:
+            if not self._max_loads_reached:
+                self._max_loads_reached = True
+                logger.info(
+                    f"crossref checks loaded {max_loads} packages, references into"
+                    " other packages will not be checked")
+            return False
+        return True
+
+    def _check_refs(self, refs: Iterable[str], exclude: ExcludeMatcher | Iterable[str | re.Pattern] = ()) -> set[str]:
+        """Check for existence of many references at once
+
+        References are deduplicated and checked in sorted order grouped by top-level
+        package, so a package only needs to be loaded by the first check that needs
+        it, after which the rest of its group is answered from the index.
+
+        Returns:
+            The subset of `refs` that exist.
+        """
+        if not isinstance(exclude, ExcludeMatcher):
+            exclude = exclude_matcher(exclude)
+        valid: set[str] = set()
+        for _, group in groupby(sorted(set(refs)), key=lambda ref: ref.partition(".")[0]):
+            valid.update(ref for ref in group if self._check_ref(ref, exclude))
+        return valid
+
+    def _ref_modules(self, ref: str) -> set[str]:
+        """Returns paths of the modules that define `ref` and each of its parents.
+
+        This includes the modules containing aliases along the way as well as those
+        of their targets. Returns an empty set if the reference cannot be resolved
+        in the loaded modules.
+        """
+        first, *rest = ref.split(".")
+        modules: set[str] = set()
+        try:
+            obj: Object | Alias = self._modules_collection.members[first]
+            for name in [*rest, ""]:
+                if isinstance(obj, Alias):
+                    if obj.parent is not None:
+                        modules.add(obj.parent.module.path)
+                    obj = obj.final_target
+                modules.add(obj.module.path)
+                if name:
+                    obj = obj.members[name]
+        except (KeyError, GriffeError, ValueError):
+            return set()
+        return modules
+
+    def _collect_ref(self, ref: str) -> bool:
+        """Check for existence of reference by trying to collect it."""
+        packages = len(self._modules_collection.members)
         try:
-            self.collect(ref, PythonOptions())
+            self._collect(ref, PythonOptions())
             return True
         except Exception:  # pylint: disable=broad-except
             # Only expect a CollectionError but we may as well catch everything.
             return False
+        finally:
+            self.stats.package_loads += len(self._modules_collection.members) - packages
+
+@lru_cache(maxsize=None)
+def _stdlib_modules() -> frozenset[str]:
+    """Returns names of top-level modules in the standard library, including builtin modules."""
+    names = getattr(sys, "stdlib_module_names", None)
+    if names is None:  # pragma: no cover
+        # TODO python 3.9 - remove when 3.9 support is dropped
+        names = {module.name for module in iter_modules([sysconfig.get_paths()["stdlib"]])}
+    return frozenset(names).union(sys.builtin_module_names)
+
+_stdlib_names: dict[str, frozenset[str]] = {}
+"""Member names of standard library modules and classes by their path."""
+
+def _lookup_stdlib(ref: str) -> Optional[bool]:
+    """Look up reference into the standard library in the modules imported by this process.
+
+    Modules are never imported by this, so references into modules that have not
+    been imported yet, as well as into members that are not modules or classes,
+    are left to the other checks.
+
+    Returns:
+        Whether the reference exists, or None if this cannot tell.
+    """
+    package, *names = ref.split(".")
+    if package not in _stdlib_modules():
+        return None
+    obj: object = sys.modules.get(package)
+    if obj is None:
+        return None
+    path = package
+    for name in names:
+        path = f"{path}.{name}"
+        if isinstance(obj, ModuleType) and path in sys.modules:
+            obj = sys.modules[path]
+            continue
+        if not isinstance(obj, (ModuleType, type)):
+            return None
+        members = _stdlib_names.get(path.rpartition(".")[0])
+        if members is None:
+            members = _stdlib_names[path.rpartition(".")[0]] = _member_names(obj)
+        if name not in members:
+            # a package may still have a submodule by that name that is not imported
+            return False if not hasattr(obj, "__path__") else None
+        obj = getattr(obj, name, None)
+    return True
+
+def _member_names(obj: ModuleType | type) -> frozenset[str]:
+    """Returns names of the members of a module or class, including annotated attributes."""
+    names = set(dir(obj))
+    for cls in obj.__mro__ if isinstance(obj, type) else (obj,):
+        names.update(getattr(cls, "__annotations__", None) or ())
+    return frozenset(names)
+
+def _options_key(value: Any) -> Optional[Hashable]:
+    """Returns hashable key that identifies nested option values, or None if not possible.
+
+    Mappings and sequences are converted to tuples. Scalars are paired with their
+    type, so that e.g. `1` and `True` produce different keys.
+    """
+    try:
+        return _freeze_option(value)
+    except TypeError:
+        return None
+
+def _freeze_option(value: Any) -> Hashable:
+    if isinstance(value, Mapping):
+        items = ((k, _freeze_option(v)) for k, v in value.items())
+        return (dict, tuple(sorted(items, key=lambda item: str(item[0]))))
+    if isinstance(value, (list, tuple)):
+        return (list, tuple(_freeze_option(v) for v in value))
+    if isinstance(value, re.Pattern):
+        return (re.Pattern, value.pattern, value.flags)
+    hash(value)  # raises TypeError if not hashable
+    return (type(value), value)
+
+def _substitution_cache(setting: bool | str, base_dir: Path) -> Optional[SubstitutionCache]:
+    """Returns substitution cache for **crossref_cache** option setting, or None if not enabled."""
+    if not setting:
+        return None
+    if setting is True:
+        return SubstitutionCache(base_dir / ".cache" / "python_xref")
+    return SubstitutionCache(base_dir / setting)
+
+def _inventory_index_directory(setting: bool | str, base_dir: Path) -> Optional[Path]:
+    """Returns directory of inventory index for **check_crossrefs_inventories** option setting.
+
+    The index is not used if the option is false.
+    """
+    if not setting:
+        return None
+    if setting is True:
+        return InventoryIndex.default_directory(base_dir)
+    return base_dir / setting
+
+def _rendered_member_selector(options: PythonOptions) -> MemberSelector:
+    """Returns function that selects the members of an object that may be rendered.
+
+    This follows the member selection done by the mkdocstrings-python templates
+    using the **filters**, **members**, **inherited_members**, **show_submodules**,
+    **summary** and **merge_init_into_class** options. When in doubt, members are
+    selected, so that docstrings that may be rendered are never skipped.
+
+    Submodules that are not shown are still selected if the summary of modules
+    is enabled, since it renders their docstrings, but their members are not.
+    """
+    filters = options.filters
+    merge_init = options.merge_init_into_class
+    show_submodules = options.show_submodules
+    summary = options.summary
+    summarize_modules = summary is True or bool(getattr(summary, "modules", False))
+    summary_only: set[str] = set()
+    """Paths of submodules selected only for their summary"""
+
+    def select_members(obj: Object, is_root: bool) -> list[Alias | Object]:
+        if obj.canonical_path in summary_only:
+            return []
+        # The members option only applies to the members of the root object.
+        members_list = options.members if is_root else None
+        try:
+            members = do_filter_objects(
+                obj.members,  # type: ignore[arg-type]
+                filters=filters,
+                members_list=members_list,
+                inherited_members=options.inherited_members,
+            )
+        except GriffeError:  # pragma: no cover
+            return list(obj.members.values())
+
+        if merge_init and obj.is_class and "__init__" in obj.members:
+            # __init__ is rendered as part of the class even if filtered out
+            init = obj.members["__init__"]
+            if init not in members:
+                members.append(init)
+
+        selected: list[Alias | Object] = []
+        for member in members:
+            try:
+                if member.is_module and not show_submodules:
+                    if not summarize_modules:
+                        continue
+                    summary_only.add(member.canonical_path)
+                if (filters != "public" and members_list is None
+                        and member.is_imported and not member.is_public):
+                    continue
+            except GriffeError:
+                pass
+            selected.append(member)
+        return selected
+
+    return select_members
+
+def _skip_modules_without_crossrefs(select_members: MemberSelector) -> MemberSelector:
+    """Wraps member selector to skip modules known to contain no crossrefs."""
+
+    def select(obj: Object, is_root: bool) -> list[Alias | Object]:
+        return [member for member in select_members(obj, is_root) if crossref_count(member) != 0]
+
+    return select
 
 def get_handler(
     handler_config: MutableMapping[str, Any],
@@ -135,8 +746,10 @@ def get_handler(
     if "inventories" not in handler_config and "import" in handler_config:
         warn("The 'import' key is renamed 'inventories' for the Python handler", FutureWarning, stacklevel=1)
         handler_config["inventories"] = handler_config.pop("import", [])
-    return PythonRelXRefHandler(
+    handler = PythonRelXRefHandler(
         config=PythonConfig.from_data(**handler_config),
         base_dir=base_dir,
         **kwargs,
     )
+    handler.autorefs = tool_config.plugins.get("autorefs")
+    return handler
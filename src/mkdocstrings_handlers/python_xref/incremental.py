@@ -0,0 +1,104 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Tracking of changes to module sources between builds in the same process."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional
+
+from griffe import GriffeError, Module, ModulesCollection
+
+__all__ = [
+    "SourceStamps",
+]
+
+_Stamp = Optional[tuple[int, int]]
+
+
+def _stamp(path: Path) -> _Stamp:
+    """Modification time and size of file or directory, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class SourceStamps:
+    """Modification stamps of the source files of loaded modules.
+
+    For each module this records the modification time and size of its source
+    file. For packages, it also records the stamp of the package directory,
+    which changes when modules are added to or removed from it.
+
+    Stamps are compared instead of file contents, so checking for changes
+    only takes one `stat` call per file.
+    """
+
+    def __init__(self) -> None:
+        self._stamps: dict[str, tuple[tuple[Path, _Stamp], ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._stamps)
+
+    def __contains__(self, module: object) -> bool:
+        return module in self._stamps
+
+    def record(self, collection: ModulesCollection, *, since_ns: int = 0) -> None:
+        """Record stamps of all modules in collection.
+
+        Arguments:
+            collection: griffe modules collection, e.g. the one owned by the handler.
+            since_ns: time in nanoseconds at which the modules were loaded. Files
+                modified at or after this time may have changed after they were
+                loaded, so they are recorded as changed.
+        """
+        stack: list[Module] = [m for m in collection.members.values() if isinstance(m, Module)]
+        while stack:
+            module = stack.pop()
+            stack.extend(m for m in module.modules.values() if isinstance(m, Module))
+            try:
+                filepath = module.filepath
+            except GriffeError:
+                continue
+            if isinstance(filepath, list):
+                # namespace package
+                paths = filepath
+            elif module.is_init_module:
+                paths = [filepath, filepath.parent]
+            else:
+                paths = [filepath]
+            stamps = []
+            for path in paths:
+                stamp = _stamp(path)
+                if stamp is not None and stamp[0] >= since_ns:
+                    stamp = None
+                stamps.append((path, stamp))
+            self._stamps[module.path] = tuple(stamps)
+
+    def changed(self) -> set[str]:
+        """Returns paths of modules whose sources changed since they were recorded.
+
+        Changed modules are forgotten until they are recorded again.
+        """
+        changed = {
+            module
+            for module, stamps in self._stamps.items()
+            if any(stamp is None or _stamp(path) != stamp for path, stamp in stamps)
+        }
+        for module in changed:
+            del self._stamps[module]
+        return changed
@@ -0,0 +1,415 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Index of object paths used to validate cross-references without collecting them."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Optional, Sequence, Union
+
+from griffe import Alias, Class, GriffeError, Module, ModulesCollection, Object
+
+from .atomic import atomic_write
+
+__all__ = [
+    "NameIndex",
+]
+
+_NO_PARENT = 0xFFFFFFFF
+"""Parent of the root node in a package tree."""
+
+_MAGIC = b"PYXREFNI"
+"""First bytes of index files."""
+
+_HEADER = struct.Struct("<8sI")
+"""Magic bytes and length of JSON header at start of index files."""
+
+_FORMAT = 1
+"""Version of the index file format."""
+
+_VERSION = f'{Path(__file__).with_name("VERSION").read_text().strip()}/{_FORMAT}'
+"""Version of this package and format, used to ignore index files written by other versions."""
+
+_SECTIONS = ("parents", "names", "children", "open", "names_offsets", "names_blob")
+"""Arrays of package trees, in the order they are written to index files."""
+
+
+def _module_sources(module: Module) -> tuple[str, ...]:
+    """Returns source files or package directories of top-level module."""
+    try:
+        filepath = module.filepath
+    except GriffeError:  # builtin module
+        return ()
+    paths = filepath if isinstance(filepath, list) else [filepath]
+    return tuple(str(path.parent if path.stem == "__init__" else path) for path in paths)
+
+
+def _data_start(header_size: int) -> int:
+    """Returns position of first section in index file with JSON header of given size."""
+    end = _HEADER.size + header_size
+    return end + (-end % 8)
+
+
+def source_key(sources: Sequence[str]) -> str:
+    """Returns hash of the modification times and sizes of all Python files in sources.
+
+    Arguments:
+        sources: paths of source files or package directories
+    """
+    digest = hashlib.sha256()
+    for source in sources:
+        path = Path(source)
+        files = sorted(path.rglob("*.py*")) if path.is_dir() else [path]
+        for file in files:
+            if file.suffix not in (".py", ".pyi"):
+                continue
+            try:
+                st = file.stat()
+            except OSError:
+                continue
+            digest.update(f"{file}\0{st.st_size}\0{st.st_mtime_ns}\0".encode())
+    return digest.hexdigest()
+
+
+class _PackageTree:
+    """Compact tree of the paths of all objects in one top-level package.
+
+    Node 0 is the package itself. Nodes are numbered in breadth first order,
+    with the children of each node numbered consecutively in order of their
+    names, so node `i` has children `children[i]` up to `children[i+1]`.
+
+    Path segments are interned: each distinct member name is stored only once,
+    in a sorted blob of UTF-8 encoded names, and nodes refer to them by their
+    position in that order. These arrays are what is written to index files.
+    For lookups, the full path of each node is kept in a dictionary, which is
+    built when the tree is created or mapped from a file.
+    """
+
+    __slots__ = (
+        "_key", "children", "names", "names_blob", "names_offsets", "names_start", "nodes", "open", "parents", "sources")
+
+    def __init__(self, module: Module) -> None:
+        objs: list[Union[Object, Alias]] = [module]
+        parents = array("I", [_NO_PARENT])
+        segments = [module.name]
+        children = array("I")
+        is_open = bytearray()
+        paths = [module.name]
+        i = 0
+        while i < len(objs):
+            obj = objs[i]
+            children.append(len(objs))
+            if isinstance(obj, Alias):
+                # Members are those of the target
+                is_open.append(True)
+            else:
+                is_open.append(isinstance(obj, Class) and bool(obj.bases))
+                for name, member in sorted(obj.members.items()):
+                    objs.append(member)
+                    parents.append(i)
+                    segments.append(name)
+                    paths.append(f"{paths[i]}.{name}")
+            i += 1
+        children.append(len(objs))
+
+        # UTF-8 preserves code point order, so encoded names sort the same way
+        unique = sorted(set(segments))
+        ids = {name: n for n, name in enumerate(unique)}
+        encoded = [name.encode() for name in unique]
+        offsets = array("I", [0])
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+
+        self.parents: Sequence[int] = parents
+        """Parent of each node"""
+        self.names: Sequence[int] = array("I", (ids[name] for name in segments))
+        """Interned name of each node"""
+        self.children: Sequence[int] = children
+        """Start of the children of each node, and their end for the last node"""
+        self.open: Sequence[int] = is_open
+        """Whether each node may have members that are not in the tree"""
+        self.names_blob: bytes = b"".join(encoded)
+        """Distinct names in sorted order"""
+        self.names_offsets: Sequence[int] = offsets
+        """Start of each name in blob, and end of the last one"""
+        self.names_start = 0
+        """Position of first name in blob, for trees mapped from an index file"""
+        self.sources = _module_sources(module)
+        """Source files or directories of package"""
+        self.nodes: dict[str, int] = {path: node for node, path in enumerate(paths)}
+        """Node of each full path"""
+        self._key: Optional[str] = None
+
+    @classmethod
+    def mapped(cls, view: memoryview, data_start: int, info: dict[str, Any]) -> _PackageTree:
+        """Construct tree referring to sections of a mapped index file without copying them."""
+        tree = cls.__new__(cls)
+        sections = {
+            name: view[data_start + start:data_start + start + size]
+            for name, (start, size) in info["sections"].items()
+        }
+        tree.parents = sections["parents"].cast("I")
+        tree.names = sections["names"].cast("I")
+        tree.children = sections["children"].cast("I")
+        tree.open = sections["open"]
+        tree.names_offsets = sections["names_offsets"].cast("I")
+        # Slices of the underlying mmap are bytes, which can be compared.
+        tree.names_blob = view.obj  # type: ignore[assignment]
+        tree.names_start = data_start + info["sections"]["names_blob"][0]
+        tree.sources = tuple(info["sources"])
+        tree._key = info["key"]
+        blob, start, offsets = tree.names_blob, tree.names_start, tree.names_offsets.tolist()
+        names = [blob[start + offsets[n]:start + offsets[n + 1]].decode() for n in range(len(offsets) - 1)]
+        paths: list[str] = []
+        for parent, name_id in zip(tree.parents.tolist(), tree.names.tolist()):
+            paths.append(names[name_id] if parent == _NO_PARENT else f"{paths[parent]}.{names[name_id]}")
+        tree.nodes = {path: node for node, path in enumerate(paths)}
+        return tree
+
+    @property
+    def key(self) -> str:
+        """Hash of the state of the sources, or empty if not known.
+
+        This is only computed when first needed, since it requires finding
+        all source files of the package.
+        """
+        if self._key is None:
+            self._key = source_key(self.sources) if self.sources else ""
+        return self._key
+
+    def sections(self) -> list[bytes | memoryview]:
+        """Returns contents of arrays in the order written to index files."""
+        blob = self.names_blob
+        if self.names_start or len(blob) != self.names_offsets[-1]:
+            blob = blob[self.names_start:self.names_start + self.names_offsets[-1]]
+        return [
+            memoryview(getattr(self, name)) if name != "names_blob" else blob
+            for name in _SECTIONS
+        ]
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def path(self, node: int) -> str:
+        """Returns full path of node."""
+        parts = []
+        while node != _NO_PARENT:
+            name_id = self.names[node]
+            start = self.names_start
+            parts.append(
+                self.names_blob[start + self.names_offsets[name_id]:start + self.names_offsets[name_id + 1]].decode())
+            node = self.parents[node]
+        return ".".join(reversed(parts))
+
+    def memory_usage(self) -> int:
+        """Returns bytes used by tree, not counting sections mapped from a file."""
+        return sys.getsizeof(self) + sum(sys.getsizeof(path) for path in self.nodes) + sum(
+            sys.getsizeof(getattr(self, attr)) for attr in self.__slots__
+            if not isinstance(getattr(self, attr), (memoryview, mmap.mmap)))
+
+
+class NameIndex:
+    """Index of the paths of all objects in loaded packages.
+
+    The index holds the path of every object and every alias reachable from the
+    top-level packages that have been added to it. Missing names are resolved
+    to the closest indexed parent of the reference.
+
+    Some parents cannot be enumerated statically: aliases (whose members are
+    those of their target) and classes with base classes (which also have
+    inherited members). For references below such a parent, `lookup`
+    returns None so that the caller can fall back to a full collection.
+
+    Paths are kept in a dictionary for each package, so references are looked
+    up by hashing. Each package also has a compact tree, which stores the
+    distinct member names once and everything else in arrays of integers, and
+    which is what is written to index files. Use [memory_usage][(c).] to find
+    out how much memory the index uses.
+
+    The index can be written to a file with [save][(c).], which other processes
+    can [open][(c).] and use without loading or parsing any packages. The file
+    is memory mapped, so its contents are shared rather than copied, until the
+    index is closed using [close][(c).] or by using it as a context manager.
+    """
+
+    def __init__(self) -> None:
+        self._trees: dict[str, _PackageTree] = {}
+        self._mmap: Optional[mmap.mmap] = None
+        self._views: list[memoryview] = []
+
+    def __enter__(self) -> NameIndex:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(len(tree) for tree in self._trees.values())
+
+    def __contains__(self, path: object) -> bool:
+        return isinstance(path, str) and self.lookup(path) is True
+
+    @property
+    def roots(self) -> frozenset[str]:
+        """Names of the top-level packages in the index."""
+        return frozenset(self._trees)
+
+    def update(self, collection: ModulesCollection) -> int:
+        """Add top-level packages from collection that are not yet in the index.
+
+        Arguments:
+            collection: griffe modules collection, e.g. the one owned by the handler.
+
+        Returns:
+            The number of packages that were added.
+        """
+        members = collection.members
+        if len(members) == len(self._trees):
+            return 0
+        added = 0
+        for name, module in list(members.items()):
+            if name not in self._trees:
+                self.add_module(module)
+                added += 1
+        return added
+
+    def add_module(self, module: Module) -> None:
+        """Add top-level module and all of its members to the index."""
+        self._trees[module.name] = _PackageTree(module)
+
+    def lookup(self, ref: str) -> Optional[bool]:
+        """Look up a reference in the index.
+
+        Arguments:
+            ref: fully qualified reference path
+
+        Returns:
+            True if reference is in index, False if it definitely does not exist
+            in any indexed package, or None if the index cannot tell.
+        """
+        tree = self._trees.get(ref.partition(".")[0])
+        if tree is None:
+            return None
+        nodes = tree.nodes
+        if ref in nodes:
+            return True
+        # Whether a missing member may exist depends on its closest indexed parent.
+        parent = ref.rpartition(".")[0]
+        while parent not in nodes:
+            parent = parent.rpartition(".")[0]
+        return None if tree.open[nodes[parent]] else False
+
+    def memory_usage(self) -> dict[str, int]:
+        """Returns number of bytes used by the index for each package."""
+        return {root: tree.memory_usage() for root, tree in self._trees.items()}
+
+    def keys(self) -> dict[str, str]:
+        """Returns hash of the sources of each package, or empty string if not known."""
+        return {root: tree.key for root, tree in self._trees.items()}
+
+    def close(self) -> None:
+        """Release the file mapped by [open][(c).], if any, and drop the packages read from it."""
+        if self._mmap is None:
+            return
+        self._trees = {root: tree for root, tree in self._trees.items() if not isinstance(tree.parents, memoryview)}
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+        self._mmap = None
+
+    def save(self, path: Path, *, others: Optional[NameIndex] = None) -> int:
+        """Write index to file that can be opened by [open][(c).].
+
+        The file is written to a temporary file that is then renamed, so that
+        processes that have the old file open can keep using it. Packages whose
+        sources are not known are not written. The file can be read by anyone
+        allowed to by the process's umask.
+
+        Arguments:
+            path: file to write
+            others: optional index whose packages are also written, unless
+                they are in this index. It is closed after writing, since it
+                is usually mapped from the file to be replaced, which is not
+                possible on Windows while the file is mapped.
+
+        Returns:
+            The number of packages written.
+        """
+        trees = {root: tree for root, tree in (others._trees if others is not None else {}).items() if tree.key}
+        trees.update((root, tree) for root, tree in self._trees.items() if tree.key)
+        packages: dict[str, Any] = {}
+        offset = 0
+        for root, tree in sorted(trees.items()):
+            sections = {}
+            for name, section in zip(_SECTIONS, tree.sections()):
+                size = section.nbytes if isinstance(section, memoryview) else len(section)
+                sections[name] = [offset, size]
+                offset += size + (-size % 8)
+            packages[root] = {"sources": list(tree.sources), "key": tree.key, "sections": sections}
+        # Section offsets are relative to the end of the header, aligned to 8 bytes.
+        header = json.dumps({"version": _VERSION, "byteorder": sys.byteorder, "packages": packages}).encode()
+        data_start = _data_start(len(header))
+
+        with atomic_write(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, len(header)))
+            f.write(header)
+            for root in sorted(trees):
+                for (start, _), section in zip(packages[root]["sections"].values(), trees[root].sections()):
+                    f.write(b"\0" * (data_start + start - f.tell()))
+                    f.write(section)
+            if others is not None:
+                others.close()
+        return len(packages)
+
+    @classmethod
+    def open(cls, path: Path) -> NameIndex:
+        """Open index file written by [save][(c).].
+
+        Packages whose sources have changed since the file was written are
+        left out. If the file does not exist or cannot be used, the index is empty.
+        """
+        index = cls()
+        try:
+            with path.open("rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return index
+        try:
+            magic, header_size = _HEADER.unpack_from(mapped, 0)
+            header = json.loads(mapped[_HEADER.size:_HEADER.size + header_size]) if magic == _MAGIC else {}
+        except (ValueError, struct.error):
+            header = {}
+        if (not isinstance(header, dict) or header.get("version") != _VERSION
+                or header.get("byteorder") != sys.byteorder):
+            mapped.close()
+            return index
+        view = memoryview(mapped)
+        data_start = _data_start(header_size)
+        index._mmap = mapped
+        index._views.append(view)
+        for root, info in header["packages"].items():
+            if source_key(info["sources"]) == info["key"]:
+                tree = _PackageTree.mapped(view, data_start, info)
+                index._trees[root] = tree
+                index._views.extend(
+                    section for section in (tree.parents, tree.names, tree.children, tree.open, tree.names_offsets)
+                    if isinstance(section, memoryview))
+        return index
@@ -0,0 +1,238 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Offline index of names in object inventories, for checking references into other projects."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+from array import array
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple, Optional
+from urllib.parse import unquote, urlparse
+
+import platformdirs
+from mkdocstrings import Inventory, get_logger
+
+from .atomic import atomic_write
+
+__all__ = [
+    "InventoryIndex",
+    "read_cached_inventory",
+]
+
+logger = get_logger(__name__)
+
+_FORMAT = 1
+"""Version of the index file format."""
+
+_VERSION = f'{Path(__file__).with_name("VERSION").read_text().strip()}/{_FORMAT}'
+"""Version of this package and format, used to invalidate indexes written by other versions."""
+
+
+def _name_hash(name: str) -> int:
+    """Returns 64 bit hash of name that is stable across processes."""
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "little")
+
+
+def read_cached_inventory(url: str, base_dir: Path) -> Optional[bytes]:
+    """Read inventory file without downloading it.
+
+    Local paths, which may be relative to `base_dir`, and `file:` URLs are read
+    directly. Other URLs are read from the cache in which mkdocs keeps the
+    inventories downloaded by mkdocstrings, however old the cached copy is.
+
+    Returns:
+        Content of inventory file, or None if it is not available locally.
+    """
+    parsed = urlparse(url)
+    try:
+        if parsed.scheme == "file":
+            return Path(unquote(parsed.path)).read_bytes()
+        if len(parsed.scheme) <= 1:  # no scheme or windows drive letter
+            return (base_dir / url).read_bytes()
+        # Same location as used by mkdocs.utils.cache.download_and_cache_url
+        name_hash = hashlib.sha256(url.encode()).hexdigest()[:32]
+        path = Path(platformdirs.user_cache_dir("mkdocs"), "mkdocs_url_cache", name_hash + os.path.splitext(url)[1])
+        with path.open("rb") as f:
+            header = f.readline()
+            if not header.startswith(b"# " + url.encode() + b" downloaded at timestamp "):
+                return None
+            return f.read()
+    except OSError:
+        return None
+
+
+class _IndexedInventory(NamedTuple):
+    """Names from one inventory file."""
+
+    digest: str
+    """Hash of the inventory file content and domains"""
+    roots: frozenset[str]
+    """Top-level names"""
+    hashes: array
+    """Hashes of all names, as unsigned 64 bit integers"""
+
+
+class InventoryIndex:
+    """Index of the names of objects in [Sphinx] inventory files.
+
+    This is used to check references into other projects, whose inventories
+    are configured using the **inventories** option, without loading them.
+    Names are kept as 64 bit hashes in a set, so lookups are cheap and even
+    large inventories take little memory. A reference is only looked up if its
+    first component is the first component of some name in an inventory.
+
+    Inventory files are never downloaded: only local files and copies already
+    downloaded by mkdocstrings are indexed. Each file is only parsed again if
+    its content changed. The index is only read from and written to disk by
+    `load` and `save`, unless it has no directory, in which case it is only
+    kept in memory. Since the index only holds the inventories of one project,
+    each project needs its own directory, see [default_directory][(c).].
+
+    [Sphinx]: https://www.sphinx-doc.org/en/master/usage/extensions/intersphinx.html
+    """
+
+    filename = "inventories.json"
+
+    def __init__(self, directory: Optional[Path]) -> None:
+        """
+        Arguments:
+            directory: directory in which to store the index file, or None
+                if the index should only be kept in memory.
+        """
+        self.directory = Path(directory) if directory is not None else None
+        self._inventories: dict[str, _IndexedInventory] = {}
+        self._hashes: set[int] = set()
+        self._roots: set[str] = set()
+        self._loaded = False
+        self._modified = False
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and _name_hash(name) in self._hashes
+
+    @staticmethod
+    def default_directory(base_dir: Path) -> Path:
+        """Returns directory for the index of the project whose mkdocs config is in `base_dir`.
+
+        This is a directory specific to the project in the user's cache directory.
+        """
+        project = hashlib.sha256(str(Path(base_dir).resolve()).encode()).hexdigest()[:16]
+        return Path(platformdirs.user_cache_dir("python_xref"), "inventories", project)
+
+    @property
+    def path(self) -> Optional[Path]:
+        """Path of the index file, if any."""
+        return self.directory / self.filename if self.directory is not None else None
+
+    @property
+    def urls(self) -> list[str]:
+        """URLs of the indexed inventories."""
+        return list(self._inventories)
+
+    def lookup(self, ref: str) -> Optional[bool]:
+        """Look up a reference in the index.
+
+        Returns:
+            True if the reference is in an inventory, False if it is not but
+            belongs to a top-level name found in one, or None if the index cannot tell.
+        """
+        if ref.partition(".")[0] not in self._roots:
+            return None
+        return _name_hash(ref) in self._hashes
+
+    def update(self, inventories: Iterable[tuple[str, dict[str, Any]]], base_dir: Path) -> int:
+        """Index the given inventories, and only those.
+
+        Arguments:
+            inventories: URLs and configuration of inventories, as returned by the
+                handler's `get_inventory_urls` method.
+            base_dir: directory relative to which local paths are resolved.
+
+        Returns:
+            The number of inventories that were available.
+        """
+        self.load()
+        indexed: dict[str, _IndexedInventory] = {}
+        for url, config in inventories:
+            content = read_cached_inventory(url, base_dir)
+            if content is None:
+                logger.debug(f"Inventory {url} not available offline, not used to check crossrefs")
+                continue
+            domains = list(config.get("domains") or ["py"])
+            digest = hashlib.sha256(content)
+            digest.update(json.dumps(domains).encode())
+            entry = self._inventories.get(url)
+            if entry is None or entry.digest != digest.hexdigest():
+                try:
+                    names = list(Inventory.parse_sphinx(BytesIO(content), domain_filter=domains))
+                except Exception as ex:  # noqa: BLE001  # pylint: disable=broad-except
+                    logger.debug(f"Cannot parse inventory {url}: {ex}")
+                    continue
+                entry = _IndexedInventory(
+                    digest.hexdigest(),
+                    frozenset(name.partition(".")[0] for name in names),
+                    array("Q", map(_name_hash, names)),
+                )
+                self._modified = True
+            indexed[url] = entry
+        if indexed.keys() != self._inventories.keys():
+            self._modified = True
+        self._inventories = indexed
+        self._hashes = {h for entry in indexed.values() for h in entry.hashes}
+        self._roots = {root for entry in indexed.values() for root in entry.roots}
+        return len(indexed)
+
+    def load(self) -> None:
+        """Load indexed inventories from index file, if not already loaded."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path is None:
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as ex:
+            logger.warning(f"Ignoring unreadable inventory index {self.path}: {ex}")
+            return
+        if not isinstance(data, dict) or data.get("version") != _VERSION:
+            logger.info(f"Ignoring inventory index {self.path} from different version")
+            return
+        for url, (digest, roots, hashes) in data["inventories"].items():
+            packed = array("Q")
+            packed.frombytes(base64.b64decode(hashes))
+            self._inventories[url] = _IndexedInventory(digest, frozenset(roots), packed)
+
+    def save(self) -> None:
+        """Write indexed inventories to index file."""
+        if not self._modified or self.directory is None:
+            return
+        data = {
+            "version": _VERSION,
+            "inventories": {
+                url: [entry.digest, sorted(entry.roots), base64.b64encode(entry.hashes.tobytes()).decode()]
+                for url, entry in self._inventories.items()
+            },
+        }
+        with atomic_write(self.directory / self.filename) as f:
+            json.dump(data, f, separators=(",", ":"))
+        self._modified = False
@@ -0,0 +1,179 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Performance counters and timers for crossref processing."""
+
+from __future__ import annotations
+
+import json
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Iterator
+
+from griffe import Docstring
+
+__all__ = [
+    "COUNTERS",
+    "TIMERS",
+    "CrossrefStats",
+]
+
+COUNTERS: tuple[str, ...] = (
+    "docstrings",
+    "scanned",
+    "crossrefs",
+    "rewritten",
+    "checks",
+    "unchecked",
+    "check_cache_hits",
+    "check_cache_misses",
+    "cache_hits",
+    "cache_misses",
+    "collects",
+    "package_loads",
+)
+"""Names of the counters in [CrossrefStats][(m).], in the order they are reported.
+
+* **docstrings**: docstrings visited for substitution
+* **scanned**: docstrings containing crossrefs that were scanned
+* **crossrefs**: crossrefs matched in scanned docstrings
+* **rewritten**: relative crossrefs rewritten to full references
+* **checks**: references checked, not counting excluded references
+* **unchecked**: checked references that were accepted without being verified, because
+    they are in packages that checks may not load
+* **check_cache_hits**, **check_cache_misses**: checks answered from, or missing in,
+    the cache of previous verdicts
+* **cache_hits**, **cache_misses**: docstrings whose substitution result was, or
+    was not, in the substitution cache
+* **collects**: calls to the handler's `collect` method, including those made by checks
+* **package_loads**: top-level packages loaded by griffe as a result of checks
+"""
+
+TIMERS: tuple[str, ...] = ("collect", "substitute", "render")
+"""Names of the timers in [CrossrefStats][(m).].
+
+* **collect**: collecting objects, including collection done to check references
+* **substitute**: substituting and checking crossrefs
+* **render**: rendering templates by the base handler, excluding any lazy substitution
+"""
+
+
+class CrossrefStats:
+    """Counters and timers for the crossref processing in one build.
+
+    Counters are plain attributes named as in [COUNTERS][(m).], so they can be
+    incremented directly. Time is measured using [timer][(c).], which keeps
+    nested timers exclusive: while an inner timer runs, the outer one is paused,
+    so the timers add up to the total time measured.
+
+    Crossrefs found in each module and the time spent on each page are also
+    recorded, if known.
+    """
+
+    docstrings: int
+    scanned: int
+    crossrefs: int
+    rewritten: int
+    checks: int
+    unchecked: int
+    check_cache_hits: int
+    check_cache_misses: int
+    cache_hits: int
+    cache_misses: int
+    collects: int
+    package_loads: int
+
+    page: str
+    """Page currently being rendered, or empty if not known.
+    Time is attributed to this page."""
+
+    def __init__(self) -> None:
+        for name in COUNTERS:
+            setattr(self, name, 0)
+        self.page = ""
+        self.times: dict[str, float] = dict.fromkeys(TIMERS, 0.0)
+        """Seconds spent in each timer."""
+        self.modules: defaultdict[str, Counter[str]] = defaultdict(Counter)
+        """Scanned docstrings, crossrefs and rewritten crossrefs in each module."""
+        self.pages: defaultdict[str, defaultdict[str, float]] = defaultdict(lambda: defaultdict(float))
+        """Renders and seconds spent in each timer for each page."""
+        self._running: list[str] = []
+        self._started = 0.0
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Context manager that adds the time spent in its body to timer `name`."""
+        now = perf_counter()
+        if self._running:
+            self._add_time(self._running[-1], now - self._started)
+        self._running.append(name)
+        self._started = now
+        try:
+            yield
+        finally:
+            now = perf_counter()
+            self._add_time(self._running.pop(), now - self._started)
+            self._started = now
+
+    def add_docstring(self, doc: Docstring, crossrefs: int, rewritten: int) -> None:
+        """Records a scanned docstring and the number of crossrefs found in it."""
+        self.scanned += 1
+        self.crossrefs += crossrefs
+        self.rewritten += rewritten
+        counts = self.modules[_module_path(doc)]
+        counts["docstrings"] += 1
+        counts["crossrefs"] += crossrefs
+        counts["rewritten"] += rewritten
+
+    def counters(self) -> dict[str, int]:
+        """Returns values of all counters by name."""
+        return {name: getattr(self, name) for name in COUNTERS}
+
+    def summary(self) -> str:
+        """Returns one line summary of the counters and timers."""
+        times = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.times.items())
+        return (
+            f"{self.docstrings} docstrings ({self.scanned} scanned),"
+            f" {self.crossrefs} crossrefs ({self.rewritten} relative),"
+            f" {self.checks} checks ({self.check_cache_hits} cached, {self.unchecked} unverified),"
+            f" {self.package_loads} package loads; {times}"
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns representation as dictionary for JSON output."""
+        return {
+            "counters": self.counters(),
+            "times": self.times,
+            "modules": {module: dict(counts) for module, counts in sorted(self.modules.items())},
+            "pages": {page: dict(counts) for page, counts in sorted(self.pages.items())},
+        }
+
+    def dump(self, path: Path) -> None:
+        """Writes counters, timers and breakdowns by module and page to JSON file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf8")
+
+    def _add_time(self, name: str, seconds: float) -> None:
+        self.times[name] = self.times.get(name, 0.0) + seconds
+        if self.page:
+            self.pages[self.page][name] += seconds
+
+
+def _module_path(doc: Docstring) -> str:
+    """Returns path of the module containing the docstring, or empty string if none."""
+    obj = doc.parent
+    while obj is not None and not obj.is_module:
+        obj = obj.parent
+    return obj.path if obj is not None else ""
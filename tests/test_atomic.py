@@ -0,0 +1,43 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Unit tests for mkdocstrings_handlers.python_xref.atomic module"""
+
+from __future__ import annotations
+
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from mkdocstrings_handlers.python_xref.atomic import atomic_write
+
+
+def test_atomic_write(tmp_path: Path) -> None:
+    """Unit test for atomic_write"""
+    path = tmp_path / "sub" / "file.json"
+    with atomic_write(path) as f:
+        f.write("text")
+        assert not path.exists()
+    assert path.read_text(encoding="utf8") == "text"
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o666 & ~umask
+
+    # old file is kept and temporary file removed on errors
+    with pytest.raises(ValueError), atomic_write(path, "wb") as f:
+        f.write(b"partial")
+        raise ValueError
+    assert path.read_text(encoding="utf8") == "text"
+    assert [p.name for p in path.parent.iterdir()] == ["file.json"]
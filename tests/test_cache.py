@@ -0,0 +1,176 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Unit tests for mkdocstrings_handlers.python_xref.cache module"""
+
+from __future__ import annotations
+
+import json
+import os
+import stat
+from pathlib import Path
+
+import pytest
+from griffe import Class, Docstring, Function, Module
+
+from mkdocstrings_handlers.python_xref import cache as cache_module
+from mkdocstrings_handlers.python_xref.cache import CachedSubstitution, SubstitutionCache
+from mkdocstrings_handlers.python_xref.crossref import substitute_relative_crossrefs
+
+
+def make_module() -> Module:
+    """Construct module with crossrefs in docstrings"""
+    mod1 = Module(name="mod1", filepath=Path("mod1.py"))
+    cls1 = Class(name="Class1", parent=mod1)
+    mod1.members["Class1"] = cls1
+    meth1 = Function(name="meth1", parent=cls1)
+    cls1.members["meth1"] = meth1
+
+    mod1.docstring = Docstring("[Class1][.] [bad][.]", parent=mod1, lineno=1)
+    cls1.docstring = Docstring("[meth1][.]", parent=cls1, lineno=5)
+    meth1.docstring = Docstring("[bad][.]", parent=meth1, lineno=9)
+    return mod1
+
+
+def docstring_values(mod: Module) -> list[str]:
+    """Values of all docstrings in module from make_module"""
+    objs = (mod, mod["Class1"], mod["Class1.meth1"])
+    return [obj.docstring.value for obj in objs if obj.docstring is not None]
+
+
+def test_key() -> None:
+    """Unit test for SubstitutionCache.key"""
+    mod1 = make_module()
+    cls1 = mod1.members["Class1"]
+    assert isinstance(cls1, Class)
+    assert mod1.docstring is not None and cls1.docstring is not None
+
+    key = SubstitutionCache.key(mod1.docstring)
+    other = make_module().docstring
+    assert other is not None and key == SubstitutionCache.key(other)
+    # Key depends on text and enclosing objects but not on line number
+    assert key != SubstitutionCache.key(Docstring("[Class1][.]", parent=mod1))
+    assert key == SubstitutionCache.key(Docstring(mod1.docstring.value, parent=mod1, lineno=42))
+    assert key != SubstitutionCache.key(Docstring(mod1.docstring.value, parent=cls1))
+    mod2 = Module(name="mod2")
+    assert key != SubstitutionCache.key(Docstring(mod1.docstring.value, parent=mod2))
+
+    # whether a module is a package is part of the key
+    mod3 = Module(name="mod1", filepath=Path("mod1/__init__.py"))
+    mod3.set_member("sub", Module(name="sub", parent=mod3))
+    assert key != SubstitutionCache.key(Docstring(mod1.docstring.value, parent=mod3))
+
+
+def test_key_large_module() -> None:
+    """Keying all docstrings in a module takes linear time"""
+    mod = Module(name="mod", filepath=Path("mod.py"))
+    for i in range(2000):
+        cls = Class(name=f"Class{i}", parent=mod)
+        cls.docstring = Docstring("[x][.]", parent=cls)
+        mod.set_member(cls.name, cls)
+    keys = {SubstitutionCache.key(member.docstring) for member in mod.members.values() if member.docstring}
+    assert len(keys) == 2000
+    # one digest is remembered for each object and reused for its members
+    assert mod in cache_module._scope_digests
+    assert all(member in cache_module._scope_digests for member in mod.members.values())
+
+
+def test_save_load(tmp_path: Path) -> None:
+    """Unit test for SubstitutionCache persistence"""
+    cache = SubstitutionCache(tmp_path / "cache", max_entries=2)
+    assert len(cache) == 0
+    cache.save()
+    assert not (tmp_path / "cache").exists()
+
+    assert cache.get("a") is None
+    assert cache.misses == 1
+    cache.put("a", cache.entry("A", [(1, "unknown-ref", "x", ())], [(2, "ref")]))
+    cache.put("b", cache.entry("B", [], []))
+    assert cache.get("a") == CachedSubstitution("A", [(1, "unknown-ref", "x", ())], [(2, "ref")])
+    assert cache.hits == 1
+    # least recently used entry is evicted
+    cache.put("c", cache.entry("C", [], []))
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    cache.save()
+    path = cache.path
+    assert path is not None and path.is_file()
+    assert not list(path.parent.glob("*.tmp"))
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o666 & ~umask
+
+    cache2 = SubstitutionCache(tmp_path / "cache")
+    assert cache2.get("b") is None
+    assert cache2.get("c") == ("C", [], [])
+    assert cache2.get("a") == ("A", [(1, "unknown-ref", "x", ())], [(2, "ref")])
+    assert len(cache2) == 2
+
+    # cache from other version is ignored
+    data = json.loads(path.read_text())
+    data["version"] = "0.0.0"
+    path.write_text(json.dumps(data))
+    assert SubstitutionCache(tmp_path / "cache").get("a") is None
+
+    # malformed entries are skipped
+    data["version"] = cache_module._VERSION
+    data["entries"] = [["x"], ["y", 1, [], []], [["z"], "Z", [], []], ["a", "A", [[1, "k"]], []], ["b", "B", [], []]]
+    path.write_text(json.dumps(data))
+    cache4 = SubstitutionCache(tmp_path / "cache")
+    assert cache4.get("b") == ("B", [], [])
+    assert len(cache4) == 1
+
+    # corrupt cache is ignored
+    path.write_text("not json")
+    assert SubstitutionCache(tmp_path / "cache").get("a") is None
+
+    # cache without directory is only kept in memory
+    cache3 = SubstitutionCache(None)
+    assert cache3.path is None
+    cache3.put("a", cache3.entry("A", [], []))
+    cache3.save()
+    assert cache3.get("a") == ("A", [], [])
+
+def test_substitute_with_cache(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    """Unit test for substitute_relative_crossrefs with cache"""
+
+    def check_many(refs: set[str]) -> set[str]:
+        checked.append(refs)
+        return {ref for ref in refs if "bad" not in ref}
+
+    checked: list[set[str]] = []
+    mod1 = make_module()
+    cache = SubstitutionCache(tmp_path)
+    substitute_relative_crossrefs(mod1, check_many=check_many, cache=cache)
+    expected_values = docstring_values(mod1)
+    expected_messages = [msg for _, _, msg in caplog.record_tuples]
+    assert len(expected_messages) == 2
+    assert cache.misses == 3 and cache.hits == 0
+    cache.save()
+
+    caplog.clear()
+    mod1 = make_module()
+    cache = SubstitutionCache(tmp_path)
+    substitute_relative_crossrefs(mod1, check_many=check_many, cache=cache)
+    assert cache.misses == 0 and cache.hits == 3
+    assert docstring_values(mod1) == expected_values
+    assert [msg for _, _, msg in caplog.record_tuples] == expected_messages
+    # references from cached results are still checked
+    assert checked[0] == checked[1]
+
+    # cache also works without batched checks
+    caplog.clear()
+    mod1 = make_module()
+    substitute_relative_crossrefs(mod1, checkref=lambda ref: "bad" not in ref, cache=cache)
+    assert cache.hits == 6
+    assert [msg for _, _, msg in caplog.record_tuples] == expected_messages
@@ -0,0 +1,197 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Unit tests for mkdocstrings_handlers.python_xref.cli module"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from griffe import GriffeLoader, ModulesCollection
+
+from mkdocstrings_handlers.python_xref.cli import (
+    LoaderSettings,
+    Shard,
+    _Checker,
+    _read_config,
+    check_shard,
+    find_packages,
+    main,
+    make_shards,
+)
+from mkdocstrings_handlers.python_xref.index import NameIndex
+
+project_dir = Path(__file__).parent.joinpath('project').absolute()
+project_mkdocs = project_dir / 'mkdocs.yml'
+bar_src_file = project_dir / 'src' / 'myproj' / 'bar.py'
+
+def test_find_packages() -> None:
+    """Unit test for find_packages"""
+    assert find_packages(project_dir / 'docs') == ['myproj']
+
+def test_make_shards() -> None:
+    """Unit test for make_shards"""
+    shards = make_shards(['a', 'b'], 1, search_paths=['src'])
+    assert shards == [Shard('a', search_paths=('src',)), Shard('b', search_paths=('src',))]
+    shards = make_shards(['a', 'b'], 5)
+    assert [(s.package, s.index, s.count) for s in shards] == [
+        ('a', 0, 2), ('a', 1, 2), ('b', 0, 2), ('b', 1, 2)
+    ]
+
+def test_check_shard() -> None:
+    """Unit test for check_shard"""
+    paths = (str(project_dir / 'src'),)
+    whole = check_shard(Shard('myproj', search_paths=paths))
+    assert {(d.path, d.line, d.kind, d.ref) for d in whole} >= {
+        (str(bar_src_file), 16, 'unknown-ref', 'myproj.bar.bad'),
+    }
+    # shards of a package together find the same problems
+    parts = [check_shard(Shard('myproj', i, 3, search_paths=paths)) for i in range(3)]
+    assert sorted(d.key() for part in parts for d in part) == sorted(d.key() for d in whole)
+
+    assert [(d.kind, d.ref) for d in check_shard(Shard('no_such_package'))] == [
+        ('unknown-ref', 'no_such_package')
+    ]
+
+def test_main(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    """Unit test for command line checker"""
+    assert main(['-f', str(project_mkdocs), '-j', '1']) == 1
+    out = capsys.readouterr().out.splitlines()
+    assert f"{bar_src_file}:16:11: unknown-ref: Cannot load reference 'myproj.bar.bad'" in out
+
+    # results are the same with parallel shards
+    report = tmp_path / 'report.json'
+    assert main(['-f', str(project_mkdocs), '-j', '2', '--report', str(report)]) == 1
+    assert capsys.readouterr().out.splitlines() == out
+    data = json.loads(report.read_text())
+    assert len(data['diagnostics']) == len(out)
+
+    assert main(['-f', str(project_mkdocs), '-j', '1', '-x', r'myproj\.bar\.bad']) == 1
+    excluded = capsys.readouterr().out.splitlines()
+    assert len(excluded) == len(out) - 1
+
+    assert main(['-f', str(project_mkdocs), '-j', '1', '--no-check']) == 1
+    assert all('unknown-ref' not in line for line in capsys.readouterr().out.splitlines())
+
+    assert main(['-p', str(project_dir / 'src'), '-j', '1', 'myproj.foo']) == 0
+
+    # no packages given or documented
+    empty_mkdocs = tmp_path / 'mkdocs.yml'
+    empty_mkdocs.write_text('site_name: empty\n')
+    with pytest.raises(SystemExit):
+        main(['-f', str(empty_mkdocs)])
+
+
+def test_checker_index_file(tmp_path: Path) -> None:
+    """Check references against index file instead of loading packages"""
+    src_dir = tmp_path / 'src'
+    src_dir.mkdir()
+    (src_dir / 'extpkg.py').write_text('class Foo: ...\n')
+    collection = ModulesCollection()
+    GriffeLoader(search_paths=[str(src_dir)], modules_collection=collection).load('extpkg')
+    index = NameIndex()
+    index.update(collection)
+    index.save(tmp_path / 'names.idx')
+
+    # pylint: disable=protected-access
+    loader = GriffeLoader(search_paths=[str(src_dir)])
+    checker = _Checker(loader, [], str(tmp_path / 'names.idx'))
+    assert checker({'extpkg.Foo', 'extpkg.Bar'}) == {'extpkg.Foo'}
+    assert 'extpkg' not in loader.modules_collection.members
+
+
+def test_main_loader_settings(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    """Packages are loaded with the griffe settings configured for the handler"""
+    (tmp_path / 'src' / 'extpkg').mkdir(parents=True)
+    (tmp_path / 'src' / 'extpkg' / '__init__.py').write_text('"""See [added][(m).added]"""\n')
+    (tmp_path / 'ext.py').write_text(
+        'import griffe\n\n'
+        'class AddMember(griffe.Extension):\n'
+        '    def on_package_loaded(self, *, pkg, **kwargs):\n'
+        '        pkg.set_member("added", griffe.Attribute("added", parent=pkg))\n'
+    )
+    (tmp_path / 'docs').mkdir()
+    (tmp_path / 'docs' / 'index.md').write_text('::: extpkg\n')
+    config = (
+        'site_name: ext\n'
+        'plugins:\n'
+        '- mkdocstrings:\n'
+        '    handlers:\n'
+        '      python_xref:\n'
+        '        paths: [src]\n'
+        '        options:\n'
+        '          docstring_style: numpy\n'
+    )
+    (tmp_path / 'mkdocs.yml').write_text(config)
+    assert main(['-f', str(tmp_path / 'mkdocs.yml'), '-j', '1']) == 1
+    assert "unknown-ref: Cannot load reference 'extpkg.added'" in capsys.readouterr().out
+
+    # extension paths are relative to the config file
+    (tmp_path / 'mkdocs.yml').write_text(config + '          extensions: [ext.py]\n')
+    assert main(['-f', str(tmp_path / 'mkdocs.yml'), '-j', '1']) == 0
+
+    settings = make_shards(['extpkg'], 1, loader=_read_config(tmp_path / 'mkdocs.yml').loader)[0].loader
+    assert settings == LoaderSettings(extensions=(str(tmp_path / 'ext.py'),), docstring_style='numpy')
+
+
+def test_read_config(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    """Unit test for reading the forms of mkdocs config files"""
+    (tmp_path / 'docs').mkdir()
+    (tmp_path / 'docs' / 'index.md').write_text('::: pkg\n')
+
+    # plugins given as mapping
+    (tmp_path / 'mapping.yml').write_text(
+        'plugins:\n'
+        '  search: {}\n'
+        '  mkdocstrings:\n'
+        '    handlers:\n'
+        '      python_xref:\n'
+        '        paths: [src]\n'
+        '        options:\n'
+        '          check_crossrefs_exclude: [foo]\n'
+    )
+    config = _read_config(tmp_path / 'mapping.yml')
+    assert config.paths == [str(tmp_path / 'src')]
+    assert config.exclude == ['foo']
+    assert config.packages == ['pkg']
+
+    # settings are inherited from other config files
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'mkdocs.yml').write_text(
+        'INHERIT: ../mapping.yml\n'
+        'docs_dir: ../docs\n'
+        'plugins:\n'
+        '  mkdocstrings:\n'
+        '    handlers:\n'
+        '      python_xref:\n'
+        '        options:\n'
+        '          check_crossrefs: false\n'
+    )
+    config = _read_config(tmp_path / 'sub' / 'mkdocs.yml')
+    assert config.paths == [str(tmp_path / 'sub' / 'src')]
+    assert config.exclude == ['foo']
+    assert config.check is False
+    assert config.packages == ['pkg']
+
+    # plugins without settings
+    (tmp_path / 'plain.yml').write_text('plugins:\n- search\n- mkdocstrings\n')
+    assert _read_config(tmp_path / 'plain.yml').paths == [str(tmp_path)]
+
+    # configs that cannot be read are reported
+    for text in ('INHERIT: missing.yml\n', 'plugins: search\n', 'plugins:\n- mkdocstrings: [1]\n', 'plugins: [\n'):
+        (tmp_path / 'bad.yml').write_text(text)
+        with pytest.raises(SystemExit):
+            main(['-f', str(tmp_path / 'bad.yml'), 'pkg'])
+        assert 'cannot read' in capsys.readouterr().err
@@ -25,14 +25,20 @@ from typing import Callable, Optional
 
 import griffe
 import pytest
-from griffe import Class, Docstring, Function, Module, Object, LinesCollection
+from griffe import Alias, Class, Docstring, Function, Module, ModulesCollection, Object, LinesCollection
 
 # noinspection PyProtectedMember
 from mkdocstrings_handlers.python_xref.crossref import (
-    _RE_CROSSREF,
-    _RE_REL_CROSSREF,
+    _RE_SCANNER,
     _RelativeCrossrefProcessor,
-    substitute_relative_crossrefs, doc_value_offset_to_location,
+    _parse_parent,
+    _source_map,
+    CrossrefRecord,
+    defer_relative_crossrefs,
+    iter_crossrefs,
+    iter_docstrings,
+    presubstitute_relative_crossrefs,
+    substitute_relative_crossrefs, doc_value_offset_to_location, safe_eval,
 )
 
 def test_RelativeCrossrefProcessor(caplog: pytest.LogCaptureFixture) -> None:
@@ -71,13 +77,10 @@ def test_RelativeCrossrefProcessor(caplog: pytest.LogCaptureFixture) -> None:
             expected = ref
         crossref = f"[{title}][{ref}]"
         doc = Docstring(parent=parent, value=f"subject\n\n{crossref}\n", lineno=42)
-        match = _RE_REL_CROSSREF.search(doc.value)
-        if relative:
-            assert match is not None
-        else:
-            assert match is None
-            match = _RE_CROSSREF.search(doc.value)
-            assert match is not None
+        match = _RE_SCANNER.search(doc.value)
+        assert match is not None
+        assert match["title"] == title
+        assert (match["ref"] is None) == relative
         caplog.clear()
         actual = _RelativeCrossrefProcessor(doc, checkref=checkref)(match)
         if warning:
@@ -115,12 +118,21 @@ def test_RelativeCrossrefProcessor(caplog: pytest.LogCaptureFixture) -> None:
     assert_sub(cls1, "foo", "?.", "mod1.mod2.Class1.foo", checkref=assert_nocheck)
     assert_sub(cls1, "foo", "?mod1.mod2.Class1.foo", "mod1.mod2.Class1.foo",
                checkref=assert_nocheck, relative=False)
+    assert_sub(cls1, "foo", "?", "foo", checkref=assert_nocheck, relative=False)
+
+    # regular references
+
+    assert_sub(cls1, "foo", "", "foo", relative=False)
+    assert_sub(cls1, "foo", "mod1.bar", relative=False)
+    assert_sub(cls1, "foo", "mod1.(c)", relative=False)
 
     # Error cases
 
     assert_sub(meth1, "foo", ".", ".", warning="Cannot use '.'")
     assert_sub(meth1, "foo", ".bar", ".bar", warning="Cannot use '.'")
     assert_sub(meth1, "foo", ".bad+syntax", warning="Bad syntax")
+    assert_sub(meth1, "foo", "?(x).", "?(x).", warning="Bad syntax in relative cross reference: '\\(x\\).'")
+    assert_sub(meth1, "foo", "bad-syntax.", warning="Bad syntax")
     assert_sub(meth1, "bad id", "..", warning="not a qualified identifier")
     assert_sub(mod2, "foo", "(c)", warning="not in a class")
     assert_sub(meth1, "foo", "^^^^", warning="too many levels")
@@ -133,6 +145,42 @@ def test_RelativeCrossrefProcessor(caplog: pytest.LogCaptureFixture) -> None:
                checkref=lambda x: False)
 
 
+
+def test_RelativeCrossrefProcessor_contexts() -> None:
+    """Parent specifiers are resolved from contexts computed once per object"""
+    pkg = Module(name="pkg", filepath=Path("pkg/__init__.py"))
+    mod = Module(name="mod", parent=pkg, filepath=Path("pkg/mod.py"))
+    pkg.members.update(mod=mod)
+    cls = Class(name="Cls", parent=mod)
+    mod.members.update(Cls=cls)
+    inner = Class(name="Inner", parent=cls)
+    cls.members.update(Inner=inner)
+    meth = Function(name="meth", parent=inner)
+    inner.members.update(meth=meth)
+
+    assert _parse_parent("(c).") == ("class", "")
+    assert _parse_parent("^^.") == ("up", "^^")
+    assert _parse_parent("...") == ("up", "..")
+    assert _parse_parent(".") == ("current", "")
+
+    processor = _RelativeCrossrefProcessor(Docstring(""))
+    subs = {}
+    for obj in (meth, cls, mod, pkg):
+        doc = Docstring("[x][(c).] [x][(m).] [x][(p).] [x][^^.] [x][.]", parent=obj)
+        processor.reset(doc)
+        subs[obj.name] = _RE_SCANNER.sub(processor, doc.value)
+    assert subs["meth"] == "[x][pkg.mod.Cls.Inner.x] [x][pkg.mod.x] [x][pkg.x] [x][pkg.mod.Cls.x] [x][.]"
+    assert subs["Cls"] == "[x][pkg.mod.Cls.x] [x][pkg.mod.x] [x][pkg.x] [x][pkg.x] [x][pkg.mod.Cls.x]"
+    assert subs["mod"].startswith("[x][(c).] [x][pkg.mod.x] [x][pkg.x] [x][^^.] [x][pkg.mod.x]")
+    assert subs["pkg"].startswith("[x][(c).] [x][pkg.x] [x][pkg.x] [x][^^.] [x][pkg.x]")
+
+    # contexts were computed once for each object, from those of their parents
+    contexts = processor._contexts
+    assert list(contexts) == [pkg, mod, cls, inner, meth]
+    assert contexts[meth].ancestors == (meth, inner, cls, mod, pkg)
+    assert contexts[meth].cls is inner
+    assert contexts[cls].module is mod
+
 def test_substitute_relative_crossrefs(caplog: pytest.LogCaptureFixture) -> None:
     """Unit test for substitute_relative_crossrefs.
 
@@ -179,6 +227,185 @@ def test_substitute_relative_crossrefs(caplog: pytest.LogCaptureFixture) -> None
 
     assert len(caplog.records) == 0
 
+    # docstrings in processed set are skipped
+    processed: set[Docstring] = {meth1.docstring}
+    meth1.docstring.value = "[foo][..]"
+    mod1.docstring.value = "[foo][.]"
+    substitute_relative_crossrefs(mod1, processed=processed)
+    assert meth1.docstring.value == "[foo][..]"
+    assert mod1.docstring.value == "[foo][mod1.foo]"
+    assert processed == {meth1.docstring, mod1.docstring}
+
+def test_substitute_relative_crossrefs_aliases() -> None:
+    """Unit test for substitute_relative_crossrefs with aliases"""
+    collection = ModulesCollection()
+    pkg = Module(name="pkg", filepath=Path("pkg/__init__.py"), modules_collection=collection)
+    collection.members["pkg"] = pkg
+    sub = Module(name="sub", parent=pkg, filepath=Path("pkg/sub.py"))
+    pkg.members["sub"] = sub
+    cls1 = Class(name="Class1", parent=pkg)
+    pkg.members["Class1"] = cls1
+    cls1.docstring = Docstring("[foo][.]", parent=cls1)
+    # re-export of class and alias cycle back to the package
+    sub.members["Class1"] = Alias("Class1", cls1, parent=sub)
+    sub.members["pkg"] = Alias("pkg", pkg, parent=sub)
+    sub.members["Again"] = Alias("Again", sub.members["Class1"], parent=sub)
+    sub.members["Unresolved"] = Alias("Unresolved", "nowhere.Thing", parent=sub)
+
+    checked: list[str] = []
+
+    def checkref(ref: str) -> bool:
+        checked.append(ref)
+        return True
+
+    assert substitute_relative_crossrefs(pkg, checkref=checkref) == 3
+    assert checked == ["pkg.Class1.foo"]
+    assert cls1.docstring.value == "[foo][pkg.Class1.foo]"
+
+    # starting from an alias visits its target
+    checked.clear()
+    assert substitute_relative_crossrefs(sub.members["Again"], checkref=checkref) == 0
+    assert checked == ["pkg.Class1.foo"]
+
+def test_defer_relative_crossrefs(caplog: pytest.LogCaptureFixture) -> None:
+    """Unit test for defer_relative_crossrefs
+
+    Arguments:
+        caplog: fixture
+    """
+    mod1 = Module(name="mod1", filepath=Path("mod1.py"))
+    mod1.docstring = Docstring("[foo][.]", parent=mod1)
+    cls1 = Class(name="Class1", parent=mod1)
+    mod1.members["Class1"] = cls1
+    cls1.docstring = Docstring("[bar][.]", parent=cls1)
+
+    checked: list[str] = []
+
+    def checkref(ref: str) -> bool:
+        checked.append(ref)
+        return ref != "mod1.Class1.bar"
+
+    processed: set[Docstring] = set()
+    assert defer_relative_crossrefs(mod1, checkref=checkref, processed=processed) == 0
+    assert processed == {mod1.docstring, cls1.docstring}
+    assert not checked
+
+    # nothing happens until value is read
+    assert mod1.docstring.value == "[foo][mod1.foo]"
+    assert checked == ["mod1.foo"]
+    assert mod1.docstring.value == "[foo][mod1.foo]"
+    assert not getattr(mod1.docstring, "pending")
+    assert checked == ["mod1.foo"]
+    assert not caplog.records
+
+    assert cls1.docstring.parse()
+    assert checked == ["mod1.foo", "mod1.Class1.bar"]
+    assert len(caplog.records) == 1
+    assert "Cannot load reference 'mod1.Class1.bar'" in caplog.records[0].getMessage()
+
+    # already processed docstrings are not deferred again
+    cls1.docstring.value = "[baz][.]"
+    defer_relative_crossrefs(mod1, checkref=checkref, processed=processed)
+    assert cls1.docstring.value == "[baz][.]"
+
+    # errors in substitution are raised, leaving the original value
+    mod2 = Module(name="mod2", filepath=Path("mod2.py"))
+    mod2.docstring = Docstring("[foo][.]", parent=mod2)
+
+    def failing_checkref(ref: str) -> bool:
+        raise RuntimeError(ref)
+
+    defer_relative_crossrefs(mod2, checkref=failing_checkref)
+    with pytest.raises(RuntimeError, match="mod2.foo"):
+        mod2.docstring.value  # pylint: disable=pointless-statement
+    assert getattr(mod2.docstring, "pending")
+    assert mod2.docstring.__dict__["value"] == "[foo][.]"
+    assert mod2.docstring.parent is mod2
+
+def test_iter_docstrings() -> None:
+    """Unit test for iter_docstrings"""
+    mod1 = Module(name="mod1", filepath=Path("mod1.py"))
+    mod1.docstring = Docstring("mod1", parent=mod1)
+    parent: Object = mod1
+    for i in range(3):
+        cls = Class(name=f"Class{i}", parent=parent)
+        cls.docstring = Docstring(f"class{i}", parent=cls)
+        parent.members[cls.name] = cls
+        func = Function(name=f"func{i}", parent=parent)
+        parent.members[func.name] = func  # no docstring
+        parent = cls
+
+    docs = iter_docstrings(mod1)
+    obj, doc = next(docs)
+    assert obj is mod1
+    assert doc is mod1.docstring
+    # walk is lazy, so changes to members are seen by later steps
+    del mod1.members["Class0"].members["Class1"]
+    assert [doc.value for _, doc in docs] == ["class0"]
+
+    assert [obj.name for obj, _ in iter_docstrings(parent)] == ["Class2"]
+
+def test_iter_crossrefs(caplog: pytest.LogCaptureFixture) -> None:
+    """Unit test for iter_crossrefs"""
+    mod1 = Module(name="mod1", filepath=Path("mod1.py"))
+    cls1 = Class(name="Class1", parent=mod1)
+    mod1.members["Class1"] = cls1
+    meth1 = Function(name="meth1", parent=cls1)
+    cls1.members["meth1"] = meth1
+    mod1.docstring = Docstring("[Class1][.] [x][mod1.Class1] [y][?mod1.nope]", parent=mod1)
+    meth_doc = "[meth2][(c).] [Class2][(m).] [z][....] [w][.] [v][.foo()] [Class1][^^.]"
+    meth1.docstring = Docstring(meth_doc, parent=meth1)
+
+    records = list(iter_crossrefs(mod1, checkref=lambda ref: ref != "mod1.Class2"))
+    # nothing is modified or logged
+    assert mod1.docstring.value == "[Class1][.] [x][mod1.Class1] [y][?mod1.nope]"
+    assert meth1.docstring.value == meth_doc
+    assert len(caplog.records) == 0
+
+    assert [(r.path, r.ref, r.resolved, r.kind, r.valid, r.error) for r in records] == [
+        ("mod1", ".", "mod1.Class1", "current", True, ""),
+        ("mod1", "mod1.Class1", "mod1.Class1", "absolute", True, ""),
+        ("mod1", "?mod1.nope", "mod1.nope", "absolute", None, ""),
+        ("mod1.Class1.meth1", "(c).", "mod1.Class1.meth2", "class", True, ""),
+        ("mod1.Class1.meth1", "(m).", "mod1.Class2", "module", False, ""),
+        ("mod1.Class1.meth1", "....", "", "up", False, "too-many-levels"),
+        ("mod1.Class1.meth1", ".", "", "current", False, "current-in-function"),
+        ("mod1.Class1.meth1", ".foo()", "", "invalid", False, "bad-syntax"),
+        ("mod1.Class1.meth1", "^^.", "mod1.Class1", "up", True, ""),
+    ]
+    first = records[0]
+    assert isinstance(first, CrossrefRecord)
+    assert (first.offset, first.title) == (0, "Class1")
+    assert records[3].offset == 0 and records[4].offset == meth_doc.index("[Class2]")
+    assert not hasattr(first, "__dict__")
+
+    # without checkref, only unresolved references are known to be invalid
+    assert [r.valid for r in iter_crossrefs(meth1)] == [None, None, False, False, False, None]
+    assert [r.kind for r in iter_crossrefs(Module(name="empty"))] == []
+
+    # builtin names are not checked, as in substitution
+    builtins = Module(name="builtins_mod", filepath=Path("builtins_mod.py"))
+    builtins.docstring = Docstring("[int][] [str][str] [x][mod1.x]", parent=builtins)
+    records = list(iter_crossrefs(builtins, checkref=lambda ref: False))
+    assert [(r.resolved, r.valid) for r in records] == [("int", None), ("str", None), ("mod1.x", False)]
+    substitute_relative_crossrefs(builtins, checkref=lambda ref: False)
+    assert len(caplog.records) == 1
+
+    # deferred substitutions are not triggered, and load time substitutions
+    # are not seen, so the same references are found
+    expected = [(r.offset, r.ref, r.resolved, r.error) for r in iter_crossrefs(mod1)]
+    defer_relative_crossrefs(mod1)
+    assert [(r.offset, r.ref, r.resolved, r.error) for r in iter_crossrefs(mod1)] == expected
+    assert getattr(mod1.docstring, "pending")
+    assert mod1.docstring.value.startswith("[Class1][mod1.Class1]")
+    assert [(r.offset, r.ref, r.resolved, r.error) for r in iter_crossrefs(mod1)] == expected
+    cls1.docstring = None
+    mod1.docstring = Docstring("[Class1][.] [x][mod1.Class1] [y][?mod1.nope]", parent=mod1)
+    meth1.docstring = Docstring(meth_doc, parent=meth1)
+    presubstitute_relative_crossrefs(mod1)
+    assert meth1.docstring.value != meth_doc
+    assert [(r.offset, r.ref, r.resolved, r.error) for r in iter_crossrefs(mod1)] == expected
+
 def make_docstring_from_source(
     source: str,
     *,
@@ -229,6 +456,8 @@ def test_doc_value_offset_to_location() -> None:
     assert doc_value_offset_to_location(doc1, 3) == (1, 7)
     assert doc_value_offset_to_location(doc1, 7) == (2, 2)
     assert doc_value_offset_to_location(doc1, 15) == (3, 3)
+    # many offsets at once, in any order
+    assert _source_map(doc1).locations([15, 0, 7, 3]) == [(3, 3), (1, 4), (2, 2), (1, 7)]
 
     doc2 = make_docstring_from_source(
         dedent(
@@ -266,6 +495,11 @@ def test_doc_value_offset_to_location() -> None:
     assert doc_value_offset_to_location(doc3, 0) == (2, 5)
     assert doc_value_offset_to_location(doc3, 6) == (3, 3)
 
+    # docstring source is never evaluated as code
+    with pytest.raises(ValueError):
+        safe_eval("__import__('os').getcwd()")
+    assert safe_eval("'a'  # comment\n  'b'") == "ab"
+
 def test_griffe() -> None:
     """
     Test substitution on griffe rep of local project
@@ -280,3 +514,42 @@ def test_griffe() -> None:
     )
     substitute_relative_crossrefs(myproj)
     # TODO - grovel output
+
+def test_substitute_relative_crossrefs_check_many(caplog: pytest.LogCaptureFixture) -> None:
+    """Unit test for substitute_relative_crossrefs with batched checking.
+
+    Arguments:
+        caplog: fixture
+    """
+    mod1 = Module(name="mod1", filepath=Path("mod1.py"))
+    cls1 = Class(name="Class1", parent=mod1)
+    mod1.members["Class1"] = cls1
+    meth1 = Function(name="meth1", parent=cls1)
+    cls1.members["meth1"] = meth1
+
+    mod1.docstring = Docstring("[Class1][.] [bad][.] [unchecked][?.]", parent=mod1, lineno=1)
+    cls1.docstring = Docstring("[meth1][.] [bad][(m).]", parent=cls1, lineno=5)
+    meth1.docstring = Docstring("[bad][.]", parent=meth1, lineno=9)
+
+    calls: list[set[str]] = []
+
+    def check_many(refs: set[str]) -> set[str]:
+        # docstrings are not modified or reported until after checking
+        assert mod1.docstring is not None
+        assert mod1.docstring.value.startswith("[Class1][.]")
+        assert not caplog.records
+        calls.append(refs)
+        return {ref for ref in refs if "bad" not in ref}
+
+    substitute_relative_crossrefs(mod1, check_many=check_many)
+
+    assert calls == [{"mod1.Class1", "mod1.bad", "mod1.Class1.meth1", ""}]
+    assert mod1.docstring.value == "[Class1][mod1.Class1] [bad][mod1.bad] [unchecked][mod1.unchecked]"
+    assert cls1.docstring.value == "[meth1][mod1.Class1.meth1] [bad][mod1.bad]"
+    assert meth1.docstring.value == "[bad][.]"
+
+    messages = [msg for _, _, msg in caplog.record_tuples]
+    assert len(messages) == 3
+    assert "mod1.py:1:" in messages[0] and "Cannot load reference 'mod1.bad'" in messages[0]
+    assert "mod1.py:5:" in messages[1] and "Cannot load reference 'mod1.bad'" in messages[1]
+    assert "mod1.py:9:" in messages[2] and "Cannot use '.'" in messages[2]
@@ -0,0 +1,81 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Unit tests for mkdocstrings_handlers.python_xref.diagnostics module"""
+
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+from mkdocstrings_handlers.python_xref.diagnostics import Diagnostic, DiagnosticsCollector
+
+def test_diagnostic() -> None:
+    """Unit test for Diagnostic class"""
+    diagnostic = Diagnostic("/src/mod.py", 3, 5, "unknown-ref", "mod.foo")
+    assert diagnostic.message == "Cannot load reference 'mod.foo'"
+    assert diagnostic.format() == "file:///src/mod.py:3:5: \nCannot load reference 'mod.foo'"
+    assert diagnostic == Diagnostic("/src/mod.py", 3, 5, "unknown-ref", "mod.foo")
+    assert diagnostic != Diagnostic("/src/mod.py", 4, 5, "unknown-ref", "mod.foo")
+
+    diagnostic = Diagnostic("/src/mod.py", 3, -1, "too-many-levels", "...x", args=("..", "mod"))
+    assert diagnostic.format() == "file:///src/mod.py:3: \n'..' has too many levels for mod"
+    assert Diagnostic("", -1, -1, "no-parent", "").format() == "INTERNAL ERROR: docstring lacks a parent!"
+    assert diagnostic.to_dict() == {
+        "path": "/src/mod.py",
+        "line": 3,
+        "col": -1,
+        "kind": "too-many-levels",
+        "ref": "...x",
+        "message": "'..' has too many levels for mod",
+    }
+
+def test_collector(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    """Unit test for DiagnosticsCollector class"""
+    collector = DiagnosticsCollector()
+    collector.add(Diagnostic("b.py", 1, 1, "unknown-ref", "b"))
+    collector.add(Diagnostic("a.py", 10, 1, "unknown-ref", "a10"))
+    collector.add(Diagnostic("a.py", 2, 1, "unknown-ref", "a2"))
+    # duplicates are dropped
+    collector.add(Diagnostic("b.py", 1, 1, "unknown-ref", "b"))
+    assert len(collector) == 3
+    assert [d.ref for d in collector] == ["a2", "a10", "b"]
+
+    report = tmp_path / "out" / "report.json"
+    assert collector.emit(report) == 3
+    assert len(collector) == 0
+    assert [r.levelno for r in caplog.records] == [logging.WARNING] * 3
+    assert "a2" in caplog.records[0].getMessage()
+    data = json.loads(report.read_text())
+    assert [d["ref"] for d in data["diagnostics"]] == ["a2", "a10", "b"]
+
+    collector.add(Diagnostic(str(tmp_path / "a.py"), 2, 3, "bad-syntax", "a.("))
+    collector.add(Diagnostic("", -1, -1, "no-parent", ""))
+    sarif_file = tmp_path / "report.sarif"
+    assert collector.emit(sarif_file) == 2
+    sarif = json.loads(sarif_file.read_text())
+    assert sarif["version"] == "2.1.0"
+    run = sarif["runs"][0]
+    assert [rule["id"] for rule in run["tool"]["driver"]["rules"]] == ["bad-syntax", "no-parent"]
+    # diagnostics without a known path sort first
+    nopath, located = run["results"]
+    assert nopath["ruleId"] == "no-parent" and "locations" not in nopath
+    location = located["locations"][0]["physicalLocation"]
+    assert location["artifactLocation"]["uri"] == (tmp_path / "a.py").as_uri()
+    assert location["region"] == {"startLine": 2, "startColumn": 3}
+
+    # nothing is written if no report file is given
+    assert collector.emit() == 0
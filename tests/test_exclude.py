@@ -0,0 +1,78 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Unit tests for mkdocstrings_handlers.python_xref.exclude module"""
+
+from __future__ import annotations
+
+import re
+
+# noinspection PyProtectedMember
+from mkdocstrings_handlers.python_xref.exclude import ExcludeMatcher, _literal_prefix, exclude_matcher
+
+
+def test_literal_prefix() -> None:
+    """Unit test for _literal_prefix"""
+    assert _literal_prefix("torch") == "torch"
+    assert _literal_prefix(r"^torch\.") == "torch."
+    assert _literal_prefix(r"^torch\.(.*)") == "torch."
+    assert _literal_prefix(r"torch\.nn.*") == "torch.nn"
+    assert _literal_prefix(re.compile(r"numpy\.")) == "numpy."
+    assert _literal_prefix(re.compile(r"numpy\.", re.IGNORECASE)) is None
+    assert _literal_prefix(r"torch.nn") is None
+    assert _literal_prefix(r"torch$") is None
+    assert _literal_prefix(r"torch\.[a-z]") is None
+    assert _literal_prefix(r"torch\.*") is None
+    assert _literal_prefix(r"^") is None
+    assert _literal_prefix(r".*") is None
+
+
+def test_exclude_matcher() -> None:
+    """Unit test for ExcludeMatcher"""
+    patterns: list[str | re.Pattern] = [
+        r"^torch\.(.*)",
+        r"numpy",
+        r"numpy\.linalg",
+        re.compile(r"scipy\."),
+        r"pandas\.[A-Z]",
+        r"(?P<x>jax)\.(?P=x)",
+        r"(?i)tensorflow",
+        re.compile(r"sklearn", re.IGNORECASE),
+        r"(?P<x>foo)",
+        r"(?P<x>bar)",
+    ]
+    refs = [
+        "torch", "torch.nn", "torchvision",
+        "numpy", "numpy.ndarray", "numpyx", "num",
+        "scipy", "scipy.stats",
+        "pandas.DataFrame", "pandas.read_csv",
+        "jax.jax", "jax.numpy",
+        "TensorFlow.keras", "SKLearn.base",
+        "foo.x", "bar", "baz",
+    ]
+    matcher = ExcludeMatcher(patterns)
+    assert len(matcher) == len(patterns)
+    assert matcher.patterns == tuple(patterns)
+    for ref in refs:
+        expected = any(re.match(p, ref) for p in patterns)
+        assert matcher(ref) == expected, ref
+        # memoized
+        assert matcher(ref) == expected, ref
+
+    assert not ExcludeMatcher([])("foo")
+
+    # matchers are shared for equal patterns
+    m1 = exclude_matcher([r"foo\.", re.compile("bar")])
+    assert m1 is exclude_matcher((r"foo\.", re.compile("bar")))
+    assert m1 is not exclude_matcher([r"foo\.", re.compile("bar", re.IGNORECASE)])
+    assert m1("foo.x") and m1("bar") and not m1("BAR")
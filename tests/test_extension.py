@@ -0,0 +1,101 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Unit tests for mkdocstrings_handlers.python_xref.extension module"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import griffe
+from griffe import Module
+
+from mkdocstrings_handlers.python_xref.crossref import (
+    crossref_count,
+    iter_docstrings,
+    substitute_relative_crossrefs,
+)
+from mkdocstrings_handlers.python_xref.diagnostics import DiagnosticsCollector
+from mkdocstrings_handlers.python_xref.extension import RelativeCrossrefsExtension
+from mkdocstrings_handlers.python_xref.stats import CrossrefStats
+
+project_src_dir = Path(__file__).parent / 'project' / 'src'
+
+
+def _load(*extensions: griffe.Extension) -> Module:
+    pkg = griffe.load(
+        'myproj',
+        search_paths=[project_src_dir],
+        extensions=griffe.load_extensions(*extensions),
+        resolve_aliases=True,
+    )
+    assert isinstance(pkg, Module)
+    return pkg
+
+
+def test_extension() -> None:
+    """Unit test for RelativeCrossrefsExtension"""
+    stats = CrossrefStats()
+    extension = RelativeCrossrefsExtension(stats)
+    pkg = _load(extension)
+    assert extension.packages == 1
+    assert stats.scanned > 0
+
+    # docstrings are substituted as if by substitute_relative_crossrefs
+    expected = _load()
+    substitute_relative_crossrefs(expected, diagnostics=DiagnosticsCollector())
+    values = [doc.value for _, doc in iter_docstrings(pkg)]
+    assert values == [doc.value for _, doc in iter_docstrings(expected)]
+
+    bar = pkg.modules['bar']
+    assert bar.docstring is not None
+    assert '[bad][myproj.bar.bad]' in bar.docstring.value
+    assert crossref_count(bar) == stats.modules['myproj.bar']['docstrings'] > 0
+    assert crossref_count(pkg.modules['foo']) == 0
+    # package re-exports objects from submodules, so its count is not known
+    assert crossref_count(pkg.modules['pkg']) is None
+    assert crossref_count(pkg) is None
+    assert crossref_count(bar['Bar']) is None
+
+
+def test_extension_deferred_checks() -> None:
+    """Checks and errors from load time are reported on later substitution"""
+    pkg = _load(RelativeCrossrefsExtension())
+    bar = pkg.modules['bar']
+    value = bar.docstring.value if bar.docstring else ''
+
+    expected = DiagnosticsCollector()
+    substitute_relative_crossrefs(
+        _load().modules['bar'], checkref=lambda ref: 'bad' not in ref, diagnostics=expected)
+    assert len(expected) > 0
+
+    for check_many in (None, lambda refs: {ref for ref in refs if 'bad' not in ref}):
+        diagnostics = DiagnosticsCollector()
+        substitute_relative_crossrefs(
+            bar,
+            checkref=lambda ref: 'bad' not in ref,
+            check_many=check_many,
+            diagnostics=diagnostics,
+        )
+        # same problems at same source locations, docstring not substituted again
+        assert list(diagnostics) == list(expected)
+        assert bar.docstring is not None and bar.docstring.value is value
+
+
+def test_extension_only() -> None:
+    """Packages not in `only` are left as loaded"""
+    extension = RelativeCrossrefsExtension(only={'other'})
+    pkg = _load(extension)
+    assert extension.packages == 0
+    values = [doc.value for _, doc in iter_docstrings(pkg)]
+    assert values == [doc.value for _, doc in iter_docstrings(_load())]
@@ -15,21 +15,31 @@
 
 from __future__ import annotations
 
+import json
 import logging
 import os
+import sys
+import time
 from os import PathLike
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Any
 
 import pytest
 
-from griffe import Docstring, Object, Module
-from mkdocstrings import CollectionError
+from griffe import Class, Docstring, Function, Object, Module
+from mkdocs.exceptions import PluginError
+from mkdocstrings import CollectionError, Inventory
 from mkdocstrings_handlers.python import PythonConfig
 from mkdocstrings_handlers.python import PythonHandler
+from mkdocstrings_handlers.python_xref import handler as handler_module
+from mkdocstrings_handlers.python_xref import inventory as inventory_module
+from mkdocstrings_handlers.python_xref.crossref import substitute_relative_crossrefs
+from mkdocstrings_handlers.python_xref.extension import RelativeCrossrefsExtension
 from mkdocstrings_handlers.python_xref.handler import (
     PythonRelXRefHandler,
-    PythonRelXRefOptions
+    PythonRelXRefOptions,
+    _rendered_member_selector,
 )
 
 def test_handler(tmpdir: PathLike,
@@ -109,6 +119,9 @@ def test_handler(tmpdir: PathLike,
         PythonRelXRefOptions(relative_crossrefs=True), # type: ignore[call-arg]
     )
     assert rendered == "[foo][mod.foo] [bar][bad.bar]"
+    # warnings are only logged at the end of the build
+    assert len(caplog.records) == 0
+    assert handler._diagnostics.emit() == 1
     assert len(caplog.records) == 1
     _, level, msg = caplog.record_tuples[0]
     assert level == logging.WARNING
@@ -136,6 +149,7 @@ def test_handler(tmpdir: PathLike,
         PythonRelXRefOptions(relative_crossrefs=True), # type: ignore[call-arg]
     )
     assert rendered == "[foo][bad.foo]"
+    assert handler._diagnostics.emit() == 1
     assert len(caplog.records) == 1
     _, level, msg = caplog.record_tuples[0]
     assert level == logging.WARNING
@@ -150,3 +164,565 @@ def test_handler(tmpdir: PathLike,
     )
     assert rendered == "[foo][bad.foo] [bar][bad.bar]"
     assert len(caplog.records) == 0
+
+    # docstring is not processed again with the same check options
+    rendered = handler.render(
+        obj,
+        PythonRelXRefOptions(relative_crossrefs=True, check_crossrefs=True), # type: ignore[call-arg]
+    )
+    assert rendered == "[foo][bad.foo] [bar][bad.bar]"
+    assert len(caplog.records) == 0
+
+    # lazy substitution happens when template reads docstring
+    obj.docstring = Docstring("[foo][.] [bar][bad.]", parent=obj)
+    rendered = handler.render(
+        obj,
+        PythonRelXRefOptions(relative_crossrefs=True, lazy_crossrefs=True), # type: ignore[call-arg]
+    )
+    assert rendered == "[foo][mod.foo] [bar][bad.bar]"
+    assert handler._diagnostics.emit() == 1
+    assert len(caplog.records) == 1
+    assert "Cannot load reference 'bad.bar'" in caplog.records[0].getMessage()
+    caplog.clear()
+
+def test_check_ref_cache(tmpdir: PathLike, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Unit test for caching of crossref checks in PythonRelXRefHandler"""
+
+    handler = PythonRelXRefHandler(
+        PythonConfig(),  # type: ignore[call-arg]
+        Path(tmpdir),
+        theme = 'material',
+    )
+
+    collected: list[str] = []
+
+    def fake_collect(_self: PythonHandler, identifier: str, _config: dict) -> Any:
+        collected.append(identifier)
+        if identifier.startswith('mod'):
+            return Object(identifier)
+        raise CollectionError(identifier)
+
+    monkeypatch.setattr(PythonHandler, 'collect', fake_collect)
+
+    # pylint: disable=protected-access
+    assert handler._check_ref('mod.foo')
+    assert handler._check_ref('mod.foo')
+    assert collected == ['mod.foo']
+
+    assert not handler._check_ref('bad.foo')
+    assert not handler._check_ref('bad.foo')
+    assert collected == ['mod.foo', 'bad.foo']
+
+    # negative verdict for prefix also applies to its members
+    assert not handler._check_ref('bad.foo.bar')
+    assert not handler._check_ref('bad.foo.baz.blah')
+    assert collected == ['mod.foo', 'bad.foo']
+
+    # but not to names that merely share a string prefix
+    assert not handler._check_ref('bad.food')
+    assert collected == ['mod.foo', 'bad.foo', 'bad.food']
+
+    # exclusions are not cached and are not collected
+    assert handler._check_ref('bad.x', exclude=[r'bad\.'])
+    assert collected == ['mod.foo', 'bad.foo', 'bad.food']
+
+    # batched checks are deduplicated and use the same cache
+    collected.clear()
+    assert handler._check_refs(
+        ['mod.foo', 'mod.bar', 'bad.foo.x', 'mod.bar', 'bad.y'],
+        exclude=[r'bad\.y'],
+    ) == {'mod.foo', 'mod.bar', 'bad.y'}
+    assert collected == ['mod.bar']
+
+def test_build_state(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Unit test for reuse of crossref verdicts across builds in PythonRelXRefHandler"""
+    # pylint: disable=protected-access
+    monkeypatch.setattr(handler_module, '_build_states', {})
+    pkg = tmp_path / 'src' / 'pkg'
+    pkg.mkdir(parents=True)
+    (pkg / '__init__.py').write_text('from ._impl import Foo\n')
+    (pkg / '_impl.py').write_text('class Foo:\n    pass\n')
+    (pkg / 'other.py').write_text('x = 1\n')
+    past = time.time_ns() - 10_000_000_000
+    for path in (pkg, *pkg.iterdir()):
+        os.utime(path, ns=(past, past))
+
+    def make_handler(paths: tuple[str, ...] = ('src',)) -> PythonRelXRefHandler:
+        return PythonRelXRefHandler(
+            PythonConfig(paths=list(paths)),  # type: ignore[call-arg]
+            tmp_path,
+            theme = 'material',
+        )
+
+    handler = make_handler()
+    assert handler._check_ref('pkg.Foo')
+    assert handler._check_ref('pkg.other.x')
+    assert not handler._check_ref('pkg.other.y')
+    assert not handler._check_ref('pkg._impl.y')
+    assert handler._ref_modules('pkg.Foo') == {'pkg', 'pkg._impl'}
+    assert handler._ref_modules('pkg.other.x') == {'pkg', 'pkg.other'}
+    assert handler._ref_modules('pkg.bad') == set()
+    handler.teardown()
+
+    # nothing changed, verdicts are reused without loading anything
+    handler = make_handler()
+    assert len(handler._ref_verdicts) == 4
+    assert handler._check_ref('pkg.Foo')
+    assert not handler._modules_collection.members
+    handler.teardown()
+
+    # verdicts depending on changed module are dropped, as are negative verdicts
+    # in the same package
+    handler = make_handler()
+    assert handler._check_ref('pkg.Foo')
+    handler.teardown()
+    (pkg / 'other.py').write_text('x = 1\ny = 2\n')
+    handler = make_handler()
+    assert handler._ref_verdicts.get('pkg.Foo') is True
+    assert handler._ref_verdicts.get('pkg.other.x') is None
+    assert handler._ref_verdicts.get('pkg.other.y') is None
+    assert handler._ref_verdicts.get('pkg._impl.y') is None
+    assert handler._check_ref('pkg.other.y')
+    handler.teardown()
+
+    # only the state of the most recent build is kept
+    states = handler_module._build_states
+    assert len(states) == 1
+    (tmp_path / 'more').mkdir()
+    other = make_handler(('src', 'more'))
+    assert len(states) == 2
+    other.teardown()
+    assert list(states) == [other._build_key]
+    handler = make_handler()
+    assert not handler._ref_verdicts.get('pkg.Foo')
+
+def test_get_options(tmpdir: PathLike) -> None:
+    """Unit test for caching of PythonRelXRefHandler.get_options"""
+    handler = PythonRelXRefHandler(
+        PythonConfig(options={'check_crossrefs_exclude': ['foo']}),  # type: ignore[call-arg]
+        Path(tmpdir),
+        theme = 'material',
+    )
+    assert handler.options_cache_hits == 0
+
+    opts = handler.get_options({'show_source': False, 'extra': {'a': [1, 2]}})
+    assert isinstance(opts, PythonRelXRefOptions)
+    assert opts.show_source is False
+    assert opts.extra == {'a': [1, 2]}
+    assert [getattr(p, 'pattern', p) for p in opts.check_crossrefs_exclude] == ['foo']
+    assert handler.options_cache_hits == 0
+
+    # identical local options give same object
+    assert handler.get_options({'extra': {'a': [1, 2]}, 'show_source': False}) is opts
+    assert handler.options_cache_hits == 1
+
+    # different local options
+    opts2 = handler.get_options({'show_source': 0, 'extra': {'a': [1, 2]}})
+    assert opts2 is not opts
+    assert handler.get_options({'extra': {'a': [1, 3]}, 'show_source': False}) is not opts
+    opts3 = handler.get_options({'check_crossrefs_exclude': ['bar', r'baz\.']})
+    assert opts3.check_crossrefs_exclude == ['bar', r'baz\.']
+    assert handler.get_options({'check_crossrefs_exclude': ['bar', r'baz\.']}) is opts3
+    assert handler.options_cache_hits == 2
+
+    # unhashable values are not cached
+    unhashable = {'extra': {'x': bytearray(b'x')}}
+    assert handler.get_options(unhashable) is not handler.get_options(unhashable)
+    assert handler.options_cache_hits == 2
+
+    with pytest.raises(PluginError, match='check_crossrefs_exclude'):
+        handler.get_options({'check_crossrefs_exclude': ['(']})
+
+def test_crossref_cache_option(tmpdir: PathLike) -> None:
+    """Unit test for crossref_cache option of PythonRelXRefHandler"""
+    # pylint: disable=protected-access
+    def make_handler(**options: Any) -> PythonRelXRefHandler:
+        return PythonRelXRefHandler(
+            PythonConfig(options=options),  # type: ignore[call-arg]
+            Path(tmpdir),
+            theme = 'material',
+        )
+
+    assert make_handler(crossref_cache=False)._substitution_cache is None
+    cache = make_handler(crossref_cache=True)._substitution_cache
+    assert cache is not None
+    assert cache.directory == Path(tmpdir) / '.cache' / 'python_xref'
+    handler = make_handler(crossref_cache='xref-cache')
+    cache = handler._substitution_cache
+    assert cache is not None
+    assert cache.directory == Path(tmpdir) / 'xref-cache'
+
+    cache.put('key', cache.entry('value', [], []))
+    handler.teardown()
+    assert cache.path is not None and cache.path.is_file()
+
+def test_crossref_report_option(tmpdir: PathLike,
+                                monkeypatch: pytest.MonkeyPatch,
+                                caplog: pytest.LogCaptureFixture) -> None:
+    """Unit test for crossref_report option of PythonRelXRefHandler"""
+    monkeypatch.setattr(PythonHandler, 'render', lambda _self, data, _options: '')
+    handler = PythonRelXRefHandler(
+        PythonConfig(options={'crossref_report': 'reports/xref.json'}),  # type: ignore[call-arg]
+        Path(tmpdir),
+        theme = 'material',
+    )
+    obj = Module(name='mod', filepath=Path('mod.py'))
+    obj.docstring = Docstring("[foo][.bad] [bar][bad.]", parent=obj)
+    handler.render(obj, PythonRelXRefOptions(relative_crossrefs=True))  # type: ignore[call-arg]
+    assert len(caplog.records) == 0
+    handler.teardown()
+    assert len(caplog.records) == 2
+    report = json.loads((Path(tmpdir) / 'reports' / 'xref.json').read_text())
+    assert [d['ref'] for d in report['diagnostics']] == ['bad.bar', 'mod.bad']
+
+def test_rendered_member_selector(tmpdir: PathLike) -> None:
+    """Unit test for selection of rendered members in PythonRelXRefHandler"""
+    # pylint: disable=protected-access
+    handler = PythonRelXRefHandler(
+        PythonConfig(),  # type: ignore[call-arg]
+        Path(tmpdir),
+        theme = 'material',
+    )
+
+    pkg = Module(name='pkg', filepath=Path('pkg/__init__.py'))
+    sub = Module(name='sub', parent=pkg, filepath=Path('pkg/sub.py'))
+    impl = Module(name='_impl', parent=pkg, filepath=Path('pkg/_impl.py'))
+    cls = Class(name='Class1', parent=pkg)
+    init = Function(name='__init__', parent=cls)
+    priv = Function(name='_priv', parent=cls)
+    func = Function(name='func', parent=pkg)
+    for obj in (sub, impl, cls, func):
+        pkg.set_member(obj.name, obj)
+    for obj in (init, priv):
+        cls.set_member(obj.name, obj)
+
+    def select(local_options: dict[str, Any], obj: Object, is_root: bool = True) -> list[str]:
+        options = handler.get_options(local_options)
+        selector = _rendered_member_selector(options)
+        return [member.name for member in selector(obj, is_root)]
+
+    assert select({}, pkg) == ['Class1', 'func']
+    assert select({'show_submodules': True}, pkg) == ['sub', 'Class1', 'func']
+    assert select({'show_submodules': True, 'filters': []}, pkg) == ['sub', '_impl', 'Class1', 'func']
+    assert select({'show_submodules': True, 'members': ['func', '_impl']}, pkg) == ['_impl', 'func']
+    assert select({'members': ['func']}, pkg, is_root=False) == ['Class1', 'func']
+    assert select({}, cls) == ['__init__']
+    assert select({'filters': ['!^_']}, cls) == []
+    assert select({'filters': ['!^_'], 'merge_init_into_class': True}, cls) == ['__init__']
+
+    # submodules in the summary are selected, but not their members
+    sub.set_member('subfunc', Function(name='subfunc', parent=sub))
+    assert select({'summary': True}, pkg) == ['sub', 'Class1', 'func']
+    assert select({'summary': {'modules': True}}, pkg) == ['sub', 'Class1', 'func']
+    assert select({'summary': {'classes': True}}, pkg) == ['Class1', 'func']
+    options = handler.get_options({'summary': True})
+    selector = _rendered_member_selector(options)
+    selector(pkg, True)
+    assert list(selector(sub, False)) == []
+    assert select({'summary': True, 'show_submodules': True}, sub, is_root=False) == ['subfunc']
+
+def test_crossref_stats(tmpdir: PathLike,
+                        monkeypatch: pytest.MonkeyPatch,
+                        caplog: pytest.LogCaptureFixture) -> None:
+    """Unit test for statistics gathered by PythonRelXRefHandler"""
+    monkeypatch.setattr(PythonHandler, 'render', lambda _self, data, _options: '')
+    handler = PythonRelXRefHandler(
+        PythonConfig(options={'crossref_stats': 'stats.json'}),  # type: ignore[call-arg]
+        Path(tmpdir),
+        theme = 'material',
+    )
+    handler.autorefs = SimpleNamespace(current_page=SimpleNamespace(file=SimpleNamespace(src_uri='api.md')))
+    obj = Module(name='mod', filepath=Path('mod.py'))
+    obj.docstring = Docstring("[foo][.] [bar][?bad.] [baz][bad.baz]", parent=obj)
+    handler.render(obj, PythonRelXRefOptions(relative_crossrefs=True))  # type: ignore[call-arg]
+
+    stats = handler.stats
+    assert stats.docstrings == 1
+    assert stats.crossrefs == 3
+    assert stats.rewritten == 2
+    assert stats.checks == 2
+    assert stats.check_cache_misses == 2
+    assert stats.pages['api.md']['renders'] == 1
+    assert set(stats.pages['api.md']) >= {'substitute', 'render'}
+
+    caplog.set_level(logging.INFO)
+    handler.teardown()
+    assert any(r.getMessage().endswith(f"crossrefs: {stats.summary()}") for r in caplog.records)
+    data = json.loads((Path(tmpdir) / 'stats.json').read_text())
+    assert data['counters']['crossrefs'] == 3
+    assert data['modules'] == {'mod': {'docstrings': 1, 'crossrefs': 3, 'rewritten': 2}}
+    assert data['pages']['api.md']['renders'] == 1
+
+
+def test_render_large_module(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Substitutions in render are only cached when they can be used again"""
+    # pylint: disable=protected-access
+    monkeypatch.setattr(PythonHandler, 'render', lambda _self, data, _options: '')
+    monkeypatch.setattr(handler_module, '_build_states', {})
+
+    def make_module() -> Module:
+        mod = Module(name='mod', filepath=Path('mod.py'))
+        for i in range(2000):
+            cls = Class(name=f'Class{i}', parent=mod)
+            cls.docstring = Docstring(f'[x][.] [y][(m).Class{i}]', parent=cls)
+            mod.set_member(cls.name, cls)
+            meth = Function(name='meth', parent=cls)
+            meth.docstring = Docstring('[z][(c).]', parent=meth)
+            cls.set_member(meth.name, meth)
+        return mod
+
+    def build() -> PythonRelXRefHandler:
+        handler = PythonRelXRefHandler(
+            PythonConfig(options={'check_crossrefs': False}),  # type: ignore[call-arg]
+            tmp_path,
+            theme = 'material',
+        )
+        options = handler.get_options({'relative_crossrefs': True})
+        handler.render(make_module(), options)
+        handler.teardown()
+        assert handler.stats.docstrings == 4000
+        return handler
+
+    # first build: nothing is hashed or kept
+    handler = build()
+    assert handler._substitution_cache is None
+    assert handler.stats.cache_hits == handler.stats.cache_misses == 0
+    # first rebuild fills the in-memory cache, later ones use it
+    handler = build()
+    assert handler.stats.cache_hits == 0
+    assert handler.stats.cache_misses == 4000
+    handler = build()
+    assert handler.stats.cache_hits == 4000
+    assert handler.stats.cache_misses == 0
+
+
+def test_load_time_crossrefs(tmpdir: PathLike, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Unit test for load_time_crossrefs option"""
+    monkeypatch.setattr(PythonHandler, 'render', lambda _self, data, _options: '')
+    handler = PythonRelXRefHandler(
+        PythonConfig(  # type: ignore[call-arg]
+            paths=[str(Path(__file__).parent / 'project' / 'src')],
+            options={'load_time_crossrefs': True},
+        ),
+        Path(tmpdir),
+        theme = 'material',
+    )
+    assert handler.load_time_crossrefs
+    extensions = handler.normalize_extension_paths([])
+    assert [type(ext) for ext in extensions] == [RelativeCrossrefsExtension]
+
+    options = handler.get_options({'relative_crossrefs': True})
+    bar = handler.collect('myproj.bar', options)
+    assert bar.docstring is not None
+    assert '[bad][myproj.bar.bad]' in bar.docstring.value
+    scanned = handler.stats.scanned
+    assert scanned > 0
+
+    # only checks remain to be done when rendering
+    handler.render(bar, options)
+    assert handler.stats.scanned == scanned
+    assert handler._diagnostics.emit() >= 1
+
+    # modules without crossrefs are skipped entirely
+    docstrings = handler.stats.docstrings
+    handler.render(handler.collect('myproj.foo', options), options)
+    assert handler.stats.docstrings == docstrings
+
+    # packages only loaded to check references are not substituted
+    dep = Path(tmpdir) / 'dep'
+    dep.mkdir()
+    (dep / '__init__.py').write_text('"""See [thing][.]"""\nthing = 1\n')
+    handler._paths.insert(0, str(tmpdir))
+    assert handler._check_ref('dep.thing')
+    assert handler._modules_collection['dep'].docstring.value == 'See [thing][.]'
+    assert handler.stats.scanned == scanned
+
+
+def test_summary_of_submodules(tmpdir: PathLike, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Submodule docstrings rendered in a package's summary are substituted"""
+    rendered: list[str] = []
+
+    def fake_render(_self: PythonHandler, data: Object, _options: Any) -> str:
+        baz = data.modules['baz']
+        assert baz.docstring is not None
+        rendered.append(baz.docstring.value)
+        return ''
+
+    monkeypatch.setattr(PythonHandler, 'render', fake_render)
+    for lazy in (False, True):
+        handler = PythonRelXRefHandler(
+            PythonConfig(paths=[str(Path(__file__).parent / 'project' / 'src')]),  # type: ignore[call-arg]
+            Path(tmpdir),
+            theme = 'material',
+        )
+        options = handler.get_options({'relative_crossrefs': True, 'summary': True, 'lazy_crossrefs': lazy})
+        handler.render(handler.collect('myproj.pkg', options), options)
+        assert '[func][myproj.pkg.func]' in rendered[-1]
+
+
+def test_check_crossrefs_scope(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Unit test for check_crossrefs_scope and check_crossrefs_max_loads options"""
+    (tmp_path / 'local').mkdir()
+    (tmp_path / 'local' / '__init__.py').write_text('')
+    (tmp_path / 'other.py').write_text('')
+
+    collected: list[str] = []
+
+    def fake_collect(self: PythonHandler, identifier: str, _config: dict) -> Any:
+        collected.append(identifier)
+        package = identifier.partition('.')[0]
+        self._modules_collection.set_member(package, Module(package))
+        return Object(identifier)
+
+    monkeypatch.setattr(PythonHandler, 'collect', fake_collect)
+
+    def make_handler(**options: Any) -> PythonRelXRefHandler:
+        # don't share verdicts between handlers
+        monkeypatch.setattr(handler_module, '_build_states', {})
+        return PythonRelXRefHandler(
+            PythonConfig(paths=[str(tmp_path / 'local'), str(tmp_path)], options=options),  # type: ignore[call-arg]
+            tmp_path,
+            theme = 'material',
+        )
+
+    # pylint: disable=protected-access
+    # any package may be loaded by default, including the standard library
+    monkeypatch.delitem(sys.modules, 'tabnanny', raising=False)
+    handler = make_handler()
+    assert handler.check_crossrefs_scope == 'all'
+    assert handler._check_ref('tabnanny.check')
+    assert handler._check_ref('ext.foo')
+    assert collected == ['tabnanny.check', 'ext.foo']
+    assert handler.stats.unchecked == 0
+
+    # names in standard library modules that are already imported are verified
+    # without loading them
+    collected.clear()
+    assert handler._check_ref('pathlib.Path.read_text')
+    assert handler._check_ref('os.path.join')
+    assert handler._check_ref('builtins.int')
+    assert not handler._check_ref('pathlib.Pth')
+    assert not handler._check_ref('pathlib.Path.read_txt')
+    assert not collected
+    assert handler.stats.unchecked == 0
+
+    collected.clear()
+    handler = make_handler(check_crossrefs_scope='loaded')
+    assert handler._check_ref('local.foo')
+    assert handler._check_ref('ext.foo')
+    assert not handler._check_ref('pathlib.Nope')
+    assert not collected
+    assert handler.stats.unchecked == 2
+
+    handler = make_handler(check_crossrefs_scope='paths')
+    assert handler._check_ref('local.foo')
+    assert handler._check_ref('other.foo')
+    assert handler._check_ref('ext.foo')
+    assert collected == ['local.foo', 'other.foo']
+    assert handler.stats.unchecked == 1
+
+    # references into loaded packages are still checked
+    assert not handler._check_ref('local.bar')
+    assert handler.stats.unchecked == 1
+
+    collected.clear()
+    handler = make_handler(check_crossrefs_max_loads=1)
+    assert handler._check_ref('ext.foo')
+    assert handler._check_ref('ext2.foo')
+    assert collected == ['ext.foo']
+    assert handler.stats.package_loads == 1
+    assert handler.stats.unchecked == 1
+
+    # references into the standard library are really checked
+    monkeypatch.undo()
+    handler = make_handler()
+    assert handler._check_ref('pathlib.Path')
+    assert not handler._check_ref('pathlib.Nope')
+
+    with pytest.raises(PluginError, match='check_crossrefs_scope'):
+        make_handler(check_crossrefs_scope='some')
+
+
+def test_check_crossrefs_inventories(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Unit test for checking crossrefs against inventories"""
+    inv = Inventory(project='ext')
+    inv.register('ext.Foo', 'py', 'class', 'foo.html')
+    (tmp_path / 'objects.inv').write_bytes(inv.format_sphinx())
+
+    collected: list[str] = []
+
+    def fake_collect(_self: PythonHandler, identifier: str, _config: dict) -> Any:
+        collected.append(identifier)
+        raise CollectionError(identifier)
+
+    monkeypatch.setattr(PythonHandler, 'collect', fake_collect)
+    monkeypatch.setattr(handler_module, '_build_states', {})
+    monkeypatch.setattr(inventory_module.platformdirs, 'user_cache_dir', lambda name: str(tmp_path / 'user_cache' / name))
+    handler = PythonRelXRefHandler(
+        PythonConfig.from_data(inventories=['objects.inv', 'https://example.com/unavailable/objects.inv']),
+        tmp_path,
+        theme = 'material',
+    )
+
+    # pylint: disable=protected-access
+    assert handler._check_ref('ext.Foo')
+    assert not handler._check_ref('ext.Bar')
+    assert not handler._check_ref('other.Foo')
+    assert collected == ['other.Foo']
+
+    # index is saved in the user's cache directory, even without crossref_cache
+    handler.teardown()
+    index_dir = inventory_module.InventoryIndex.default_directory(tmp_path)
+    assert index_dir.is_relative_to(tmp_path / 'user_cache')
+    assert (index_dir / 'inventories.json').is_file()
+
+    handler.check_crossrefs_inventories = False
+    assert not handler._check_ref('ext.Baz')
+    assert collected == ['other.Foo', 'ext.Baz']
+
+    monkeypatch.setattr(handler_module, '_build_states', {})
+    handler = PythonRelXRefHandler(
+        PythonConfig.from_data(inventories=['objects.inv'], options={'check_crossrefs_inventories': 'inv'}),
+        tmp_path,
+        theme = 'material',
+    )
+    assert handler._check_ref('ext.Foo')
+    handler.teardown()
+    assert (tmp_path / 'inv' / 'inventories.json').is_file()
+
+
+def test_crossref_index_option(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Unit test for crossref_index option"""
+    src_dir = Path(__file__).parent / 'project' / 'src'
+
+    def make_handler() -> PythonRelXRefHandler:
+        monkeypatch.setattr(handler_module, '_build_states', {})
+        return PythonRelXRefHandler(
+            PythonConfig(paths=[str(src_dir)], options={'crossref_index': 'names.idx'}),  # type: ignore[call-arg]
+            tmp_path,
+            theme = 'material',
+        )
+
+    # pylint: disable=protected-access
+    handler = make_handler()
+    handler.collect('myproj', handler.get_options({}))
+    handler.teardown()
+    assert (tmp_path / 'names.idx').is_file()
+
+    collected: list[str] = []
+
+    def fake_collect(_self: PythonHandler, identifier: str, _config: dict) -> Any:
+        collected.append(identifier)
+        raise CollectionError(identifier)
+
+    monkeypatch.setattr(PythonHandler, 'collect', fake_collect)
+    handler = make_handler()
+    assert handler._check_ref('myproj.foo.Foo')
+    assert not handler._check_ref('myproj.bad')
+    assert not collected
+    assert handler._shared_index is not None and handler._shared_index.roots == {'myproj'}
+
+    # index file is released on teardown, even when it is not written again
+    shared = handler._shared_index
+    handler.teardown()
+    assert shared._mmap is None
@@ -0,0 +1,73 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Unit tests for mkdocstrings_handlers.python_xref.incremental module"""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import griffe
+from griffe import ModulesCollection
+
+from mkdocstrings_handlers.python_xref.incremental import SourceStamps
+
+
+def make_package(root: Path) -> None:
+    """Write package `pkg` with modules `_impl` and `other` to root directory"""
+    pkg = root / "pkg"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("from ._impl import Foo\n")
+    (pkg / "_impl.py").write_text("class Foo:\n    pass\n")
+    (pkg / "other.py").write_text("x = 1\n")
+    # Backdate files so modifications are always detected
+    past = time.time_ns() - 10_000_000_000
+    for path in (pkg, *pkg.iterdir()):
+        os.utime(path, ns=(past, past))
+
+
+def load_package(root: Path) -> ModulesCollection:
+    """Load `pkg` from root directory"""
+    collection = ModulesCollection()
+    griffe.GriffeLoader(search_paths=[str(root)], modules_collection=collection).load("pkg")
+    return collection
+
+
+def test_source_stamps(tmp_path: Path) -> None:
+    """Unit test for SourceStamps"""
+    make_package(tmp_path)
+    stamps = SourceStamps()
+    assert len(stamps) == 0
+    assert not stamps.changed()
+
+    stamps.record(load_package(tmp_path), since_ns=time.time_ns())
+    assert len(stamps) == 3
+    assert "pkg._impl" in stamps
+    assert not stamps.changed()
+
+    # modified module
+    (tmp_path / "pkg" / "other.py").write_text("x = 2\n")
+    assert stamps.changed() == {"pkg.other"}
+    assert "pkg.other" not in stamps
+    assert not stamps.changed()
+
+    # new module changes package directory
+    stamps.record(load_package(tmp_path), since_ns=time.time_ns())
+    (tmp_path / "pkg" / "new.py").write_text("")
+    assert stamps.changed() == {"pkg"}
+
+    # modules modified after build started are always considered changed
+    stamps.record(load_package(tmp_path), since_ns=0)
+    assert stamps.changed() == {"pkg", "pkg._impl", "pkg.other", "pkg.new"}
@@ -0,0 +1,138 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Unit tests for mkdocstrings_handlers.python_xref.index module"""
+
+from __future__ import annotations
+
+import os
+import stat
+from pathlib import Path
+from typing import cast
+
+import griffe
+from griffe import Module, ModulesCollection
+
+from mkdocstrings_handlers.python_xref.index import NameIndex
+
+this_dir = Path(__file__).parent
+test_src_dir = this_dir / "project" / "src"
+
+
+def test_name_index() -> None:
+    """Unit test for NameIndex"""
+    collection = ModulesCollection()
+    loader = griffe.GriffeLoader(
+        search_paths=[str(test_src_dir)],
+        modules_collection=collection,
+    )
+    loader.load("myproj")
+    loader.resolve_aliases(implicit=False)
+
+    index = NameIndex()
+    assert len(index) == 0
+    assert index.lookup("myproj.foo.Foo") is None
+
+    assert index.update(collection) == 1
+    assert index.update(collection) == 0
+    assert index.roots == {"myproj"}
+    assert "myproj.foo.Foo" in index
+
+    # objects and aliases
+    assert index.lookup("myproj") is True
+    assert index.lookup("myproj.foo.Foo.foo") is True
+    assert index.lookup("myproj.bar.Bar.attribute") is True
+    assert index.lookup("myproj.pkg.Dataclass") is True
+    assert index.lookup("myproj.bar.Foo") is True
+
+    # definitely missing
+    assert index.lookup("myproj.bad") is False
+    assert index.lookup("myproj.bar.bad.bad") is False
+    assert index.lookup("myproj.foo.Foo.bad") is False
+    assert index.lookup("myproj.bar.func.bad") is False
+
+    # cannot be determined from index
+    assert index.lookup("numpy.ndarray") is None
+    assert index.lookup("myproj.bar.Bar.foo") is True
+    assert index.lookup("myproj.bar.Bar.inherited") is None  # Bar has base class
+    assert index.lookup("myproj.pkg.Dataclass.content") is None  # through alias
+
+    # storage includes the path of every node
+    usage = index.memory_usage()
+    assert list(usage) == ["myproj"]
+    assert 0 < usage["myproj"] < 200 * len(index)
+    # pylint: disable=protected-access
+    tree = index._trees["myproj"]
+    assert [tree.path(node) for node in range(len(tree))][:2] == ["myproj", "myproj.bar"]
+    assert all(tree.path(node) in index for node in range(len(tree)))
+
+
+def test_name_index_file(tmp_path: Path) -> None:
+    """Unit test for saving and opening NameIndex files"""
+    src_dir = tmp_path / "src"
+    (src_dir / "pkg").mkdir(parents=True)
+    (src_dir / "pkg" / "__init__.py").write_text("class Foo:\n    def bar(self): ...\n")
+    (src_dir / "pkg" / "mod.py").write_text("def func(): ...\n")
+    (src_dir / "other.py").write_text("x = 1\n")
+    collection = ModulesCollection()
+    loader = griffe.GriffeLoader(search_paths=[str(src_dir)], modules_collection=collection)
+    loader.load("pkg")
+    loader.load("other")
+
+    index = NameIndex()
+    index.update(collection)
+    # sources are only hashed when needed
+    assert all(tree._key is None for tree in index._trees.values())
+    index_file = tmp_path / "cache" / "names.idx"
+    assert index.save(index_file) == 2
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(index_file.stat().st_mode) == 0o666 & ~umask
+
+    opened = NameIndex.open(index_file)
+    assert opened.roots == {"pkg", "other"}
+    assert opened.keys() == index.keys()
+    assert len(opened) == len(index)
+    # arrays are mapped from file rather than copied
+    assert sum(opened.memory_usage().values()) < sum(index.memory_usage().values())
+    for ref in ("pkg", "pkg.Foo.bar", "pkg.mod.func", "pkg.missing", "pkg.mod.func.x", "other.x", "nope.x"):
+        assert opened.lookup(ref) == index.lookup(ref)
+
+    # opened index can be saved again, with packages from other indexes,
+    # after which it is closed
+    other_file = tmp_path / "other.idx"
+    assert NameIndex().save(other_file, others=opened) == 2
+    assert other_file.read_bytes() == index_file.read_bytes()
+    assert opened.roots == frozenset()
+    assert opened.lookup("pkg.Foo") is None
+
+    # including over the file it is mapped from
+    with NameIndex.open(other_file) as reopened:
+        assert NameIndex().save(other_file, others=reopened) == 2
+    assert other_file.read_bytes() == index_file.read_bytes()
+
+    # closing releases the file and keeps packages that were not read from it
+    opened = NameIndex.open(index_file)
+    opened.add_module(cast(Module, collection["other"]))
+    opened.close()
+    opened.close()
+    assert opened.roots == {"other"}
+
+    # packages whose sources changed are left out
+    (src_dir / "pkg" / "mod.py").write_text("def func2(): ...\n")
+    assert NameIndex.open(index_file).roots == {"other"}
+
+    # unusable files give empty index
+    assert len(NameIndex.open(tmp_path / "missing.idx")) == 0
+    (tmp_path / "bad.idx").write_bytes(b"not an index")
+    assert len(NameIndex.open(tmp_path / "bad.idx")) == 0
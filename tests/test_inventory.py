@@ -0,0 +1,106 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Unit tests for mkdocstrings_handlers.python_xref.inventory module"""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+import pytest
+from mkdocstrings import Inventory
+
+from mkdocstrings_handlers.python_xref import inventory as inventory_module
+from mkdocstrings_handlers.python_xref.inventory import InventoryIndex, read_cached_inventory
+
+
+def write_inventory(path: Path, *names: str, domain: str = "py") -> bytes:
+    """Write Sphinx inventory with given object names"""
+    inv = Inventory(project="test")
+    for name in names:
+        inv.register(name, domain, "class", f"{name}.html")
+    content = inv.format_sphinx()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return content
+
+
+def test_read_cached_inventory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Unit test for read_cached_inventory"""
+    content = write_inventory(tmp_path / "docs" / "objects.inv", "ext.Foo")
+    assert read_cached_inventory("docs/objects.inv", tmp_path) == content
+    assert read_cached_inventory((tmp_path / "docs" / "objects.inv").as_uri(), Path()) == content
+    assert read_cached_inventory("missing.inv", tmp_path) is None
+
+    # URLs are only read from the mkdocs download cache
+    monkeypatch.setattr(inventory_module.platformdirs, "user_cache_dir", lambda _name: str(tmp_path / "cache"))
+    url = "https://example.com/objects.inv"
+    assert read_cached_inventory(url, tmp_path) is None
+    cached = tmp_path / "cache" / "mkdocs_url_cache" / (hashlib.sha256(url.encode()).hexdigest()[:32] + ".inv")
+    cached.parent.mkdir(parents=True)
+    cached.write_bytes(b"# " + url.encode() + b" downloaded at timestamp 0\n" + content)
+    assert read_cached_inventory(url, tmp_path) == content
+    cached.write_bytes(content)
+    assert read_cached_inventory(url, tmp_path) is None
+
+
+def test_inventory_index(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Unit test for InventoryIndex"""
+    write_inventory(tmp_path / "ext.inv", "ext", "ext.Foo", "ext.Foo.bar")
+    write_inventory(tmp_path / "other.inv", "other.func")
+    write_inventory(tmp_path / "std.inv", "std.thing", domain="std")
+
+    index = InventoryIndex(tmp_path / "cache")
+    assert index.lookup("ext.Foo") is None
+    assert index.update([("ext.inv", {}), ("other.inv", {}), ("std.inv", {}), ("missing.inv", {})], tmp_path) == 3
+    assert index.urls == ["ext.inv", "other.inv", "std.inv"]
+    assert len(index) == 4
+    assert "ext.Foo" in index
+    assert index.lookup("ext.Foo") is True
+    assert index.lookup("ext.Foo.bar") is True
+    assert index.lookup("ext.Bar") is False
+    assert index.lookup("other.func") is True
+    assert index.lookup("extra.Foo") is None
+    # only py domain by default
+    assert index.lookup("std.thing") is None
+
+    # index is saved and reused without parsing unchanged inventories again
+    index.save()
+    assert (tmp_path / "cache" / InventoryIndex.filename).is_file()
+
+    def fail(*_args: object, **_kwargs: object) -> None:
+        raise AssertionError("parsed unchanged inventory")
+
+    monkeypatch.setattr(Inventory, "parse_sphinx", fail)
+    index2 = InventoryIndex(tmp_path / "cache")
+    assert index2.update([("ext.inv", {}), ("other.inv", {})], tmp_path) == 2
+    assert index2.lookup("ext.Foo") is True
+    monkeypatch.undo()
+
+    # changed inventories are parsed again, and removed ones are dropped
+    write_inventory(tmp_path / "ext.inv", "ext", "ext.Bar")
+    assert index2.update([("ext.inv", {}), ("std.inv", {"domains": ["std"]})], tmp_path) == 2
+    assert index2.lookup("ext.Foo") is False
+    assert index2.lookup("ext.Bar") is True
+    assert index2.lookup("other.func") is None
+    assert index2.lookup("std.thing") is True
+
+
+def test_default_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Each project has its own index directory in the user's cache directory"""
+    monkeypatch.setattr(inventory_module.platformdirs, "user_cache_dir", lambda name: str(tmp_path / "cache" / name))
+    first = InventoryIndex.default_directory(tmp_path / "proj1")
+    assert first.is_relative_to(tmp_path / "cache")
+    assert first == InventoryIndex.default_directory(tmp_path / "proj1" / ".." / "proj1")
+    assert first != InventoryIndex.default_directory(tmp_path / "proj2")
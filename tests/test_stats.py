@@ -0,0 +1,66 @@
+#  Copyright (c) 2025.   Analog Devices Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Unit tests for mkdocstrings_handlers.python_xref.stats module"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from griffe import Class, Docstring, Module
+
+import mkdocstrings_handlers.python_xref.stats as stats_module
+
+from mkdocstrings_handlers.python_xref.crossref import substitute_relative_crossrefs
+from mkdocstrings_handlers.python_xref.stats import COUNTERS, TIMERS, CrossrefStats
+
+def test_timer(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Unit test for CrossrefStats.timer"""
+    clock = iter([1.0, 2.0, 4.0, 8.0])
+    monkeypatch.setattr(stats_module, "perf_counter", lambda: next(clock))
+    stats = CrossrefStats()
+    assert stats.counters() == dict.fromkeys(COUNTERS, 0)
+    assert stats.times == dict.fromkeys(TIMERS, 0.0)
+
+    stats.page = "index.md"
+    with stats.timer("render"):
+        with stats.timer("substitute"):
+            pass
+    # nested timers are exclusive
+    assert stats.times == {"collect": 0.0, "substitute": 2.0, "render": 5.0}
+    assert stats.pages["index.md"] == {"substitute": 2.0, "render": 5.0}
+
+def test_substitution_stats(tmp_path: Path) -> None:
+    """Unit test for statistics gathered by substitute_relative_crossrefs"""
+    mod = Module(name="mod", filepath=Path("mod.py"))
+    mod.docstring = Docstring("[foo][.] [bar][other.bar] [baz][..]", parent=mod)
+    cls = Class(name="Cls", parent=mod)
+    mod.set_member("Cls", cls)
+    cls.docstring = Docstring("no crossrefs", parent=cls)
+
+    stats = CrossrefStats()
+    substitute_relative_crossrefs(mod, stats=stats)
+    assert stats.docstrings == 2
+    assert stats.scanned == 1
+    assert stats.crossrefs == 3
+    assert stats.rewritten == 1
+    assert dict(stats.modules["mod"]) == {"docstrings": 1, "crossrefs": 3, "rewritten": 1}
+    assert stats.summary().startswith("2 docstrings (1 scanned), 3 crossrefs (1 relative), 0 checks")
+
+    stats.dump(tmp_path / "stats" / "xref.json")
+    data = json.loads((tmp_path / "stats" / "xref.json").read_text())
+    assert data["counters"] == stats.counters()
+    assert data["modules"] == {"mod": {"docstrings": 1, "crossrefs": 3, "rewritten": 1}}
+    assert set(data["times"]) == set(TIMERS)